@@ -0,0 +1,7 @@
+from django.utils.translation import ugettext_lazy as _
+from django.apps import AppConfig
+
+
+class ApiAppConfig(AppConfig):
+    name = 'api'
+    verbose_name = _('API')
@@ -0,0 +1,244 @@
+from django.core.urlresolvers import reverse
+from django.db.models import Count
+import django.utils.translation as translation
+import catalogue.models as catalogue_models
+import localization.models as localization_models
+import localization.resolver as localization_resolver
+from localization.registry import registry
+import media_store.storage as media_store_storage
+import menu.builder as menu_builder
+import static_page.models as static_page_models
+
+
+SEO_FIELDS = ('title', 'meta_keywords', 'meta_description', 'meta_robots', 'meta_canonical', 'h1')
+
+
+class InvalidFields(ValueError):
+    pass
+
+
+def language_id() -> int:
+    language = registry.language(translation.get_language())
+    return language.id if language is not None else None
+
+
+def file_url(storage, name: str) -> str:
+    return storage.url(name) if name else None
+
+
+def texts(model, owner_field: str, owner_ids: [int]) -> {int: [dict]}:
+    """Texts of the active language by owner, one query for all owners"""
+    result = {}
+    for row in model.objects.filter(language=language_id(), **{owner_field + '__in': owner_ids}).\
+            order_by('weight').values(owner_field, 'name', 'body', 'weight'):
+        result.setdefault(row.pop(owner_field), []).append(row)
+    return result
+
+
+def seo_information(model, owner_field: str, owner_ids: [int]) -> {int: dict}:
+    result = {}
+    for row in model.objects.filter(language=language_id(), **{owner_field + '__in': owner_ids}).\
+            values(owner_field, *SEO_FIELDS):
+        result[row.pop(owner_field)] = row
+    return result
+
+
+def resolved(model, owner_field: str, owner_ids: [int], fields: (str,) = ('name',), has_default: bool = True) -> \
+        {int: (str,)}:
+    resolver = localization_resolver.get_resolver()
+    resolver.prefetch(model, owner_field, owner_ids, fields, has_default)
+    return {owner_id: resolver.resolve(model, owner_field, owner_id, fields, has_default) for owner_id in owner_ids}
+
+
+class Serializer:
+    """Turns many rows into dicts at once.
+
+    Every group of fields is loaded for all rows with one query, and only when it is requested, so the number of
+    queries does not depend on the number of rows.
+    """
+    FIELDS = ()
+
+    def __init__(self, fields: [str] = None) -> None:
+        fields = fields or self.FIELDS
+        unknown = [field for field in fields if field not in self.FIELDS]
+        if unknown.__len__() > 0:
+            raise InvalidFields(str.format('Unknown fields: {0}', ', '.join(unknown)))
+        self.__fields = tuple(field for field in self.FIELDS if field in fields)
+
+    @property
+    def fields(self) -> (str,):
+        return self.__fields
+
+    def wants(self, *fields: str) -> bool:
+        return any(field in self.__fields for field in fields)
+
+    def select(self, record: dict) -> dict:
+        return {field: record.get(field) for field in self.__fields}
+
+    def serialize(self, rows: list) -> [dict]:
+        raise NotImplementedError()
+
+
+class CategorySerializer(Serializer):
+    FIELDS = ('id', 'url', 'link', 'name', 'items', 'first_image', 'second_image', 'texts', 'seo')
+
+    @staticmethod
+    def rows(queryset) -> list:
+        return list(queryset.values_list('id', 'url', 'first_image', 'second_image'))
+
+    def serialize(self, rows: list) -> [dict]:
+        ids = [row[0] for row in rows]
+        names = resolved(catalogue_models.CategoryName, 'category', ids) if self.wants('name') else {}
+        counts = dict(catalogue_models.Item.objects.filter(category__in=ids, active=True).order_by().
+                      values_list('category').annotate(count=Count('id'))) if self.wants('items') else {}
+        category_texts = texts(catalogue_models.CategoryText, 'category', ids) if self.wants('texts') else {}
+        seo = seo_information(catalogue_models.CategorySeoInformation, 'category', ids) if self.wants('seo') else {}
+        result = []
+        for category_id, url, first_image, second_image in rows:
+            name = names.get(category_id)
+            result.append(self.select({
+                'id': category_id,
+                'url': url,
+                'link': reverse('catalogue_category', args=(url,)),
+                'name': name[0] if name is not None else '',
+                'items': counts.get(category_id, 0),
+                'first_image': file_url(media_store_storage.storage, first_image),
+                'second_image': file_url(media_store_storage.storage, second_image),
+                'texts': category_texts.get(category_id, []),
+                'seo': seo.get(category_id),
+            }))
+        return result
+
+
+class ItemSerializer(Serializer):
+    FIELDS = ('id', 'url', 'link', 'category', 'code', 'name', 'short_text', 'new', 'top', 'stock', 'pending',
+              'price', 'currency', 'prices', 'texts', 'parameters', 'images')
+
+    def __init__(self, currency: localization_models.Currency, fields: [str] = None) -> None:
+        super(ItemSerializer, self).__init__(fields)
+        self.__currency = currency
+
+    @staticmethod
+    def rows(queryset) -> list:
+        return list(queryset.values_list('id', 'url', 'category__url', 'code', 'new', 'top', 'stock', 'pending',
+                                         'default_price', 'currency'))
+
+    def serialize(self, rows: list) -> [dict]:
+        ids = [row[0] for row in rows]
+        names = resolved(catalogue_models.ItemName, 'item', ids) if self.wants('name') else {}
+        short_texts = resolved(catalogue_models.ItemShortText, 'item', ids, ('body',), has_default=False) \
+            if self.wants('short_text') else {}
+        default_prices = [(row[8], row[9]) for row in rows]
+        prices = registry.convert_prices(default_prices, self.__currency) if self.wants('price') else []
+        all_prices = {currency.short_name: registry.convert_prices(default_prices, currency)
+                      for currency in registry.currencies()} if self.wants('prices') else {}
+        item_texts = texts(catalogue_models.ItemText, 'item', ids) if self.wants('texts') else {}
+        parameters = self.__parameters(ids) if self.wants('parameters') else {}
+        images = self.__images(ids) if self.wants('images') else {}
+        result = []
+        for position, (item_id, url, category_url, code, new, top, stock, pending, default_price, currency_id) in \
+                enumerate(rows):
+            name = names.get(item_id)
+            short_text = short_texts.get(item_id)
+            result.append(self.select({
+                'id': item_id,
+                'url': url,
+                'link': reverse('catalogue_item', args=(category_url, url)),
+                'category': category_url,
+                'code': code,
+                'name': name[0] if name is not None else '',
+                'short_text': short_text[0] if short_text is not None else None,
+                'new': new,
+                'top': top,
+                'stock': stock,
+                'pending': pending,
+                'price': prices[position] if prices else None,
+                'currency': self.__currency.short_name if self.__currency is not None else None,
+                'prices': {currency_code: values[position] for currency_code, values in all_prices.items()},
+                'texts': item_texts.get(item_id, []),
+                'parameters': parameters.get(item_id, []),
+                'images': images.get(item_id, []),
+            }))
+        return result
+
+    @staticmethod
+    def __parameters(item_ids: [int]) -> {int: [dict]}:
+        rows = list(catalogue_models.ItemParameter.objects.filter(item__in=item_ids).order_by('weight').
+                    values_list('id', 'item', 'default_name', 'default_value', 'weight', 'first_image',
+                                'second_image'))
+        translations = resolved(catalogue_models.ItemParameterName, 'item_parameter', [row[0] for row in rows],
+                                ('name', 'value'), has_default=False)
+        result = {}
+        for parameter_id, item_id, default_name, default_value, weight, first_image, second_image in rows:
+            name, value = translations.get(parameter_id) or (default_name, default_value)
+            result.setdefault(item_id, []).append({
+                'name': name,
+                'value': value,
+                'weight': weight,
+                'first_image': file_url(media_store_storage.storage, first_image),
+                'second_image': file_url(media_store_storage.storage, second_image),
+            })
+        return result
+
+    @staticmethod
+    def __images(item_ids: [int]) -> {int: [dict]}:
+        result = {}
+        for image in catalogue_models.ItemImagePosition.objects.filter(item__in=item_ids, active=True).\
+                order_by('weight'):
+            result.setdefault(image.item_id, []).append({
+                'original': image.original_image,
+                'large': image.large_image,
+                'medium': image.medium_image,
+                'small': image.small_image,
+                'default': image.default,
+                'weight': image.weight,
+            })
+        return result
+
+
+class MenuSerializer(Serializer):
+    FIELDS = ('id', 'url', 'name', 'first_image', 'second_image', 'children')
+
+    def __init__(self, menu: str, fields: [str] = None) -> None:
+        super(MenuSerializer, self).__init__(fields)
+        self.__menu = menu
+
+    def rows(self) -> [menu_builder.MenuNode]:
+        """Root nodes of the menu from the per-language menu cache"""
+        return menu_builder.get_menus((self.__menu,))[self.__menu].nodes
+
+    def serialize(self, nodes: [menu_builder.MenuNode]) -> [dict]:
+        """Nested tree of the menu, or nodes in tree order if children are not requested"""
+        result = []
+        for node in nodes:
+            result.append(self.select({
+                'id': node.id,
+                'url': node.url,
+                'name': node.name,
+                'first_image': node.first_image,
+                'second_image': node.second_image,
+                'children': self.serialize(node.children) if self.wants('children') else [],
+            }))
+            if not self.wants('children'):
+                result += self.serialize(node.children)
+        return result
+
+
+class PageSerializer(Serializer):
+    FIELDS = ('id', 'name', 'link', 'texts', 'seo')
+
+    @staticmethod
+    def rows(queryset) -> list:
+        return list(queryset.values_list('id', 'name'))
+
+    def serialize(self, rows: list) -> [dict]:
+        ids = [row[0] for row in rows]
+        page_texts = texts(static_page_models.Text, 'page', ids) if self.wants('texts') else {}
+        seo = seo_information(static_page_models.SeoInformation, 'page', ids) if self.wants('seo') else {}
+        return [self.select({
+            'id': page_id,
+            'name': name,
+            'link': reverse('index_page') if name == 'index' else reverse('static_page', args=(name,)),
+            'texts': page_texts.get(page_id, []),
+            'seo': seo.get(page_id),
+        }) for page_id, name in rows]
@@ -0,0 +1,4 @@
+# Rows in one page of list endpoints, unless ?limit= asks for fewer
+PAGE_SIZE = 50
+# Largest ?limit= accepted
+MAX_PAGE_SIZE = 200
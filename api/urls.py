@@ -0,0 +1,12 @@
+from django.conf.urls import url
+from api import views as views
+
+urlpatterns = [
+     url('^v1/categories$', view=views.categories, name='api_categories'),
+     url('^v1/categories/(\w+)$', view=views.category, name='api_category'),
+     url('^v1/categories/(\w+)/items$', view=views.category_items, name='api_category_items'),
+     url('^v1/items/(\w+)$', view=views.item, name='api_item'),
+     url('^v1/menus/(main|additional|extra)$', view=views.menu, name='api_menu'),
+     url('^v1/pages$', view=views.pages, name='api_pages'),
+     url('^v1/pages/(\w+)$', view=views.static_page, name='api_page'),
+]
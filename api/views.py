@@ -0,0 +1,115 @@
+from functools import wraps
+from django.http import Http404, JsonResponse
+from django.views.decorators.http import require_GET
+import django.utils.translation as translation
+import api.serializers as api_serializers
+import api.settings as api_settings
+import catalogue.models as catalogue_models
+import localization.currency as localization_currency
+from localization.registry import registry
+import static_page.models as static_page_models
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def api_view(view):
+    """Serves data returned by the view as JSON in the language of ?language= (active language by default)
+
+    Errors are answered as {"error": message} with status 400 or 404.
+    """
+    @require_GET
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        language_code = request.GET.get('language') or translation.get_language()
+        if registry.language(language_code) is None:
+            return JsonResponse({'error': str.format('Unknown language: {0}', language_code)}, status=400)
+        with translation.override(language_code):
+            try:
+                return JsonResponse(view(request, *args, **kwargs))
+            except (BadRequest, api_serializers.InvalidFields) as error:
+                return JsonResponse({'error': str(error)}, status=400)
+            except Http404:
+                return JsonResponse({'error': 'Not found'}, status=404)
+    return wrapper
+
+
+def requested_fields(request) -> [str]:
+    """Names of ?fields=a,b,c; all fields of the resource if it is not given"""
+    return [field.strip() for field in request.GET.get('fields', '').split(',') if field.strip()]
+
+
+def requested_currency(request):
+    code = request.GET.get('currency')
+    if not code:
+        return localization_currency.get_currency(request)
+    currency = registry.currency(code)
+    if currency is None:
+        raise BadRequest(str.format('Unknown currency: {0}', code))
+    return currency
+
+
+def page(request, queryset, serializer: api_serializers.Serializer) -> dict:
+    """Rows after ?after=<id>, at most ?limit= of them; next is the cursor of the following page"""
+    try:
+        after = int(request.GET.get('after', 0))
+        limit = min(int(request.GET.get('limit', api_settings.PAGE_SIZE)), api_settings.MAX_PAGE_SIZE)
+    except ValueError:
+        raise BadRequest('after and limit must be numbers')
+    if limit < 1:
+        raise BadRequest('limit must be positive')
+    rows = serializer.rows(queryset.filter(id__gt=after).order_by('id')[:limit + 1])
+    next_cursor = rows[limit - 1][0] if rows.__len__() > limit else None
+    return {'data': serializer.serialize(rows[:limit]), 'next': next_cursor}
+
+
+def single(rows: list, serializer: api_serializers.Serializer) -> dict:
+    if rows.__len__() == 0:
+        raise Http404()
+    return {'data': serializer.serialize(rows)[0]}
+
+
+@api_view
+def categories(request):
+    return page(request, catalogue_models.Category.objects.all(),
+                api_serializers.CategorySerializer(requested_fields(request)))
+
+
+@api_view
+def category(request, url: str):
+    serializer = api_serializers.CategorySerializer(requested_fields(request))
+    return single(serializer.rows(catalogue_models.Category.objects.filter(url=url)), serializer)
+
+
+@api_view
+def category_items(request, url: str):
+    category_id = catalogue_models.Category.objects.filter(url=url).values_list('id', flat=True).first()
+    if category_id is None:
+        raise Http404()
+    return page(request, catalogue_models.Item.objects.filter(category=category_id, active=True),
+                api_serializers.ItemSerializer(requested_currency(request), requested_fields(request)))
+
+
+@api_view
+def item(request, url: str):
+    serializer = api_serializers.ItemSerializer(requested_currency(request), requested_fields(request))
+    return single(serializer.rows(catalogue_models.Item.objects.filter(url=url, active=True)), serializer)
+
+
+@api_view
+def menu(request, name: str):
+    serializer = api_serializers.MenuSerializer(name, requested_fields(request))
+    return {'data': serializer.serialize(serializer.rows())}
+
+
+@api_view
+def pages(request):
+    return page(request, static_page_models.StaticPage.objects.all(),
+                api_serializers.PageSerializer(requested_fields(request)))
+
+
+@api_view
+def static_page(request, name: str):
+    serializer = api_serializers.PageSerializer(requested_fields(request))
+    return single(serializer.rows(static_page_models.StaticPage.objects.filter(name=name)), serializer)
@@ -2,7 +2,7 @@ from datetime import datetime
 from django.contrib import admin
 from django.db.models import Max
 from django.contrib.auth import models as auth_models
-from localization import models as localization_models
+import localization.filters as localization_filters
 import banner.models as banner_models
 import image_cropping
 from django.utils.translation import ugettext_lazy as _
@@ -32,40 +32,14 @@ class BannerImagePositionFilter(SimpleListFilter):
         return queryset.filter(banner=banner_models.Banner.objects.filter(id=self.value()).first())
 
 
-class BannerImagePositionTextDataNotRealizedLanguageFilter(SimpleListFilter):
+class BannerImagePositionTextDataNotRealizedLanguageFilter(localization_filters.NotRealizedLanguageFilter):
     title = _('Realized Text Data')
 
     parameter_name = 'text_data_lang'
 
-    def lookups(self, request, model_admin) -> [(int, str)]:
-        languages = localization_models.Language.objects.all().values_list('id', 'name')
-        lookup = [('True', 'Has no unrealized languages'), ('False', 'Has unrealized languages')]
-        for lang_id, name in languages:
-            lookup.append((lang_id, name))
-        return lookup
-
-    def queryset(self, request, queryset) -> [banner_models.BannerImagePosition]:
-        if self.value() is None:
-            return queryset
-        result = []
-        if self.value() == 'True':
-            for banner_image_position in queryset:
-                if banner_image_position.check_language_for_text_data:
-                    result.append(banner_image_position.id)
-        elif self.value() == 'False':
-            for banner_image_position in queryset:
-                if not banner_image_position.check_language_for_text_data:
-                    result.append(banner_image_position.id)
-        else:
-            language = localization_models.Language.objects.filter(pk=self.value()).all().values_list('id',
-                                                                                                          flat=True)
-            if language.__len__() > 0:
-                language = language[0]
-                for banner_image_position in queryset:
-                    if language not in banner_image_position.text_data_languages_ids and \
-                                    banner_image_position.text_data_languages_ids.__len__() > 0:
-                        result.append(banner_image_position.id)
-        return queryset.filter(id__in=result)
+    translation_model = banner_models.BannerImagePositionTextData
+    owner_field = 'banner_image_position'
+    require_translations = True
 
 
 # BannerImagePosition
@@ -198,39 +172,13 @@ class LastModifiedByBannerFilter(SimpleListFilter):
         return queryset.filter(id__in=banners)
 
 
-class BannerTextDataNotRealizedLanguageFilter(SimpleListFilter):
+class BannerTextDataNotRealizedLanguageFilter(localization_filters.NotRealizedLanguageFilter):
     title = _('Not realized Text Data')
 
     parameter_name = 'text_data_lang'
 
-
-    def lookups(self, request, model_admin) -> [(int, str)]:
-        languages = localization_models.Language.objects.all().values_list('id', 'name')
-        lookup = [('True', 'Has no unrealized languages'), ('False', 'Has unrealized languages')]
-        for language_id, language_name in languages:
-            lookup.append((language_id, language_name))
-        return lookup
-
-    def queryset(self, request, queryset) -> [banner_models.Banner]:
-        if self.value() is None:
-            return queryset
-        result = []
-        if self.value() == 'True':
-            for banner in queryset:
-                if banner.check_language_for_text_data:
-                    result.append(banner.id)
-        elif self.value() == 'False':
-            for banner in queryset:
-                if not banner.check_language_for_text_data:
-                    result.append(banner.id)
-        else:
-            language = localization_models.Language.objects.filter(pk=self.value()).all().values_list('id', flat=True)
-            if language.__len__() > 0:
-                language = language[0]
-                for banner in queryset:
-                    if language not in banner.text_data_languages_ids:
-                        result.append(banner.id)
-        return queryset.filter(id__in=result)
+    translation_model = banner_models.BannerTextData
+    owner_field = 'banner'
 
 
 # Banner
@@ -5,3 +5,6 @@ from django.apps import AppConfig
 class BannerAppConfig(AppConfig):
     name = 'banner'
     verbose_name = _('Banner')
+
+    def ready(self) -> None:
+        import banner.signals
@@ -1,38 +1,54 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import models as auth_models
 from django.utils.translation import ugettext_lazy as _
-import django.utils.translation as translation
 import localization.models as localization_models
-import os
+from localization.registry import registry
+import localization.resolver as localization_resolver
+from image_cropping import ImageRatioField
+import gallery.models as gallery_models
+import gallery.renditions as gallery_renditions
+import media_store.garbage as media_store_garbage
+import media_store.storage as media_store_storage
 import neutrino.settings as settings
-import shutil
 
 
 class BannerImagePosition(models.Model):
     id = models.AutoField(primary_key=True, verbose_name=_('Id'), help_text=_('Unique identifier'))
-    image_original = models.ImageField(verbose_name=_('Original image'), help_text=_('Original image'))
-    image_large = models.ImageField(blank=True, null=True, verbose_name=_('Large image'), help_text=_('Large image'))
-    image_medium = models.ImageField(blank=True, null=True, verbose_name=_('Medium image'), help_text=_('Medium image'))
-    image_small = models.ImageField(blank=True, null=True, verbose_name=_('Small image'), help_text=_('Small image'))
+    image_original = models.ImageField(storage=media_store_storage.storage, verbose_name=_('Original image'),
+                                       help_text=_('Original image'))
+    cropping_large = ImageRatioField('image_original', settings.BANNER['large'], verbose_name=_('Large image'),
+                                     help_text=_('Large image'))
+    cropping_medium = ImageRatioField('image_original', settings.BANNER['medium'], verbose_name=_('Medium image'),
+                                      help_text=_('Medium image'))
+    cropping_small = ImageRatioField('image_original', settings.BANNER['small'], verbose_name=_('Small image'),
+                                     help_text=_('Small image'))
     weight = models.IntegerField(blank=True, verbose_name=_('Weight'), help_text=_('Used for sorting'))
     active = models.BooleanField(default=True, verbose_name=_('Is active?'),
                                  help_text=_('If checked image will be used in banner render'))
     banner = models.ForeignKey('Banner', verbose_name=_('Banner'), help_text=_('Banner, that contains this image'))
 
+    image_large = models.CharField(max_length=256, null=True, blank=True, editable=False)
+    image_medium = models.CharField(max_length=256, null=True, blank=True, editable=False)
+    image_small = models.CharField(max_length=256, null=True, blank=True, editable=False)
+    renditions = models.TextField(null=True, blank=True, editable=False,
+                                  help_text=_('Urls of thumbnails in other formats and densities'))
+    renditions_signature = models.CharField(max_length=512, null=True, blank=True, editable=False)
+    renditions_pending = models.BooleanField(default=False, editable=False, verbose_name=_('Is processing?'),
+                                             help_text=_('Thumbnails are being generated'))
+
+    RENDITION_DIMENSIONS = settings.BANNER
+
     def __str__(self) -> str:
-        lang = translation.get_language()
-        language = localization_models.Language.objects.filter(short_name=lang).values_list('id', flat=True)
-        if language.__len__() > 0:
-            language = language[0]
-            banner_image_position_text_data = BannerImagePositionTextData.objects.filter(banner_image_position=self,
-                                                                                         language=language).first()
-            if banner_image_position_text_data is not None:
-                return banner_image_position_text_data.name
-        banner_image_position_text_data = BannerImagePositionTextData.objects.filter(banner_image_position=self,
-                                                                                     default=True).first()
+        banner_image_position_text_data = localization_resolver.get_resolver().resolve(
+            BannerImagePositionTextData, 'banner_image_position', self.id, ('name', 'description'))
         if banner_image_position_text_data is None:
             return _('Image has no name').__str__()
-        return banner_image_position_text_data.name
+        return banner_image_position_text_data[0]
+
+    @classmethod
+    def prefetch_translations(cls, ids: [int]) -> None:
+        localization_resolver.get_resolver().prefetch(BannerImagePositionTextData, 'banner_image_position', ids,
+                                                      ('name', 'description'))
 
     @property
     def original_image(self) -> str:
@@ -40,22 +56,29 @@ class BannerImagePosition(models.Model):
 
     @property
     def large_image(self) -> str:
-        return str.format("/media/{0}", self.image_large)
+        """Stored thumbnail, original image while thumbnails are being generated"""
+        return gallery_renditions.stored_url(self, 'large')
 
     @property
     def medium_image(self) -> str:
-        return str.format("/media/{0}", self.image_medium)
+        return gallery_renditions.stored_url(self, 'medium')
 
     @property
     def small_image(self) -> str:
-        return str.format("/media/{0}", self.image_small)
+        return gallery_renditions.stored_url(self, 'small')
+
+    @property
+    def pictures(self) -> {str: gallery_renditions.Picture}:
+        """Thumbnails of all sizes with srcset of every format and density, by size"""
+        return gallery_renditions.pictures(self)
 
     @property
     def check_language_for_name(self) -> bool:
         """Checks if languages of text data are corresponding to languages of the website"""
-        languages = localization_models.Language.objects.all().values_list('id', flat=True)
+        languages = registry.language_ids()
+        text_data_languages_ids = self.text_data_languages_ids
         for language in languages:
-            if language not in self.text_data_languages_ids:
+            if language not in text_data_languages_ids:
                 return False
         return True
 
@@ -73,19 +96,11 @@ class BannerImagePosition(models.Model):
         return self.__str__()
 
     def description(self) -> str:
-        lang = translation.get_language()
-        language = localization_models.Language.objects.filter(short_name=lang).values_list('id', flat=True)
-        if language.__len__() > 0:
-            language = language[0]
-            banner_image_position_text_data = BannerImagePositionTextData.objects.filter(banner_image_position=self,
-                                                                                         language=language).first()
-            if banner_image_position_text_data is not None:
-                return banner_image_position_text_data.description
-        banner_image_position_text_data = BannerImagePositionTextData.objects.filter(banner_image_position=self,
-                                                                                     default=True).first()
+        banner_image_position_text_data = localization_resolver.get_resolver().resolve(
+            BannerImagePositionTextData, 'banner_image_position', self.id, ('name', 'description'))
         if banner_image_position_text_data is None:
             return _('Image has no name').__str__()
-        return banner_image_position_text_data.description
+        return banner_image_position_text_data[1]
 
     name.short_description = _('Name')
 
@@ -96,27 +111,29 @@ class BannerImagePosition(models.Model):
     original_image_admin_display.short_description = _('Original image')
 
     def large_image_admin_display(self) -> str:
-        return str.format('<img src="/media/{0}" style="width:10em" alt="Large Image: {0}"/>', self.image_large)
+        return str.format('<img src={0} style="width:10em" alt="Large Image: {1}"/>', self.large_image,
+                          self.image_original)
 
     large_image_admin_display.allow_tags = True
     large_image_admin_display.short_description = _('Large image')
 
     def medium_image_admin_display(self) -> str:
-        return str.format('<img src="/media/{0}" style="width:10em" alt="Medium Image: {0}"/>', self.image_medium)
+        return str.format('<img src={0} style="width:10em" alt="Medium Image: {1}"/>', self.medium_image,
+                          self.image_original)
 
     medium_image_admin_display.allow_tags = True
     medium_image_admin_display.short_description = _('Medium image')
 
     def small_image_admin_display(self) -> str:
-        return str.format('<img src="/media/{0}" style="width:10em" alt="Small Image: {0}"/>', self.image_small)
+        return str.format('<img src={0} style="width:10em" alt="Small Image: {1}"/>', self.small_image,
+                          self.image_original)
 
     small_image_admin_display.allow_tags = True
     small_image_admin_display.short_description = _('Small image')
 
     def check_language_for_text_data_admin_display(self) -> str:
         """Checks if languages of text data are corresponding to languages of the website"""
-        unrealized_languages = localization_models.Language.objects.exclude(
-            id__in=self.text_data_languages_ids).all().values_list('name', flat=True)
+        unrealized_languages = registry.unrealized_languages_names(self.text_data_languages_ids)
         languages__str = "<br/>".join(unrealized_languages)
         if unrealized_languages.__len__() > 0:
             return str.format(
@@ -131,29 +148,10 @@ class BannerImagePosition(models.Model):
 
     def save(self, force_insert: bool = False, force_update: bool = False, using=None,
              update_fields=None) -> None:
-        for field in self._meta.fields:
-            if field.name == 'image_original':
-                field.upload_to = str.format('banner/{0}/images/{1}/original/', self.banner.id,
-                                             self.image_original.__str__()[0:self.image_original.__str__().index('.')])
-            elif field.name == 'image_large':
-                field.upload_to = str.format('banner/{0}/images/{1}/large/', self.banner.id,
-                                             self.image_original.__str__()[0:self.image_original.__str__().index('.')])
-            elif field.name == 'image_medium':
-                field.upload_to = str.format('banner/{0}/images/{1}/medium/', self.banner.id,
-                                             self.image_original.__str__()[0:self.image_original.__str__().index('.')])
-            elif field.name == 'image_small':
-                field.upload_to = str.format('banner/{0}/images/{1}/small/', self.banner.id,
-                                             self.image_original.__str__()[0:self.image_original.__str__().index('.')])
-        super(BannerImagePosition, self).save()
-
-    def delete(self, using=None):
-        path = os.path.join(settings.BASE_DIR, settings.MEDIA_ROOT,
-                            self.image_original.__str__()[0:self.image_original.__str__().rfind('/original')])
-        try:
-            shutil.rmtree(path)
-            super(BannerImagePosition, self).delete()
-        except Exception:
-            pass
+        super(BannerImagePosition, self).save(force_insert, force_update, using, update_fields)
+        # Thumbnails are generated by process_thumbnails command
+        if update_fields is None and gallery_renditions.mark_pending(self):
+            gallery_models.RenditionJob.enqueue(self)
 
     class Meta:
         db_table = 'banner_banner_image_positions'
@@ -166,23 +164,16 @@ class Banner(models.Model):
     marker = models.CharField(max_length=256, verbose_name=_('Marker'), help_text=_('Marker'))
 
     def __str__(self) -> str:
-        lang = translation.get_language()
-        language = localization_models.Language.objects.filter(short_name=lang).values_list('id', flat=True)
-        if language.__len__() > 0:
-            language = language[0]
-            banner_text_data = BannerTextData.objects.filter(banner=self, language=language).first()
-            if banner_text_data is not None:
-                return banner_text_data.name
-        banner_text_data = BannerTextData.objects.filter(banner=self, default=True).first()
-        return banner_text_data.name
+        banner_text_data = localization_resolver.get_resolver().resolve(BannerTextData, 'banner', self.id)
+        if banner_text_data is None:
+            return ''
+        return banner_text_data[0]
 
     def delete(self, using=None):
-        path = os.path.join(settings.BASE_DIR, settings.MEDIA_ROOT, str.format('banner/{0}', self.id))
-        try:
-            shutil.rmtree(path)
-            super(Banner, self).delete()
-        except Exception:
-            pass
+        # Files are removed by sweep_media once the deletion is committed
+        with transaction.atomic(using=using):
+            media_store_garbage.collect(str.format('banner/{0}', self.id))
+            super(Banner, self).delete(using)
 
     def name(self) -> str:
         return self.__str__()
@@ -215,8 +206,7 @@ class Banner(models.Model):
 
     def check_language_for_text_data_admin_display(self) -> str:
         """Checks if languages of text data are corresponding to languages of the website"""
-        unrealized_languages = localization_models.Language.objects.exclude(
-            id__in=self.text_data_languages_ids).all().values_list('name', flat=True)
+        unrealized_languages = registry.unrealized_languages_names(self.text_data_languages_ids)
         languages__str = "<br/>".join(unrealized_languages)
         if unrealized_languages.__len__() > 0:
             return str.format(
@@ -232,7 +222,7 @@ class Banner(models.Model):
     @property
     def check_language_for_text_data(self) -> bool:
         """Checks if languages of text data are corresponding to languages of the website"""
-        languages = localization_models.Language.objects.all().values_list('id', flat=True)
+        languages = registry.language_ids()
         text_languages = self.text_data_languages_ids
         for language in languages:
             if language not in text_languages:
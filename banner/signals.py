@@ -0,0 +1,20 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+import banner.models as banner_models
+import media_store.references as media_store_references
+import neutrino.chrome as chrome
+
+
+@receiver(post_save, sender=banner_models.Banner)
+@receiver(post_delete, sender=banner_models.Banner)
+@receiver(post_save, sender=banner_models.BannerTextData)
+@receiver(post_delete, sender=banner_models.BannerTextData)
+@receiver(post_save, sender=banner_models.BannerImagePosition)
+@receiver(post_delete, sender=banner_models.BannerImagePosition)
+@receiver(post_save, sender=banner_models.BannerImagePositionTextData)
+@receiver(post_delete, sender=banner_models.BannerImagePositionTextData)
+def invalidate_banners(sender, **kwargs) -> None:
+    chrome.invalidate(chrome.BANNER)
+
+
+media_store_references.track(banner_models.BannerImagePosition, 'image_original')
@@ -11,8 +11,9 @@ from django.core.exceptions import ValidationError
 import image_cropping
 from django.contrib.admin import SimpleListFilter
 import localization.models as localization_models
+import localization.annotations as localization_annotations
+import localization.filters as localization_filters
 import tabbed_admin
-from django.core.cache import cache
 import collections
 
 
@@ -105,98 +106,32 @@ class CategoryTextFilter(SimpleListFilter):
         return queryset.filter(category=catalogue_models.Category.objects.filter(pk=self.value()).first())
 
 
-class CategorySeoInformationNotRealizedLanguageFilter(SimpleListFilter):
+class CategorySeoInformationNotRealizedLanguageFilter(localization_filters.NotRealizedLanguageFilter):
     title = _('Unrealized SEO information')
 
     parameter_name = 'seo_lang'
 
-    def lookups(self, request, model_admin) -> [(int, str)]:
-        languages = localization_models.Language.objects.all().values_list('id', 'name')
-        lookup = [('True', 'Has no unrealized languages'), ('False', 'Has unrealized languages')]
-        for lang_id, name in languages:
-            lookup.append((lang_id, name))
-        return lookup
-
-    def queryset(self, request, queryset) -> [catalogue_models.Category]:
-        if self.value() is None:
-            return queryset
-        result = []
-        if self.value() == 'True':
-            for category in queryset:
-                if category.check_language_for_seo_information:
-                    result.append(category.id)
-        elif self.value() == 'False':
-            for category in queryset:
-                if not category.check_language_for_seo_information:
-                    result.append(category.id)
-        else:
-            for category in queryset:
-                language = localization_models.Language.objects.filter(pk=self.value()).all().values_list('id',
-                                                                                                          flat=True)
-                if language.__len__() > 0:
-                    language = language[0]
-                    if language not in category.seo_information_languages_ids:
-                        result.append(category.id)
-        return queryset.filter(id__in=result)
+    translation_model = catalogue_models.CategorySeoInformation
+    owner_field = 'category'
 
 
-class CategoryTextNotRealizedLanguageFilter(SimpleListFilter):
+class CategoryTextNotRealizedLanguageFilter(localization_filters.NotRealizedLanguageFilter):
     title = _('Unrealized Texts')
 
     parameter_name = 'text_lang'
 
-    def lookups(self, request, model_admin) -> [(int, str)]:
-        languages = localization_models.Language.objects.all().values_list('id', 'name')
-        lookup = [('True', 'Has no unrealized languages'), ('False', 'Has unrealized languages')]
-        for lang_id, name in languages:
-            lookup.append((lang_id, name))
-        return lookup
+    translation_model = catalogue_models.CategoryText
+    owner_field = 'category'
 
-    def queryset(self, request, queryset) -> [catalogue_models.Category]:
-        if self.value() is None:
-            return queryset
-        result = []
-        if self.value() == 'True':
-            for category in queryset:
-                if category.check_language_for_text:
-                    result.append(category.id)
-        elif self.value() == 'False':
-            for category in queryset:
-                if not category.check_language_for_text:
-                    result.append(category.id)
-        else:
-            for category in queryset:
-                language = localization_models.Language.objects.filter(pk=self.value()).all().values_list('id',
-                                                                                                          flat=True)
-                if language.__len__() > 0:
-                    language = language[0]
-                    if language not in category.text_languages_ids:
-                        result.append(category.id)
-        return queryset.filter(id__in=result)
 
-
-class CategoryNotRealizedLanguageFilter(SimpleListFilter):
+class CategoryNotRealizedLanguageFilter(localization_filters.MatchingLanguagesFilter):
     title = _('Realized Languages')
 
     parameter_name = 'category_lang'
 
-    def lookups(self, request, model_admin) -> [(str, str)]:
-        return [('False', 'Has unrealized languages'),
-                ('True', 'Has no unrealized languages')]
-
-    def queryset(self, request, queryset) -> [catalogue_models.Category]:
-        if self.value() is None:
-            return queryset
-        result = []
-        if self.value() == 'False':
-            for category in queryset:
-                if not category.check_language:
-                    result.append(category.id)
-        elif self.value() == 'True':
-            for category in queryset:
-                if category.check_language:
-                    result.append(category.id)
-        return queryset.filter(id__in=result)
+    first_model = catalogue_models.CategoryText
+    second_model = catalogue_models.CategorySeoInformation
+    owner_field = 'category'
 
 
 class CategorySeoInformationInline(admin.StackedInline):
@@ -304,6 +239,18 @@ class CategoryAdmin(tabbed_admin.TabbedModelAdmin):
 
     # search_fields = ['name', ]
 
+    def get_queryset(self, request):
+        """Labels and languages of translations of listed rows come with the rows instead of a query per column"""
+        queryset = super(CategoryAdmin, self).get_queryset(request).select_related(
+            'categorydatetimeuserlabel__author', 'categorydatetimeuserlabel__last_editor')
+        return localization_annotations.annotate_languages(queryset, {
+            'text_languages': (catalogue_models.CategoryText, 'category'),
+            'seo_information_languages': (catalogue_models.CategorySeoInformation, 'category'),
+        })
+
+    def get_changelist(self, request, **kwargs):
+        return localization_annotations.TranslatedChangeList
+
     def save_model(self, request, obj, form, change) -> None:
         if change:
             date_time_user_label = catalogue_models.CategoryDateTimeUserLabel.objects.filter(
@@ -319,7 +266,6 @@ class CategoryAdmin(tabbed_admin.TabbedModelAdmin):
             date_time_user_label.category = obj
             date_time_user_label.author = request.user
             date_time_user_label.save()
-        cache.clear()
         form.save()
 
     actions = ['delete_model']
@@ -442,131 +388,41 @@ class ItemTextFilter(SimpleListFilter):
         return queryset.filter(item=catalogue_models.Item.objects.filter(pk=self.value()).first())
 
 
-class ItemSeoInformationNotRealizedLanguageFilter(SimpleListFilter):
+class ItemSeoInformationNotRealizedLanguageFilter(localization_filters.NotRealizedLanguageFilter):
     title = _('Realized SEO information')
 
     parameter_name = 'seo_lang'
 
-    def lookups(self, request, model_admin) -> [(int, str)]:
-        languages = localization_models.Language.objects.all().values_list('id', 'name')
-        lookup = [('True', 'Has no unrealized languages'), ('False', 'Has unrealized languages')]
-        for lang_id, name in languages:
-            lookup.append((lang_id, name))
-        return lookup
-
-    def queryset(self, request, queryset) -> [catalogue_models.Item]:
-        if self.value() is None:
-            return queryset
-        result = []
-        if self.value() == 'True':
-            for item in queryset:
-                if item.check_language_for_seo_information:
-                    result.append(item.id)
-        elif self.value() == 'False':
-            for item in queryset:
-                if not item.check_language_for_seo_information:
-                    result.append(item.id)
-        else:
-            language = localization_models.Language.objects.filter(pk=self.value()).all().values_list('id',
-                                                                                                      flat=True)
-            if language.__len__() > 0:
-                language = language[0]
-                for item in queryset:
-                    if language not in item.seo_information_languages_ids:
-                        result.append(item.id)
-        return queryset.filter(id__in=result)
+    translation_model = catalogue_models.ItemSeoInformation
+    owner_field = 'item'
 
 
-class ItemTextNotRealizedLanguageFilter(SimpleListFilter):
+class ItemTextNotRealizedLanguageFilter(localization_filters.NotRealizedLanguageFilter):
     title = _('Realized Texts')
 
     parameter_name = 'text_lang'
 
-    def lookups(self, request, model_admin) -> [(int, str)]:
-        languages = localization_models.Language.objects.all().values_list('id', 'name')
-        lookup = [('True', 'Has no unrealized languages'), ('False', 'Has unrealized languages')]
-        for lang_id, name in languages:
-            lookup.append((lang_id, name))
-        return lookup
+    translation_model = catalogue_models.ItemText
+    owner_field = 'item'
 
-    def queryset(self, request, queryset) -> [catalogue_models.Item]:
-        if self.value() is None:
-            return queryset
-        result = []
-        if self.value() == 'True':
-            for item in queryset:
-                if item.check_language_for_text:
-                    result.append(item.id)
-        elif self.value() == 'False':
-            for item in queryset:
-                if not item.check_language_for_text:
-                    result.append(item.id)
-        else:
-            language = localization_models.Language.objects.filter(pk=self.value()).all().values_list('id', flat=True)
-            if language.__len__() > 0:
-                language = language[0]
-                for item in queryset:
-                    if language not in item.text_languages_ids:
-                        result.append(item.id)
-        return queryset.filter(id__in=result)
 
-
-class ItemShortTextNotRealizedLanguageFilter(SimpleListFilter):
+class ItemShortTextNotRealizedLanguageFilter(localization_filters.NotRealizedLanguageFilter):
     title = _('Realized Short Texts')
 
     parameter_name = 'short_text_lang'
 
-    def lookups(self, request, model_admin) -> [(int, str)]:
-        languages = localization_models.Language.objects.all().values_list('id', 'name')
-        lookup = [('True', 'Has no unrealized languages'), ('False', 'Has unrealized languages')]
-        for lang_id, name in languages:
-            lookup.append((lang_id, name))
-        return lookup
-
-    def queryset(self, request, queryset) -> [catalogue_models.Item]:
-        if self.value() is None:
-            return queryset
-        result = []
-        if self.value() == 'True':
-            for item in queryset:
-                if item.check_language_for_text:
-                    result.append(item.id)
-        elif self.value() == 'False':
-            for item in queryset:
-                if not item.check_language_for_text:
-                    result.append(item.id)
-        else:
-            language = localization_models.Language.objects.filter(pk=self.value()).all().values_list('id', flat=True)
-            if language.__len__() > 0:
-                language = language[0]
-                for item in queryset:
-                    if language not in item.text_languages_ids:
-                        result.append(item.id)
-        return queryset.filter(id__in=result)
+    translation_model = catalogue_models.ItemShortText
+    owner_field = 'item'
 
 
-class ItemNotRealizedLanguageFilter(SimpleListFilter):
+class ItemNotRealizedLanguageFilter(localization_filters.MatchingLanguagesFilter):
     title = _('Realized Languages')
 
     parameter_name = 'category_lang'
 
-    def lookups(self, request, model_admin) -> [(str, str)]:
-        return [('False', 'Has unrealized languages'),
-                ('True', 'Has no unrealized languages')]
-
-    def queryset(self, request, queryset) -> [catalogue_models.Item]:
-        if self.value() is None:
-            return queryset
-        result = []
-        if self.value() == 'False':
-            for item in queryset:
-                if not item.check_language:
-                    result.append(item.id)
-        elif self.value() == 'True':
-            for item in queryset:
-                if item.check_language:
-                    result.append(item.id)
-        return queryset.filter(id__in=result)
+    first_model = catalogue_models.ItemText
+    second_model = catalogue_models.ItemSeoInformation
+    owner_field = 'item'
 
 
 # TODO Optimize this
@@ -842,6 +698,19 @@ class ItemAdmin(tabbed_admin.TabbedModelAdmin):
 
     # search_fields = ['name', ]
 
+    def get_queryset(self, request):
+        """Labels and languages of translations of listed rows come with the rows instead of a query per column"""
+        queryset = super(ItemAdmin, self).get_queryset(request).select_related(
+            'itemdatetimeuserlabel__author', 'itemdatetimeuserlabel__last_editor')
+        return localization_annotations.annotate_languages(queryset, {
+            'text_languages': (catalogue_models.ItemText, 'item'),
+            'short_text_languages': (catalogue_models.ItemShortText, 'item'),
+            'seo_information_languages': (catalogue_models.ItemSeoInformation, 'item'),
+        })
+
+    def get_changelist(self, request, **kwargs):
+        return localization_annotations.TranslatedChangeList
+
     def save_model(self, request, obj, form, change) -> None:
         if change:
             date_time_user_label = catalogue_models.ItemDateTimeUserLabel.objects.filter(
@@ -857,7 +726,6 @@ class ItemAdmin(tabbed_admin.TabbedModelAdmin):
             date_time_user_label.item = obj
             date_time_user_label.author = request.user
             date_time_user_label.save()
-        cache.clear()
         form.save()
 
     actions = ['delete_model']
@@ -5,3 +5,6 @@ from django.apps import AppConfig
 class CatalogueAppConfig(AppConfig):
     name = 'catalogue'
     verbose_name = _('Catalogue')
+
+    def ready(self) -> None:
+        import catalogue.signals
@@ -0,0 +1,488 @@
+import csv
+import json
+import os
+from django.contrib.auth import models as auth_models
+from django.core.files import File
+from django.db import IntegrityError, transaction
+from django.dispatch import Signal
+from django.utils import timezone
+import catalogue.facets as catalogue_facets
+import catalogue.models as catalogue_models
+import gallery.models as gallery_models
+from localization.registry import registry
+import media_store.references as media_store_references
+from media_store.storage import storage
+import neutrino.cache as neutrino_cache
+
+
+# Record of one item, the same for JSONL lines and CSV rows:
+# {url, code, category (url), template (name), default_language, price, currency, active, new, top, stock, pending,
+#  names: {language: name}, short_texts: {language: body}, texts: [{language, name, body, weight}],
+#  seo: {language: {title, meta_keywords, ...}}, parameters: [{name, value, weight, names: {language: {name, value}}}],
+#  images: [{path, weight, default, active}]}
+FIELDS = ('url', 'code', 'category', 'template', 'default_language', 'price', 'currency', 'active', 'new', 'top',
+          'stock', 'pending')
+FLAGS = ('active', 'new', 'top', 'stock', 'pending')
+# Translated fields are '<field>:<language>' columns in CSV
+TRANSLATED = {'name': 'names', 'short_text': 'short_texts'}
+# Nested collections are stored as JSON in CSV cells
+COLLECTIONS = ('texts', 'seo', 'parameters', 'images')
+SEO_FIELDS = ('title', 'meta_keywords', 'meta_description', 'meta_robots', 'meta_canonical', 'h1')
+ITEM_COLUMNS = ('code', 'category_id', 'template_id', 'default_language_id', 'default_price', 'currency_id') + FLAGS
+
+
+class InvalidRecord(Exception):
+    pass
+
+
+# Sent after each imported batch, items were written in bulk and no model signals were sent for them
+items_imported = Signal(providing_args=['item_ids'])
+
+
+# Formats
+def decode(value: str, what: str):
+    """Parsed JSON; malformed JSON is returned as InvalidRecord, so one bad line does not stop the import"""
+    try:
+        return json.loads(value)
+    except ValueError as e:
+        return InvalidRecord(str.format('Invalid JSON in {0}: {1}', what, e))
+
+
+def read_jsonl(stream):
+    """Yields (line number, record) pairs, record is InvalidRecord if the line can not be read"""
+    for number, line in enumerate(stream, 1):
+        if line.strip():
+            record = decode(line, 'line')
+            if not isinstance(record, (dict, InvalidRecord)):
+                record = InvalidRecord('Record must be a JSON object')
+            yield number, record
+
+
+def read_csv(stream):
+    for number, row in enumerate(csv.DictReader(stream), 2):
+        record = {}
+        for column, value in row.items():
+            if value is None or value == '':
+                continue
+            if column in FIELDS:
+                record[column] = value
+            elif column in COLLECTIONS:
+                record[column] = decode(value, column)
+                if isinstance(record[column], InvalidRecord):
+                    record = record[column]
+                    break
+            elif ':' in column and column.split(':', 1)[0] in TRANSLATED:
+                field, language = column.split(':', 1)
+                record.setdefault(TRANSLATED[field], {})[language] = value
+        yield number, record
+
+
+def write_jsonl(records, stream) -> None:
+    for record in records:
+        stream.write(json.dumps(record, ensure_ascii=False, sort_keys=True))
+        stream.write('\n')
+
+
+def csv_columns() -> [str]:
+    columns = list(FIELDS)
+    for field in TRANSLATED.keys():
+        columns += [str.format('{0}:{1}', field, language.short_name) for language in registry.languages()]
+    return columns + list(COLLECTIONS)
+
+
+def write_csv(records, stream) -> None:
+    writer = csv.DictWriter(stream, csv_columns(), extrasaction='ignore')
+    writer.writeheader()
+    for record in records:
+        row = {field: record.get(field) for field in FIELDS}
+        for field, key in TRANSLATED.items():
+            for language, value in record.get(key, {}).items():
+                row[str.format('{0}:{1}', field, language)] = value
+        for field in COLLECTIONS:
+            if record.get(field):
+                row[field] = json.dumps(record[field], ensure_ascii=False, sort_keys=True)
+        writer.writerow(row)
+
+
+def to_bool(value) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes', 'on')
+    return bool(value)
+
+
+# Export
+def export_records(category_id: int = None, chunk: int = 1000):
+    """Yields records of items ordered by id, reading the catalogue chunk by chunk"""
+    categories = dict(catalogue_models.Category.objects.values_list('id', 'url'))
+    templates = dict(catalogue_models.ItemTemplate.objects.values_list('id', 'name'))
+    items = catalogue_models.Item.objects.order_by('id')
+    if category_id is not None:
+        items = items.filter(category=category_id)
+    last_id = 0
+    while True:
+        rows = list(items.filter(id__gt=last_id).values_list('id', 'url', *ITEM_COLUMNS)[:chunk])
+        if rows.__len__() == 0:
+            return
+        last_id = rows[-1][0]
+        for record in chunk_records(rows, categories, templates):
+            yield record
+
+
+def language_name(language_id: int) -> str:
+    language = registry.language_by_id(language_id)
+    return language.short_name if language is not None else None
+
+
+def chunk_records(rows: [tuple], categories: {int: str}, templates: {int: str}) -> [dict]:
+    records = {}
+    for row in rows:
+        values = dict(zip(ITEM_COLUMNS, row[2:]))
+        currency = registry.currency_by_id(values['currency_id'])
+        record = {
+            'url': row[1],
+            'code': values['code'],
+            'category': categories.get(values['category_id']),
+            'template': templates.get(values['template_id']),
+            'default_language': language_name(values['default_language_id']),
+            'price': values['default_price'],
+            'currency': currency.short_name if currency is not None else None,
+            'names': {}, 'short_texts': {}, 'texts': [], 'seo': {}, 'parameters': [], 'images': [],
+        }
+        for flag in FLAGS:
+            record[flag] = values[flag]
+        records[row[0]] = record
+    item_ids = list(records.keys())
+    for item_id, language_id, name in catalogue_models.ItemName.objects.filter(item_id__in=item_ids).\
+            values_list('item_id', 'language_id', 'name'):
+        records[item_id]['names'][language_name(language_id)] = name
+    for item_id, language_id, body in catalogue_models.ItemShortText.objects.filter(item_id__in=item_ids).\
+            values_list('item_id', 'language_id', 'body'):
+        records[item_id]['short_texts'][language_name(language_id)] = body
+    for item_id, language_id, name, body, weight in catalogue_models.ItemText.objects.\
+            filter(item_id__in=item_ids).order_by('weight', 'id').\
+            values_list('item_id', 'language_id', 'name', 'body', 'weight'):
+        records[item_id]['texts'].append({'language': language_name(language_id), 'name': name, 'body': body,
+                                          'weight': weight})
+    for row in catalogue_models.ItemSeoInformation.objects.filter(item_id__in=item_ids).\
+            values_list('item_id', 'language_id', *SEO_FIELDS):
+        records[row[0]]['seo'][language_name(row[1])] = dict(zip(SEO_FIELDS, row[2:]))
+    parameters = {}
+    for parameter_id, item_id, name, value, weight in catalogue_models.ItemParameter.objects.\
+            filter(item_id__in=item_ids).order_by('weight', 'id').\
+            values_list('id', 'item_id', 'default_name', 'default_value', 'weight'):
+        parameters[parameter_id] = {'name': name, 'value': value, 'weight': weight, 'names': {}}
+        records[item_id]['parameters'].append(parameters[parameter_id])
+    for parameter_id, language_id, name, value in catalogue_models.ItemParameterName.objects.\
+            filter(item_parameter_id__in=parameters.keys()).\
+            values_list('item_parameter_id', 'language_id', 'name', 'value'):
+        parameters[parameter_id]['names'][language_name(language_id)] = {'name': name, 'value': value}
+    for item_id, path, weight, default, active in catalogue_models.ItemImagePosition.objects.\
+            filter(item_id__in=item_ids).order_by('weight', 'id').\
+            values_list('item_id', 'image_original', 'weight', 'default', 'active'):
+        records[item_id]['images'].append({'path': path, 'weight': weight, 'default': default, 'active': active})
+    return [records[item_id] for item_id in item_ids]
+
+
+# Import
+def sync_rows(model, owner_field: str, owner_ids: [int], keys: (str,), values: (str,),
+              rows: {tuple: tuple}) -> ([tuple], {int}):
+    """Makes rows of the model belonging to the owners equal to given {key: values}, touching only differences.
+
+    The first key is the owner. Returns keys of created rows and ids of owners whose rows were created, updated or
+    deleted.
+    """
+    if owner_ids.__len__() == 0:
+        return [], set()
+    existing = {}
+    for row in model.objects.filter(**{owner_field + '__in': owner_ids}).values_list('id', *(keys + values)):
+        existing[tuple(row[1:keys.__len__() + 1])] = (row[0], tuple(row[keys.__len__() + 1:]))
+    created = []
+    changed = set()
+    for key, row_values in rows.items():
+        current = existing.pop(key, None)
+        if current is None:
+            created.append(model(**dict(zip(keys + values, key + row_values))))
+            changed.add(key[0])
+        elif current[1] != row_values:
+            model.objects.filter(id=current[0]).update(**dict(zip(values, row_values)))
+            changed.add(key[0])
+    if existing.__len__() > 0:
+        # Queryset delete still sends pre/post_delete for every row while receivers are connected, so removed rows
+        # release their media and invalidate caches
+        model.objects.filter(id__in=[row_id for row_id, row_values in existing.values()]).delete()
+        changed.update(key[0] for key in existing.keys())
+    model.objects.bulk_create(created)
+    return [tuple(getattr(row, field) for field in keys) for row in created], changed
+
+
+def owned_rows(prepared: {str: (int, dict)}, item_ids: {str: int}, key: str) -> ([int], {tuple: tuple}):
+    """Ids of items whose records have the collection and its rows keyed by (item id, ...)"""
+    owners = []
+    rows = {}
+    for url, (number, data) in prepared.items():
+        if key in data:
+            owners.append(item_ids[url])
+            for row_key, row_values in data[key].items():
+                rows[(item_ids[url],) + (row_key if isinstance(row_key, tuple) else (row_key,))] = row_values
+    return owners, rows
+
+
+class CatalogueImporter:
+    """Creates and updates items from records in batches.
+
+    Items are matched by url. Collections missing in a record are left as they are, present ones replace stored rows.
+    Rows are written with bulk operations, so caches are invalidated and indexes updated once per run, and thumbnails
+    of new images are queued for process_thumbnails command.
+    """
+
+    def __init__(self, author: auth_models.User, images_dir: str = '', batch_size: int = 500) -> None:
+        self.__author = author
+        self.__images_dir = images_dir
+        self.__batch_size = batch_size
+        self.__categories = dict(catalogue_models.Category.objects.values_list('url', 'id'))
+        self.__templates = dict(catalogue_models.ItemTemplate.objects.values_list('name', 'id'))
+        self.__stored_images = {}
+        self.__item_ids = set()
+        self.__category_ids = set()
+        self.__created = 0
+        self.__updated = 0
+        self.__errors = []
+
+    @property
+    def created(self) -> int:
+        return self.__created
+
+    @property
+    def updated(self) -> int:
+        return self.__updated
+
+    @property
+    def errors(self) -> [(int, str)]:
+        """(line number, message) pairs of skipped records"""
+        return self.__errors
+
+    def run(self, records) -> None:
+        """Imports (line number, record) pairs; records that can not be read are InvalidRecord errors"""
+        try:
+            batch = []
+            for number, record in records:
+                if isinstance(record, InvalidRecord):
+                    self.__errors.append((number, str.format('{0}: {1}', type(record).__name__, record)))
+                    continue
+                batch.append((number, record))
+                if batch.__len__() >= self.__batch_size:
+                    self.__import_batch(batch)
+                    batch = []
+            if batch.__len__() > 0:
+                self.__import_batch(batch)
+        finally:
+            # Batches committed before a failure are reindexed and invalidated all the same
+            self.__finish()
+
+    def __language_id(self, short_name: str) -> int:
+        language = registry.language(short_name)
+        if language is None:
+            raise InvalidRecord(str.format('Unknown language {0}', short_name))
+        return language.id
+
+    def __store_image(self, path: str) -> str:
+        """Name of the image in media store; files already stored are only hashed once per run"""
+        if path not in self.__stored_images:
+            if storage.is_blob(path) and storage.exists(path):
+                self.__stored_images[path] = path
+            else:
+                try:
+                    with open(os.path.join(self.__images_dir, path), 'rb') as image:
+                        self.__stored_images[path] = storage.save(os.path.basename(path), File(image))
+                except IOError as e:
+                    raise InvalidRecord(str.format('Image {0} can not be read: {1}', path, e))
+        return self.__stored_images[path]
+
+    def __item_values(self, record: dict) -> dict:
+        for field in ('url', 'category', 'template', 'default_language'):
+            if not record.get(field):
+                raise InvalidRecord(str.format('Field {0} is required', field))
+        if record['category'] not in self.__categories:
+            raise InvalidRecord(str.format('Unknown category {0}', record['category']))
+        if record['template'] not in self.__templates:
+            raise InvalidRecord(str.format('Unknown template {0}', record['template']))
+        currency_id = None
+        if record.get('currency'):
+            currency = registry.currency(record['currency'])
+            if currency is None:
+                raise InvalidRecord(str.format('Unknown currency {0}', record['currency']))
+            currency_id = currency.id
+        try:
+            price = float(record['price']) if record.get('price') not in (None, '') else None
+        except ValueError:
+            raise InvalidRecord(str.format('Invalid price {0}', record['price']))
+        values = {
+            'code': record.get('code') or None,
+            'category_id': self.__categories[record['category']],
+            'template_id': self.__templates[record['template']],
+            'default_language_id': self.__language_id(record['default_language']),
+            'default_price': price,
+            'currency_id': currency_id,
+        }
+        for flag in FLAGS:
+            values[flag] = to_bool(record[flag]) if flag in record else flag == 'active'
+        return values
+
+    def __prepare(self, record: dict) -> dict:
+        """Validates the record, resolving languages and storing images, before anything is written"""
+        prepared = {'values': self.__item_values(record)}
+        default_language_id = prepared['values']['default_language_id']
+        if 'names' in record:
+            prepared['names'] = {self.__language_id(language): (name, self.__language_id(language) ==
+                                                                default_language_id)
+                                 for language, name in record['names'].items()}
+        if 'short_texts' in record:
+            prepared['short_texts'] = {self.__language_id(language): (body,)
+                                       for language, body in record['short_texts'].items()}
+        if 'texts' in record:
+            prepared['texts'] = {(self.__language_id(text['language']), text['name']): (text['body'],
+                                                                                     int(text.get('weight') or 0))
+                                 for text in record['texts']}
+        if 'seo' in record:
+            prepared['seo'] = {self.__language_id(language): tuple(seo.get(field) or None for field in SEO_FIELDS)
+                               for language, seo in record['seo'].items()}
+        if 'parameters' in record:
+            prepared['parameters'] = {}
+            prepared['parameter_names'] = {}
+            for weight, parameter in enumerate(record['parameters']):
+                prepared['parameters'][(parameter['name'],)] = (parameter['value'],
+                                                                int(parameter.get('weight', weight) or 0))
+                for language, name in parameter.get('names', {}).items():
+                    prepared['parameter_names'][(parameter['name'], self.__language_id(language))] = \
+                        (name['name'], name['value'])
+        if 'images' in record:
+            prepared['images'] = {}
+            for weight, image in enumerate(record['images']):
+                prepared['images'][(self.__store_image(image['path']),)] = \
+                    (int(image.get('weight', weight) or 0), to_bool(image.get('default', weight == 0)),
+                     to_bool(image.get('active', True)))
+        return prepared
+
+    def __import_batch(self, batch: [(int, dict)]) -> None:
+        prepared = {}
+        for number, record in batch:
+            try:
+                prepared[record.get('url')] = (number, self.__prepare(record))
+            except (InvalidRecord, KeyError, TypeError, ValueError) as e:
+                self.__errors.append((number, str.format('{0}: {1}', type(e).__name__, e)))
+        if prepared.__len__() == 0:
+            return
+        try:
+            with transaction.atomic():
+                item_ids = self.__write_batch(prepared)
+        except IntegrityError:
+            # A conflicting record (e.g. a name used by another item) rolls back the whole batch, so records are
+            # written one by one to import the rest and to report the conflicting ones
+            item_ids = []
+            for url, (number, data) in prepared.items():
+                try:
+                    with transaction.atomic():
+                        item_ids += self.__write_batch({url: (number, data)})
+                except IntegrityError as e:
+                    self.__errors.append((number, str.format('IntegrityError: {0}', e)))
+        if item_ids.__len__() > 0:
+            items_imported.send(sender=CatalogueImporter, item_ids=item_ids)
+
+    def __write_batch(self, prepared: {str: (int, dict)}) -> [int]:
+        """Writes prepared records; returns ids of their items"""
+        now = timezone.now()
+        existing = {}
+        for row in catalogue_models.Item.objects.filter(url__in=prepared.keys()).values_list('url', 'id',
+                                                                                              *ITEM_COLUMNS):
+            existing[row[0]] = (row[1], row[2:])
+        new_items = []
+        updated_ids = []
+        for url, (number, data) in prepared.items():
+            values = data['values']
+            base_price = catalogue_models.Item.compute_base_price(values['default_price'], values['currency_id'])
+            if url not in existing:
+                new_items.append(catalogue_models.Item(url=url, base_price=base_price, **values))
+                continue
+            item_id, current = existing[url]
+            if current != tuple(values[column] for column in ITEM_COLUMNS):
+                catalogue_models.Item.objects.filter(id=item_id).update(base_price=base_price, **values)
+                # Item moved to another category disappears from the listing of the previous one
+                self.__category_ids.add(current[ITEM_COLUMNS.index('category_id')])
+                updated_ids.append(item_id)
+        catalogue_models.Item.objects.bulk_create(new_items)
+        item_ids = dict(catalogue_models.Item.objects.filter(url__in=prepared.keys()).values_list('url', 'id'))
+        created_ids = [item_ids[item.url] for item in new_items]
+        catalogue_models.ItemDateTimeUserLabel.objects.bulk_create(
+            [catalogue_models.ItemDateTimeUserLabel(item_id=item_id, creating_date=now, author=self.__author)
+             for item_id in created_ids])
+
+        changed_ids = set(updated_ids)
+        owners, names = owned_rows(prepared, item_ids, 'names')
+        changed_ids |= sync_rows(catalogue_models.ItemName, 'item_id', owners, ('item_id', 'language_id'),
+                                 ('name', 'default'), names)[1]
+        owners, short_texts = owned_rows(prepared, item_ids, 'short_texts')
+        changed_ids |= sync_rows(catalogue_models.ItemShortText, 'item_id', owners, ('item_id', 'language_id'),
+                                 ('body',), short_texts)[1]
+        owners, texts = owned_rows(prepared, item_ids, 'texts')
+        changed_ids |= sync_rows(catalogue_models.ItemText, 'item_id', owners, ('item_id', 'language_id', 'name'),
+                                 ('body', 'weight'), texts)[1]
+        owners, seo = owned_rows(prepared, item_ids, 'seo')
+        changed_ids |= sync_rows(catalogue_models.ItemSeoInformation, 'item_id', owners,
+                                 ('item_id', 'language_id'), SEO_FIELDS, seo)[1]
+        owners, parameters = owned_rows(prepared, item_ids, 'parameters')
+        changed_ids |= sync_rows(catalogue_models.ItemParameter, 'item_id', owners, ('item_id', 'default_name'),
+                                 ('default_value', 'weight'), parameters)[1]
+        if owners.__len__() > 0:
+            parameter_ids = {(item_id, name): parameter_id for parameter_id, item_id, name in
+                             catalogue_models.ItemParameter.objects.filter(item_id__in=owners).
+                             values_list('id', 'item_id', 'default_name')}
+            parameter_items = {parameter_id: item_id for (item_id, name), parameter_id in parameter_ids.items()}
+            owners, parameter_names = owned_rows(prepared, item_ids, 'parameter_names')
+            changed_parameters = sync_rows(catalogue_models.ItemParameterName, 'item_parameter_id',
+                                           list(parameter_ids.values()), ('item_parameter_id', 'language_id'),
+                                           ('name', 'value'),
+                                           {(parameter_ids[(item_id, name)], language_id): row_values
+                                            for (item_id, name, language_id), row_values in
+                                            parameter_names.items()})[1]
+            changed_ids.update(parameter_items[parameter_id] for parameter_id in changed_parameters)
+        owners, images = owned_rows(prepared, item_ids, 'images')
+        created_images, changed_images = sync_rows(catalogue_models.ItemImagePosition, 'item_id', owners,
+                                                   ('item_id', 'image_original'), ('weight', 'default', 'active'),
+                                                   images)
+        changed_ids |= changed_images
+        if created_images.__len__() > 0:
+            self.__queue_images(created_images)
+
+        # Label of an item is its modification time for feeds and sitemaps, so it follows changes of any of its rows
+        changed_ids.difference_update(created_ids)
+        catalogue_models.ItemDateTimeUserLabel.objects.filter(item_id__in=changed_ids).\
+            update(last_modified_date=now, last_editor=self.__author)
+
+        self.__item_ids.update(item_ids.values())
+        self.__category_ids.update(data['values']['category_id'] for number, data in prepared.values())
+        self.__created += created_ids.__len__()
+        self.__updated += changed_ids.__len__()
+        return list(item_ids.values())
+
+    def __queue_images(self, created: [(int, str)]) -> None:
+        """Counts references of images created in bulk and queues their thumbnails"""
+        created = set(created)
+        position_ids = []
+        for position_id, item_id, name in catalogue_models.ItemImagePosition.objects.\
+                filter(item_id__in=set(item_id for item_id, name in created)).\
+                values_list('id', 'item_id', 'image_original'):
+            if (item_id, name) in created:
+                position_ids.append(position_id)
+                media_store_references.acquire(name)
+        catalogue_models.ItemImagePosition.objects.filter(id__in=position_ids).update(renditions_pending=True)
+        gallery_models.RenditionJob.enqueue_many(catalogue_models.ItemImagePosition, position_ids)
+
+    def __finish(self) -> None:
+        item_ids = sorted(self.__item_ids)
+        # Rows removed by the import were deleted with signals, which queued their items
+        catalogue_facets.flush()
+        for start in range(0, item_ids.__len__(), self.__batch_size):
+            catalogue_facets.reindex_items(item_ids[start:start + self.__batch_size])
+        neutrino_cache.invalidate_tags([neutrino_cache.tag(catalogue_models.Item, item_id) for item_id in item_ids] +
+                                       [neutrino_cache.tag(catalogue_models.Category, category_id)
+                                        for category_id in self.__category_ids])
@@ -0,0 +1,270 @@
+import hashlib
+from django.db import transaction
+from django.db.models import Count, F, Min, Max
+import catalogue.models as catalogue_models
+import localization.models as localization_models
+import localization.registry as localization_registry
+import neutrino.cache as neutrino_cache
+import neutrino.deferred as neutrino_deferred
+from neutrino.settings import CATALOGUE_CATEGORY_CACHE_TIME
+
+
+FLAGS = ('new', 'top', 'stock', 'pending')
+FLAG_VALUE = '1'
+PARAMETER_PREFIX = 'p.'
+
+
+class FacetSelection:
+    """Filters chosen on category page: parameter values, flags and price range in given currency.
+
+    Values of one parameter are combined with OR, different parameters, flags and price range with AND.
+    """
+
+    def __init__(self, parameters: {str: [str]}, flags: [str], min_price: float, max_price: float,
+                 currency: localization_models.Currency) -> None:
+        self.__parameters = {name: tuple(sorted(set(values))) for name, values in parameters.items() if values}
+        self.__flags = tuple(sorted(set(flag for flag in flags if flag in FLAGS)))
+        self.__min_price = min_price
+        self.__max_price = max_price
+        self.__currency = currency
+
+    @classmethod
+    def from_query(cls, query, currency: localization_models.Currency):
+        """Reads ?p.<parameter>=<value>&flag=<flag>&price_min=<price>&price_max=<price>"""
+        parameters = {}
+        for key in query.keys():
+            if key.startswith(PARAMETER_PREFIX):
+                parameters[key[PARAMETER_PREFIX.__len__():]] = query.getlist(key)
+        return cls(parameters, query.getlist('flag'), cls.__price(query.get('price_min')),
+                   cls.__price(query.get('price_max')), currency)
+
+    @staticmethod
+    def __price(value: str) -> float:
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+
+    @property
+    def parameters(self) -> {str: (str,)}:
+        return self.__parameters
+
+    @property
+    def flags(self) -> (str,):
+        return self.__flags
+
+    @property
+    def min_price(self) -> float:
+        return self.__min_price
+
+    @property
+    def max_price(self) -> float:
+        return self.__max_price
+
+    @property
+    def is_empty(self) -> bool:
+        return self.__parameters.__len__() == 0 and self.__flags.__len__() == 0 and self.__price_filtered is False
+
+    @property
+    def __price_filtered(self) -> bool:
+        return self.__currency is not None and (self.__min_price is not None or self.__max_price is not None)
+
+    @property
+    def signature(self) -> str:
+        """Short string identifying the selection, used in cache keys"""
+        data = repr((sorted(self.__parameters.items()), self.__flags, self.__min_price, self.__max_price,
+                     self.__currency.id if self.__price_filtered else None))
+        return hashlib.md5(data.encode('utf-8')).hexdigest()
+
+    def without_parameter(self, name: str):
+        parameters = dict(self.__parameters)
+        parameters.pop(name, None)
+        return FacetSelection(parameters, self.__flags, self.__min_price, self.__max_price, self.__currency)
+
+    def apply(self, queryset, category_id: int):
+        """Filters queryset of items of the category"""
+        for name, values in self.__parameters.items():
+            queryset = queryset.filter(id__in=catalogue_models.ItemFacet.objects.filter(
+                category_id=category_id, kind=catalogue_models.ItemFacet.KIND_PARAMETER, name=name,
+                value__in=values).values('item_id'))
+        for flag in self.__flags:
+            queryset = queryset.filter(**{flag: True})
+        if self.__price_filtered:
+            if self.__min_price is not None:
+                queryset = queryset.filter(base_price__gte=self.__min_price * self.__currency.coefficient)
+            if self.__max_price is not None:
+                queryset = queryset.filter(base_price__lte=self.__max_price * self.__currency.coefficient)
+        return queryset
+
+
+class Facet:
+    def __init__(self, kind: int, name: str, values: [(str, int)], selected: (str,)) -> None:
+        self.__kind = kind
+        self.__name = name
+        self.__values = sorted(values)
+        self.__selected = selected
+
+    @property
+    def kind(self) -> int:
+        return self.__kind
+
+    @property
+    def name(self) -> str:
+        return self.__name
+
+    @property
+    def values(self) -> [(str, int)]:
+        """(value, number of items) pairs"""
+        return self.__values
+
+    @property
+    def selected(self) -> (str,):
+        return self.__selected
+
+
+def active_items(category_id: int):
+    return catalogue_models.Item.objects.filter(category=category_id, active=True)
+
+
+def _count_rows(category_id: int, selection: FacetSelection) -> [(int, str, str, int)]:
+    if selection.is_empty:
+        return catalogue_models.CategoryFacetCount.objects.filter(category_id=category_id, count__gt=0).\
+            values_list('kind', 'name', 'value', 'count')
+    # Counting is restricted to index rows of matching items
+    return catalogue_models.ItemFacet.objects.\
+        filter(category_id=category_id, item_id__in=selection.apply(active_items(category_id), category_id).
+               values('id')).\
+        values_list('kind', 'name', 'value').annotate(count=Count('item_id'))
+
+
+def facet_counts(category_id: int, selection: FacetSelection) -> [Facet]:
+    """Facets of the category with numbers of items matching the selection.
+
+    Counts of a selected parameter ignore its own values, so other values of it stay visible.
+    """
+    key = str.format('catalogue:category:{0}:facets:{1}', category_id, selection.signature)
+    facets = neutrino_cache.get_tagged(key)
+    if facets is not None:
+        return facets
+    rows = {}
+    for kind, name, value, count in _count_rows(category_id, selection):
+        rows.setdefault((kind, name), {})[value] = count
+    for name in selection.parameters.keys():
+        own_key = (catalogue_models.ItemFacet.KIND_PARAMETER, name)
+        rows[own_key] = {}
+        for kind, row_name, value, count in _count_rows(category_id, selection.without_parameter(name)):
+            if (kind, row_name) == own_key:
+                rows[own_key][value] = count
+    facets = []
+    for (kind, name), values in sorted(rows.items()):
+        selected = selection.parameters.get(name, ()) if kind == catalogue_models.ItemFacet.KIND_PARAMETER \
+            else tuple(FLAG_VALUE for flag in selection.flags if flag == name)
+        facets.append(Facet(kind, name, list(values.items()), selected))
+    neutrino_cache.set_tagged(key, facets, [neutrino_cache.tag(catalogue_models.Category, category_id)],
+                              CATALOGUE_CATEGORY_CACHE_TIME)
+    return facets
+
+
+def price_bounds(category_id: int, currency: localization_models.Currency) -> (float, float):
+    """Lowest and highest price of active items of the category in given currency"""
+    if currency is None:
+        return None, None
+    key = str.format('catalogue:category:{0}:price_bounds', category_id)
+    bounds = neutrino_cache.get_tagged(key)
+    if bounds is None:
+        result = active_items(category_id).aggregate(min_price=Min('base_price'), max_price=Max('base_price'))
+        bounds = (result['min_price'], result['max_price'])
+        neutrino_cache.set_tagged(key, bounds, [neutrino_cache.tag(catalogue_models.Category, category_id),
+                                                localization_registry.TAG], CATALOGUE_CATEGORY_CACHE_TIME)
+    return tuple(bound / currency.coefficient if bound is not None else None for bound in bounds)
+
+
+# Maintenance
+def item_facets(item: catalogue_models.Item, parameters: [(str, str)]) -> {(int, int, str, str)}:
+    """Returns (category id, kind, name, value) rows the item should have in the index"""
+    if item is None or not item.active:
+        return set()
+    rows = set()
+    for flag in FLAGS:
+        if getattr(item, flag):
+            rows.add((item.category_id, catalogue_models.ItemFacet.KIND_FLAG, flag, FLAG_VALUE))
+    for name, value in parameters:
+        rows.add((item.category_id, catalogue_models.ItemFacet.KIND_PARAMETER, name, value))
+    return rows
+
+
+def _change_counts(changes: {(int, int, str, str): int}) -> None:
+    for (category_id, kind, name, value), delta in changes.items():
+        if delta == 0:
+            continue
+        updated = catalogue_models.CategoryFacetCount.objects.\
+            filter(category_id=category_id, kind=kind, name=name, value=value).update(count=F('count') + delta)
+        if updated == 0 and delta > 0:
+            catalogue_models.CategoryFacetCount.objects.create(category_id=category_id, kind=kind, name=name,
+                                                               value=value, count=delta)
+
+
+@transaction.atomic
+def reindex_items(item_ids: [int]) -> None:
+    """Brings index rows and counts of the items in line with their current state"""
+    item_ids = set(item_ids)
+    items = {item.id: item for item in catalogue_models.Item.objects.filter(id__in=item_ids).
+             only('id', 'category', 'active', *FLAGS)}
+    parameters = {}
+    for item_id, name, value in catalogue_models.ItemParameter.objects.filter(item__in=items.keys()).\
+            values_list('item', 'default_name', 'default_value'):
+        parameters.setdefault(item_id, []).append((name, value))
+    existing = {}
+    for row in catalogue_models.ItemFacet.objects.filter(item_id__in=item_ids).\
+            values_list('id', 'item_id', 'category_id', 'kind', 'name', 'value'):
+        existing.setdefault(row[1], {})[row[2:]] = row[0]
+    removed_ids = []
+    added = []
+    changes = {}
+    for item_id in item_ids:
+        old_rows = existing.get(item_id, {})
+        new_rows = item_facets(items.get(item_id), parameters.get(item_id, []))
+        for row, row_id in old_rows.items():
+            if row not in new_rows:
+                removed_ids.append(row_id)
+                changes[row] = changes.get(row, 0) - 1
+        for row in new_rows:
+            if row not in old_rows:
+                added.append(catalogue_models.ItemFacet(item_id=item_id, category_id=row[0], kind=row[1],
+                                                        name=row[2], value=row[3]))
+                changes[row] = changes.get(row, 0) + 1
+    catalogue_models.ItemFacet.objects.filter(id__in=removed_ids).delete()
+    catalogue_models.ItemFacet.objects.bulk_create(added)
+    _change_counts(changes)
+    categories = set(row[0] for row in changes.keys())
+    if categories.__len__() > 0:
+        neutrino_cache.invalidate_tags([neutrino_cache.tag(catalogue_models.Category, category_id)
+                                        for category_id in categories])
+
+
+@transaction.atomic
+def rebuild(category_id: int = None) -> None:
+    """Recreates index and counts from scratch, for all categories or the given one"""
+    facets = catalogue_models.ItemFacet.objects.all()
+    counts = catalogue_models.CategoryFacetCount.objects.all()
+    items = catalogue_models.Item.objects.all()
+    if category_id is not None:
+        facets = facets.filter(category_id=category_id)
+        counts = counts.filter(category_id=category_id)
+        items = items.filter(category=category_id)
+    facets.delete()
+    counts.delete()
+    reindex_items(items.values_list('id', flat=True))
+
+
+dirty_items = neutrino_deferred.DeferredBatch(reindex_items)
+
+
+def mark_dirty(item_id: int) -> None:
+    """Schedules reindexing of the item"""
+    dirty_items.add([item_id])
+
+
+def flush() -> None:
+    """Reindexes items changed in the current thread"""
+    dirty_items.flush()
@@ -0,0 +1,142 @@
+import hashlib
+import json
+from xml.sax.saxutils import escape
+from django.core.urlresolvers import reverse
+from django.db.models import Count, Max
+import django.utils.translation as translation
+import catalogue.models as catalogue_models
+import localization.models as localization_models
+import localization.registry as localization_registry
+import localization.resolver as localization_resolver
+from localization.registry import registry
+import neutrino.cache as neutrino_cache
+
+
+CHUNK = 500
+CONTENT_TYPES = {
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+    'xml': 'application/xml; charset=utf-8',
+}
+GOOGLE_NAMESPACE = 'http://base.google.com/ns/1.0'
+
+
+class FeedItem:
+    def __init__(self, item_id: int, code: str, name: str, short_text: str, url: str, image: str, price: float,
+                 currency: str, pending: bool) -> None:
+        self.__item_id = item_id
+        self.__code = code
+        self.__name = name
+        self.__short_text = short_text
+        self.__url = url
+        self.__image = image
+        self.__price = price
+        self.__currency = currency
+        self.__pending = pending
+
+    @property
+    def availability(self) -> str:
+        return 'preorder' if self.__pending else 'in stock'
+
+    def as_dict(self) -> dict:
+        return {
+            'id': self.__item_id,
+            'code': self.__code,
+            'name': self.__name,
+            'short_text': self.__short_text,
+            'url': self.__url,
+            'image': self.__image,
+            'price': self.__price,
+            'currency': self.__currency,
+            'availability': self.availability,
+        }
+
+    def as_xml(self) -> str:
+        price = str.format('{0:.2f} {1}', self.__price, self.__currency) if self.__price is not None else ''
+        return str.format('<item><g:id>{0}</g:id><title>{1}</title><description>{2}</description><link>{3}</link>'
+                          '<g:image_link>{4}</g:image_link><g:price>{5}</g:price><g:mpn>{6}</g:mpn>'
+                          '<g:availability>{7}</g:availability></item>\n',
+                          self.__item_id, escape(self.__name or ''), escape(self.__short_text or ''),
+                          escape(self.__url), escape(self.__image or ''), escape(price), escape(self.__code or ''),
+                          self.availability)
+
+
+def requested_currency(request) -> localization_models.Currency:
+    """Currency of ?currency=<code>, default currency if it is not given, None for unknown codes"""
+    code = request.GET.get('currency')
+    if code:
+        return registry.currency(code)
+    return registry.default_currency()
+
+
+def etag(request, feed_format: str) -> str:
+    """Changes whenever an item is created, edited or deleted, or currencies change"""
+    labels = catalogue_models.ItemDateTimeUserLabel.objects.aggregate(created=Max('creating_date'),
+                                                                      modified=Max('last_modified_date'))
+    items = catalogue_models.Item.objects.filter(active=True).aggregate(count=Count('id'), last_id=Max('id'))
+    currency = requested_currency(request)
+    registry_version = neutrino_cache.get_versions([localization_registry.VERSION_CACHE_KEY])
+    data = repr((feed_format, translation.get_language(), currency.id if currency is not None else None,
+                 labels['created'], labels['modified'], items['count'], items['last_id'],
+                 registry_version[localization_registry.VERSION_CACHE_KEY]))
+    return hashlib.md5(data.encode('utf-8')).hexdigest()
+
+
+def feed_items(request, language_code: str, currency: localization_models.Currency):
+    """Yields active items chunk by chunk, so memory does not depend on the size of the catalogue"""
+    last_id = 0
+    while True:
+        rows = list(catalogue_models.Item.objects.filter(active=True, id__gt=last_id).order_by('id').
+                    values_list('id', 'url', 'category__url', 'code', 'default_price', 'currency',
+                                'pending')[:CHUNK])
+        if rows.__len__() == 0:
+            return
+        last_id = rows[-1][0]
+        # Response is streamed after the request is finished, so language and resolver are set up per chunk
+        chunk = []
+        with translation.override(language_code):
+            resolver = localization_resolver.TranslationResolver()
+            item_ids = [row[0] for row in rows]
+            resolver.prefetch(catalogue_models.ItemName, 'item', item_ids)
+            resolver.prefetch(catalogue_models.ItemShortText, 'item', item_ids, ('body',), has_default=False)
+            prices = registry.convert_prices([(row[4], row[5]) for row in rows], currency)
+            images = {}
+            for image in catalogue_models.ItemImagePosition.objects.filter(item__in=item_ids, default=True).\
+                    order_by('id'):
+                images.setdefault(image.item_id, image.large_image)
+            for (item_id, url, category_url, code, default_price, currency_id, pending), price in zip(rows, prices):
+                name = resolver.resolve(catalogue_models.ItemName, 'item', item_id)
+                short_text = resolver.resolve(catalogue_models.ItemShortText, 'item', item_id, ('body',),
+                                              has_default=False)
+                image = images.get(item_id)
+                chunk.append(FeedItem(item_id, code, name[0] if name is not None else '',
+                                      short_text[0] if short_text is not None else None,
+                                      request.build_absolute_uri(reverse('catalogue_item',
+                                                                         args=(category_url, url))),
+                                      request.build_absolute_uri(image) if image is not None else None, price,
+                                      currency.short_name if currency is not None else None, pending))
+        for item in chunk:
+            yield item
+
+
+def buffered(parts):
+    """Joins small strings, so the response is written in pieces of CHUNK items"""
+    buffer = []
+    for part in parts:
+        buffer.append(part)
+        if buffer.__len__() >= CHUNK:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer.__len__() > 0:
+        yield ''.join(buffer)
+
+
+def jsonl(items):
+    return buffered(json.dumps(item.as_dict(), ensure_ascii=False) + '\n' for item in items)
+
+
+def xml(items, title: str, link: str):
+    yield str.format('<?xml version="1.0" encoding="utf-8"?>\n<rss version="2.0" xmlns:g="{0}"><channel>'
+                     '<title>{1}</title><link>{2}</link>\n', GOOGLE_NAMESPACE, escape(title), escape(link))
+    for part in buffered(item.as_xml() for item in items):
+        yield part
+    yield '</channel></rss>\n'
@@ -0,0 +1,33 @@
+import io
+import sys
+from django.core.management.base import BaseCommand
+import catalogue.exchange as catalogue_exchange
+
+
+WRITERS = {
+    'jsonl': catalogue_exchange.write_jsonl,
+    'csv': catalogue_exchange.write_csv,
+}
+
+
+class Command(BaseCommand):
+    help = 'Writes items with their texts, parameters and images as a JSONL or CSV feed accepted by import_catalogue'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default='-', help='Output file, standard output by default')
+        parser.add_argument('--format', choices=WRITERS.keys(), default='jsonl', help='Feed format')
+        parser.add_argument('--category', type=int, default=None, help='Export only items of the category with given id')
+
+    def handle(self, *args, **options):
+        if options['output'] == '-':
+            stream = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', newline='')
+        else:
+            stream = open(options['output'], 'w', encoding='utf-8', newline='')
+        try:
+            WRITERS[options['format']](catalogue_exchange.export_records(options['category']), stream)
+        finally:
+            if options['output'] == '-':
+                # Standard output stays open for the rest of the command
+                stream.detach()
+            else:
+                stream.close()
@@ -0,0 +1,47 @@
+import io
+import sys
+from django.contrib.auth import models as auth_models
+from django.core.management.base import BaseCommand, CommandError
+import catalogue.exchange as catalogue_exchange
+
+
+READERS = {
+    'jsonl': catalogue_exchange.read_jsonl,
+    'csv': catalogue_exchange.read_csv,
+}
+
+
+class Command(BaseCommand):
+    help = 'Creates and updates items from a JSONL or CSV feed, matching them by url'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Feed file, "-" for standard input')
+        parser.add_argument('--format', choices=READERS.keys(), default=None,
+                            help='Feed format, guessed from the file extension by default')
+        parser.add_argument('--user', required=True, help='Username recorded as author and last editor of items')
+        parser.add_argument('--images', default='', help='Directory image paths of the feed are relative to')
+        parser.add_argument('--batch', type=int, default=500, help='Number of records written in one transaction')
+
+    def handle(self, *args, **options):
+        feed_format = options['format'] or options['path'].rsplit('.', 1)[-1].lower()
+        if feed_format not in READERS:
+            raise CommandError('Unknown feed format, use --format')
+        user = auth_models.User.objects.filter(username=options['user']).first()
+        if user is None:
+            raise CommandError(str.format('User {0} does not exist', options['user']))
+        if options['path'] == '-':
+            stream = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8', newline='')
+        else:
+            stream = open(options['path'], encoding='utf-8', newline='')
+        importer = catalogue_exchange.CatalogueImporter(user, options['images'], options['batch'])
+        try:
+            importer.run(READERS[feed_format](stream))
+        finally:
+            if options['path'] == '-':
+                stream.detach()
+            else:
+                stream.close()
+        for number, message in importer.errors:
+            self.stderr.write(str.format('Line {0}: {1}', number, message))
+        self.stdout.write(str.format('{0} created, {1} updated, {2} skipped', importer.created, importer.updated,
+                                     importer.errors.__len__()))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+import catalogue.facets as catalogue_facets
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds facet index and facet counts of categories'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--category', type=int, default=None, help='Rebuild only the category with given id')
+
+    def handle(self, *args, **options):
+        catalogue_facets.rebuild(options['category'])
+        self.stdout.write('Facet index rebuilt')
@@ -1,15 +1,17 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import models as auth_models
 from django.utils.translation import ugettext_lazy as _
+import localization.annotations as localization_annotations
 import localization.models as localization_models
+from localization.registry import registry
+import localization.resolver as localization_resolver
 from gallery import models as gallery_models
+import gallery.renditions as gallery_renditions
+import media_store.garbage as media_store_garbage
+import media_store.storage as media_store_storage
 import sortedm2m.fields as sortedm2m
 from image_cropping import ImageRatioField
-from easy_thumbnails.files import get_thumbnailer
-import django.utils.translation as translation
-import os
 import neutrino.settings as settings
-import shutil
 
 
 # Category
@@ -35,19 +37,20 @@ class Category(models.Model):
                                                 help_text=_('Galleries'))
     template = models.ForeignKey(CategoryTemplate, verbose_name=_('Template'), help_text=_('Template'))
     url = models.CharField(max_length=256, db_index=True, unique=True, verbose_name=_('Url'), help_text=_('Url'))
-    first_image = models.ImageField(null=True, blank=True, verbose_name=_('First image'), help_text=_('First image'))
-    second_image = models.ImageField(null=True, blank=True, verbose_name=_('Second image'), help_text=_('Second image'))
+    first_image = models.ImageField(null=True, blank=True, storage=media_store_storage.storage,
+                                    verbose_name=_('First image'), help_text=_('First image'))
+    second_image = models.ImageField(null=True, blank=True, storage=media_store_storage.storage,
+                                     verbose_name=_('Second image'), help_text=_('Second image'))
 
     def __str__(self) -> str:
-        lang = translation.get_language()
-        language = localization_models.Language.objects.filter(short_name=lang).values_list('id', flat=True)
-        if language.__len__() > 0:
-            language = language[0]
-            category_name = CategoryName.objects.filter(category=self, language=language).values_list('name', flat=True)
-            if category_name.__len__() > 0:
-                return category_name[0]
-        category_name = CategoryName.objects.filter(category=self, default=True).values_list('name', flat=True)[0]
-        return category_name
+        category_name = localization_resolver.get_resolver().resolve(CategoryName, 'category', self.id)
+        if category_name is None:
+            return ''
+        return category_name[0]
+
+    @classmethod
+    def prefetch_translations(cls, ids: [int]) -> None:
+        localization_resolver.get_resolver().prefetch(CategoryName, 'category', ids)
 
     def texts_languages_admin_display(self) -> str:
         return "<br/>".join(self.text_languages_names)
@@ -76,8 +79,7 @@ class Category(models.Model):
 
     def check_language_for_seo_admin_display(self) -> str:
         """Checks if seo information languages are corresponding to languages of the website"""
-        unrealized_languages = localization_models.Language.objects.exclude(
-            id__in=self.seo_information_languages_ids).all().values_list('name', flat=True)
+        unrealized_languages = registry.unrealized_languages_names(self.seo_information_languages_ids)
         languages__str = "<br/>".join(unrealized_languages)
         if unrealized_languages.__len__() > 0:
             return str.format(
@@ -92,8 +94,7 @@ class Category(models.Model):
 
     def check_language_for_text_admin_display(self) -> str:
         """Checks if texts languages are corresponding to languages of the website"""
-        unrealized_languages = localization_models.Language.objects.exclude(
-            id__in=self.text_languages_ids).all().values_list('name', flat=True)
+        unrealized_languages = registry.unrealized_languages_names(self.text_languages_ids)
         languages__str = "<br/>".join(unrealized_languages)
         if unrealized_languages.__len__() > 0:
             return str.format(
@@ -120,7 +121,7 @@ class Category(models.Model):
     @property
     def check_language_for_seo_information(self) -> bool:
         """Checks if seo information languages are corresponding to languages of the website"""
-        languages = localization_models.Language.objects.all().values_list('id', flat=True)
+        languages = registry.language_ids()
         seo_languages = self.seo_information_languages_ids
         for language in languages:
             if language not in seo_languages:
@@ -130,7 +131,7 @@ class Category(models.Model):
     @property
     def check_language_for_text(self) -> bool:
         """Checks if texts languages are corresponding to languages of the website"""
-        languages = localization_models.Language.objects.all().values_list('id', flat=True)
+        languages = registry.language_ids()
         text_languages = self.text_languages_ids
         for language in languages:
             if language not in text_languages:
@@ -139,68 +140,63 @@ class Category(models.Model):
 
     @property
     def text_languages_names(self) -> [str]:
-        texts_languages = CategoryText.objects.filter(category=self).all().values_list('language__name',
-                                                                                       flat=True).order_by('id')
-        return texts_languages
+        return [registry.language_by_id(language_id).name for language_id in self.text_languages_ids]
 
     @property
     def text_languages_ids(self) -> [int]:
-        texts_languages = CategoryText.objects.filter(category=self).all().values_list('language__id',
-                                                                                       flat=True).order_by('id')
-        return texts_languages
+        """Taken from 'text_languages' annotation of admin changelist when it is present"""
+        language_ids = localization_annotations.annotated_ids(self, 'text_languages')
+        if language_ids is None:
+            language_ids = CategoryText.objects.filter(category=self).values_list('language__id', flat=True).\
+                order_by('id')
+        return language_ids
 
     @property
     def seo_information_languages_names(self) -> [str]:
-        seo_languages = CategorySeoInformation.objects.filter(category=self).all().values_list('language__name',
-                                                                                               flat=True).order_by('id')
-        return seo_languages
+        return [registry.language_by_id(language_id).name for language_id in self.seo_information_languages_ids]
 
     @property
-    def seo_information_languages_ids(self) -> [str]:
-        seo_languages = CategorySeoInformation.objects.filter(category=self).all().values_list('language__id',
-                                                                                               flat=True).order_by('id')
-        return seo_languages
+    def seo_information_languages_ids(self) -> [int]:
+        """Taken from 'seo_information_languages' annotation of admin changelist when it is present"""
+        language_ids = localization_annotations.annotated_ids(self, 'seo_information_languages')
+        if language_ids is None:
+            language_ids = CategorySeoInformation.objects.filter(category=self).values_list('language__id', flat=True).\
+                order_by('id')
+        return language_ids
+
+    @property
+    def label(self) -> 'CategoryDateTimeUserLabel':
+        """Creation and modification label, loaded together with the category by select_related in admin"""
+        try:
+            return self.categorydatetimeuserlabel
+        except CategoryDateTimeUserLabel.DoesNotExist:
+            return None
 
     def author(self) -> auth_models.User:
-        label = CategoryDateTimeUserLabel.objects.filter(category=self).first()
-        return label.author
+        return self.label.author if self.label is not None else None
 
     author.short_description = _('Author')
 
     def last_editor(self) -> auth_models.User:
-        label = CategoryDateTimeUserLabel.objects.filter(category=self).first()
-        return label.last_editor
+        return self.label.last_editor if self.label is not None else None
 
     last_editor.short_description = _('Last editor')
 
     def creating_date(self) -> models.DateTimeField:
-        label = CategoryDateTimeUserLabel.objects.filter(category=self).first()
-        return label.creating_date
+        return self.label.creating_date if self.label is not None else None
 
     creating_date.short_description = _('Creating date')
 
     def last_modified_date(self) -> models.DateTimeField:
-        label = CategoryDateTimeUserLabel.objects.filter(category=self).first()
-        return label.last_modified_date
+        return self.label.last_modified_date if self.label is not None else None
 
     last_modified_date.short_description = _('Last modified date')
 
-    def save(self, force_insert=False, force_update=False, using=None,
-             update_fields=None) -> None:
-        for field in self._meta.fields:
-            if field.name == 'first_image':
-                field.upload_to = str.format("category/{0}/first_image/", self.url)
-            if field.name == 'second_image':
-                field.upload_to = str.format("category/{0}/second_image/", self.url)
-        super(Category, self).save()
-
     def delete(self, using=None):
-        path = os.path.join(settings.BASE_DIR, settings.MEDIA_ROOT, str.format('catalogue/{0}', self.id))
-        try:
-            shutil.rmtree(path)
-            super(Category, self).delete()
-        except Exception:
-            pass
+        # Files are removed by sweep_media once the deletion is committed
+        with transaction.atomic(using=using):
+            media_store_garbage.collect(str.format('catalogue/{0}', self.id))
+            super(Category, self).delete(using)
 
     class Meta:
         db_table = 'catalogue_categories'
@@ -315,27 +311,51 @@ class Item(models.Model):
     pending = models.BooleanField(default=False, verbose_name=_('Is pending?'), help_text=_('The product is pending?'))
     code = models.CharField(max_length=256, blank=True, null=True, verbose_name=_('Code'), help_text=_('Code'))
     url = models.CharField(max_length=256, db_index=True, unique=True, verbose_name=_('Url'), help_text=_('Url'))
+    base_price = models.FloatField(null=True, blank=True, editable=False,
+                                   help_text=_('Price multiplied by coefficient of its currency, comparable between '
+                                               'items in different currencies'))
+
+    def save(self, force_insert=False, force_update=False, using=None,
+             update_fields=None) -> None:
+        self.base_price = Item.compute_base_price(self.default_price, self.currency_id)
+        super(Item, self).save(force_insert, force_update, using, update_fields)
+
+    @staticmethod
+    def compute_base_price(default_price: float, currency_id: int) -> float:
+        currency = registry.currency_by_id(currency_id)
+        if default_price is None or currency is None:
+            return None
+        return default_price * currency.coefficient
 
     def delete(self, using=None):
-        path = os.path.join(settings.BASE_DIR, settings.MEDIA_ROOT, str.format('catalogue/{0}/item/{1}',
-                                                                               self.category.id,
-                                                                               self.id))
-        try:
-            shutil.rmtree(path)
-            super(Item, self).delete()
-        except Exception:
-            pass
+        # Files are removed by sweep_media once the deletion is committed
+        with transaction.atomic(using=using):
+            media_store_garbage.collect(str.format('catalogue/{0}/item/{1}', self.category_id, self.id))
+            super(Item, self).delete(using)
 
     def __str__(self) -> str:
-        lang = translation.get_language()
-        language = localization_models.Language.objects.filter(short_name=lang).values_list('id', flat=True)
-        if language.__len__() > 0:
-            language = language[0]
-            item_name = ItemName.objects.filter(item=self, language=language).values_list('name', flat=True)
-            if item_name.__len__() > 0:
-                return item_name[0]
-        item_name = ItemName.objects.filter(item=self, default=True).values_list('name', flat=True)[0]
-        return item_name
+        return Item.name_by_id(self.id)
+
+    @staticmethod
+    def name_by_id(item_id: int) -> str:
+        item_name = localization_resolver.get_resolver().resolve(ItemName, 'item', item_id)
+        if item_name is None:
+            return ''
+        return item_name[0]
+
+    @staticmethod
+    def short_text_by_id(item_id: int) -> str:
+        item_short_text = localization_resolver.get_resolver().resolve(ItemShortText, 'item', item_id, ('body',),
+                                                                       has_default=False)
+        if item_short_text is None:
+            return None
+        return item_short_text[0]
+
+    @classmethod
+    def prefetch_translations(cls, ids: [int]) -> None:
+        resolver = localization_resolver.get_resolver()
+        resolver.prefetch(ItemName, 'item', ids)
+        resolver.prefetch(ItemShortText, 'item', ids, ('body',), has_default=False)
 
     def texts_languages_admin_display(self) -> str:
         return "<br/>".join(self.text_languages_names)
@@ -370,8 +390,7 @@ class Item(models.Model):
 
     def check_language_for_seo_admin_display(self) -> str:
         """Checks if seo information languages are corresponding to languages of the website"""
-        unrealized_languages = localization_models.Language.objects.exclude(
-            id__in=self.seo_information_languages_ids).all().values_list('name', flat=True)
+        unrealized_languages = registry.unrealized_languages_names(self.seo_information_languages_ids)
         languages__str = "<br/>".join(unrealized_languages)
         if unrealized_languages.__len__() > 0:
             return str.format(
@@ -386,8 +405,7 @@ class Item(models.Model):
 
     def check_language_for_text_admin_display(self) -> str:
         """Checks if texts languages are corresponding to languages of the website"""
-        unrealized_languages = localization_models.Language.objects.exclude(
-            id__in=self.text_languages_ids).all().values_list('name', flat=True)
+        unrealized_languages = registry.unrealized_languages_names(self.text_languages_ids)
         languages__str = "<br/>".join(unrealized_languages)
         if unrealized_languages.__len__() > 0:
             return str.format(
@@ -402,8 +420,7 @@ class Item(models.Model):
 
     def check_language_for_short_text_admin_display(self) -> str:
         """Checks if texts languages are corresponding to languages of the website"""
-        unrealized_languages = localization_models.Language.objects.exclude(
-            id__in=self.short_text_languages_ids).all().values_list('name', flat=True)
+        unrealized_languages = registry.unrealized_languages_names(self.short_text_languages_ids)
         languages__str = "<br/>".join(unrealized_languages)
         if unrealized_languages.__len__() > 0:
             return str.format(
@@ -422,21 +439,10 @@ class Item(models.Model):
 
     @property
     def short_text(self) -> str:
-        lang = translation.get_language()
-        language = localization_models.Language.objects.filter(short_name=lang).values_list('id', flat=True)
-        if language.__len__() > 0:
-            language = language[0]
-            item_short_text = ItemShortText.objects.filter(item=self, language=language).values_list('body', flat=True)
-            if item_short_text.__len__() > 0:
-                return item_short_text[0]
-        return None
+        return Item.short_text_by_id(self.id)
 
     def price(self, currency: localization_models.Currency) -> float:
-        if currency is None:
-            return None
-        if self.price is not None:
-            return self.default_price * self.currency.coefficient / currency.coefficient
-        return None
+        return registry.convert_prices([(self.default_price, self.currency_id)], currency)[0]
 
     @property
     def image(self):
@@ -452,7 +458,7 @@ class Item(models.Model):
     @property
     def check_language_for_seo_information(self) -> bool:
         """Checks if seo information languages are corresponding to languages of the website"""
-        languages = localization_models.Language.objects.all().values_list('id', flat=True)
+        languages = registry.language_ids()
         seo_languages = self.seo_information_languages_ids
         for language in languages:
             if language not in seo_languages:
@@ -462,7 +468,7 @@ class Item(models.Model):
     @property
     def check_language_for_text(self) -> bool:
         """Checks if texts languages are corresponding to languages of the website"""
-        languages = localization_models.Language.objects.all().values_list('id', flat=True)
+        languages = registry.language_ids()
         text_languages = self.text_languages_ids
         for language in languages:
             if language not in text_languages:
@@ -471,66 +477,72 @@ class Item(models.Model):
 
     @property
     def text_languages_names(self) -> [str]:
-        texts_languages = ItemText.objects.filter(item=self).all().values_list('language__name',
-                                                                               flat=True).order_by('id')
-        return texts_languages
+        return [registry.language_by_id(language_id).name for language_id in self.text_languages_ids]
 
     @property
     def text_languages_ids(self) -> [int]:
-        texts_languages = ItemText.objects.filter(item=self).all().values_list('language__id',
-                                                                               flat=True).order_by('id')
-        return texts_languages
+        """Taken from 'text_languages' annotation of admin changelist when it is present"""
+        language_ids = localization_annotations.annotated_ids(self, 'text_languages')
+        if language_ids is None:
+            language_ids = ItemText.objects.filter(item=self).values_list('language__id', flat=True).order_by('id')
+        return language_ids
 
     @property
-    def short_text_languages_names(self) -> [int]:
-        texts_languages = ItemShortText.objects.filter(item=self).all().values_list('language__name',
-                                                                                    flat=True).order_by('id')
-        return texts_languages
+    def short_text_languages_names(self) -> [str]:
+        return [registry.language_by_id(language_id).name for language_id in self.short_text_languages_ids]
 
     @property
     def short_text_languages_ids(self) -> [int]:
-        texts_languages = ItemShortText.objects.filter(item=self).all().values_list('language__id',
-                                                                                    flat=True).order_by('id')
-        return texts_languages
+        """Taken from 'short_text_languages' annotation of admin changelist when it is present"""
+        language_ids = localization_annotations.annotated_ids(self, 'short_text_languages')
+        if language_ids is None:
+            language_ids = ItemShortText.objects.filter(item=self).values_list('language__id', flat=True).order_by('id')
+        return language_ids
 
     @property
     def seo_information_languages_names(self) -> [str]:
-        seo_languages = ItemSeoInformation.objects.filter(item=self).all().values_list('language__name',
-                                                                                       flat=True).order_by('id')
-        return seo_languages
+        return [registry.language_by_id(language_id).name for language_id in self.seo_information_languages_ids]
+
+    @property
+    def seo_information_languages_ids(self) -> [int]:
+        """Taken from 'seo_information_languages' annotation of admin changelist when it is present"""
+        language_ids = localization_annotations.annotated_ids(self, 'seo_information_languages')
+        if language_ids is None:
+            language_ids = ItemSeoInformation.objects.filter(item=self).values_list('language__id', flat=True).\
+                order_by('id')
+        return language_ids
 
     @property
-    def seo_information_languages_ids(self) -> [str]:
-        seo_languages = ItemSeoInformation.objects.filter(item=self).all().values_list('language__id',
-                                                                                       flat=True).order_by('id')
-        return seo_languages
+    def label(self) -> 'ItemDateTimeUserLabel':
+        """Creation and modification label, loaded together with the item by select_related in admin"""
+        try:
+            return self.itemdatetimeuserlabel
+        except ItemDateTimeUserLabel.DoesNotExist:
+            return None
 
     def author(self) -> auth_models.User:
-        label = ItemDateTimeUserLabel.objects.filter(item=self).first()
-        return label.author
+        return self.label.author if self.label is not None else None
 
     author.short_description = _('Author')
 
     def last_editor(self) -> auth_models.User:
-        label = ItemDateTimeUserLabel.objects.filter(item=self).first()
-        return label.last_editor
+        return self.label.last_editor if self.label is not None else None
 
     last_editor.short_description = _('Last editor')
 
     def creating_date(self) -> models.DateTimeField:
-        label = ItemDateTimeUserLabel.objects.filter(item=self).first()
-        return label.creating_date
+        return self.label.creating_date if self.label is not None else None
 
     creating_date.short_description = _('Creating date')
 
     def last_modified_date(self) -> models.DateTimeField:
-        label = ItemDateTimeUserLabel.objects.filter(item=self).first()
-        return label.last_modified_date
+        return self.label.last_modified_date if self.label is not None else None
 
     last_modified_date.short_description = _('Last modified date')
 
     class Meta:
         db_table = "catalogue_items"
+        index_together = (('category', 'active', 'id'), ('category', 'active', 'base_price'))
         verbose_name = _("Item")
         verbose_name_plural = _("Items")
 
@@ -626,7 +638,8 @@ class ItemSeoInformation(models.Model):
 
 class ItemImagePosition(models.Model):
     id = models.AutoField(primary_key=True, verbose_name=_('Id'), help_text=_('Unique identifier'))
-    image_original = models.ImageField(verbose_name=_('Original image'), help_text=_('Original Image'))
+    image_original = models.ImageField(storage=media_store_storage.storage, verbose_name=_('Original image'),
+                                       help_text=_('Original Image'))
     cropping_large = ImageRatioField('image_original', settings.CATALOGUE_ITEM_GALLERY['large'],
                                      verbose_name=_('Large image'),
                                      help_text=_('Large image'))
@@ -646,6 +659,13 @@ class ItemImagePosition(models.Model):
     image_large = models.CharField(max_length=256, null=True, blank=True, editable=False)
     image_medium = models.CharField(max_length=256, null=True, blank=True, editable=False)
     image_small = models.CharField(max_length=256, null=True, blank=True, editable=False)
+    renditions = models.TextField(null=True, blank=True, editable=False,
+                                  help_text=_('Urls of thumbnails in other formats and densities'))
+    renditions_signature = models.CharField(max_length=512, null=True, blank=True, editable=False)
+    renditions_pending = models.BooleanField(default=False, editable=False, verbose_name=_('Is processing?'),
+                                             help_text=_('Thumbnails are being generated'))
+
+    RENDITION_DIMENSIONS = settings.CATALOGUE_ITEM_GALLERY
 
     @property
     def original_image(self) -> str:
@@ -653,44 +673,26 @@ class ItemImagePosition(models.Model):
 
     @property
     def large_image(self) -> str:
-        url = get_thumbnailer(self.image_original).get_thumbnail({
-            'size': (settings.CATALOGUE_ITEM_GALLERY['large'][:settings.CATALOGUE_ITEM_GALLERY['large'].index('x')],
-                     settings.CATALOGUE_ITEM_GALLERY['large'][
-                     settings.CATALOGUE_ITEM_GALLERY['large'].index('x') + 1:]),
-            'box': self.cropping_large,
-            'crop': True,
-            'detail': True,
-        }).url
-        return url
+        """Stored thumbnail, original image while thumbnails are being generated"""
+        return self.image_large or self.original_image
 
     @property
     def medium_image(self) -> str:
-        url = get_thumbnailer(self.image_original).get_thumbnail({
-            'size': (settings.CATALOGUE_ITEM_GALLERY['medium'][:settings.CATALOGUE_ITEM_GALLERY['medium'].index('x')],
-                     settings.CATALOGUE_ITEM_GALLERY['medium'][
-                     settings.CATALOGUE_ITEM_GALLERY['medium'].index('x') + 1:]),
-            'box': self.cropping_small,
-            'crop': True,
-            'detail': True,
-        }).url
-        return url
+        return self.image_medium or self.original_image
 
     @property
     def small_image(self) -> str:
-        url = get_thumbnailer(self.image_original).get_thumbnail({
-            'size': (settings.CATALOGUE_ITEM_GALLERY['small'][:settings.CATALOGUE_ITEM_GALLERY['small'].index('x')],
-                     settings.CATALOGUE_ITEM_GALLERY['small'][
-                     settings.CATALOGUE_ITEM_GALLERY['small'].index('x') + 1:]),
-            'box': self.cropping_medium,
-            'crop': True,
-            'detail': True,
-        }).url
-        return url
+        return self.image_small or self.original_image
 
     @property
     def original_image(self) -> str:
         return str.format("/media/{0}", self.image_original)
 
+    @property
+    def pictures(self) -> {str: gallery_renditions.Picture}:
+        """Thumbnails of all sizes with srcset of every format and density, by size"""
+        return gallery_renditions.pictures(self)
+
     @property
     def large_image_path(self) -> str:
         return self.image_large
@@ -705,26 +707,10 @@ class ItemImagePosition(models.Model):
 
     def save(self, force_insert=False, force_update=False, using=None,
              update_fields=None):
-        for field in self._meta.fields:
-            if field.name == 'image_original':
-                field.upload_to = str.format('catalogue/{0}/item/{1}/images/{2}/', self.item.category.id, self.item.id,
-                                             self.image_original.__str__()[0:self.image_original.__str__().index('.')])
-        super(ItemImagePosition, self).save()
-        self.image_large = self.large_image
-        self.image_medium = self.medium_image
-        self.image_small = self.small_image
-
-        super(ItemImagePosition, self).save()
-
-    def delete(self, using=None):
-        path = os.path.join(settings.BASE_DIR,
-                            settings.MEDIA_ROOT,
-                            self.image_original.__str__()[0:self.image_original.__str__().rfind('/')])
-        try:
-            super(ItemImagePosition, self).delete()
-            shutil.rmtree(path)
-        except Exception as e:
-            pass
+        super(ItemImagePosition, self).save(force_insert, force_update, using, update_fields)
+        # Thumbnails are generated by process_thumbnails command
+        if update_fields is None and gallery_renditions.mark_pending(self):
+            gallery_models.RenditionJob.enqueue(self)
 
     def name(self) -> str:
         return self.__str__()
@@ -738,43 +724,22 @@ class ItemImagePosition(models.Model):
     original_image_admin_display.short_description = _('Original image')
 
     def large_image_admin_display(self) -> str:
-        url = get_thumbnailer(self.image_original).get_thumbnail({
-            'size': (settings.CATALOGUE_ITEM_GALLERY['large'][:settings.CATALOGUE_ITEM_GALLERY['large'].index('x')],
-                     settings.CATALOGUE_ITEM_GALLERY['large'][
-                     settings.CATALOGUE_ITEM_GALLERY['large'].index('x') + 1:]),
-            'box': self.cropping_large,
-            'crop': True,
-            'detail': True,
-        }).url
-        return str.format('<img src={0} style="width:10em" alt="Large Image: {1}"/>', url, self.image_original)
+        return str.format('<img src={0} style="width:10em" alt="Large Image: {1}"/>', self.image_large,
+                          self.image_original)
 
     large_image_admin_display.allow_tags = True
     large_image_admin_display.short_description = _('Large image')
 
     def medium_image_admin_display(self) -> str:
-        url = get_thumbnailer(self.image_original).get_thumbnail({
-            'size': (settings.CATALOGUE_ITEM_GALLERY['medium'][:settings.CATALOGUE_ITEM_GALLERY['medium'].index('x')],
-                     settings.CATALOGUE_ITEM_GALLERY['medium'][
-                     settings.CATALOGUE_ITEM_GALLERY['medium'].index('x') + 1:]),
-            'box': self.cropping_medium,
-            'crop': True,
-            'detail': True,
-        }).url
-        return str.format('<img src={0} style="width:10em" alt="Medium Image: {1}"/>', url, self.image_original)
+        return str.format('<img src={0} style="width:10em" alt="Medium Image: {1}"/>', self.image_medium,
+                          self.image_original)
 
     medium_image_admin_display.allow_tags = True
     medium_image_admin_display.short_description = _('Medium image')
 
     def small_image_admin_display(self) -> str:
-        url = get_thumbnailer(self.image_original).get_thumbnail({
-            'size': (settings.CATALOGUE_ITEM_GALLERY['small'][:settings.CATALOGUE_ITEM_GALLERY['small'].index('x')],
-                     settings.CATALOGUE_ITEM_GALLERY['small'][
-                     settings.CATALOGUE_ITEM_GALLERY['small'].index('x') + 1:]),
-            'box': self.cropping_small,
-            'crop': True,
-            'detail': True,
-        }).url
-        return str.format('<img src={0} style="width:10em" alt="Small Image: {1}"/>', url, self.image_original)
+        return str.format('<img src={0} style="width:10em" alt="Small Image: {1}"/>', self.image_small,
+                          self.image_original)
 
     small_image_admin_display.allow_tags = True
     small_image_admin_display.short_description = _('Small image')
@@ -790,46 +755,32 @@ class ItemImagePosition(models.Model):
 
 class ItemParameter(models.Model):
     id = models.AutoField(primary_key=True, verbose_name=_('Id'), help_text=_('Unique identifier'))
-    first_image = models.ImageField(null=True, blank=True, verbose_name=_('First image'), help_text=_('First image'))
-    second_image = models.ImageField(null=True, blank=True, verbose_name=_('Second image'), help_text=_('Second image'))
+    first_image = models.ImageField(null=True, blank=True, storage=media_store_storage.storage,
+                                    verbose_name=_('First image'), help_text=_('First image'))
+    second_image = models.ImageField(null=True, blank=True, storage=media_store_storage.storage,
+                                     verbose_name=_('Second image'), help_text=_('Second image'))
     item = models.ForeignKey(Item)
     default_name = models.CharField(max_length=256)
     default_value = models.CharField(max_length=256)
     weight = models.IntegerField(blank=True)
 
     def __str__(self) -> str:
-        lang = translation.get_language()
-        language = localization_models.Language.objects.filter(short_name=lang).values_list('id', flat=True)
-        if language.__len__() > 0:
-            language = language[0]
-            item_name = ItemParameterName.objects.filter(item_parameter=self,
-                                                         language=language).values_list('name', flat=True)
-            if item_name.__len__() > 0:
-                return item_name[0]
-        return self.default_name
-
-    def save(self, force_insert=False, force_update=False, using=None,
-             update_fields=None) -> None:
-        for field in self._meta.fields:
-            if field.name == 'first_image':
+        item_name = localization_resolver.get_resolver().resolve(ItemParameterName, 'item_parameter', self.id,
+                                                                 has_default=False)
+        if item_name is None:
+            return self.default_name
+        return item_name[0]
 
-                field.upload_to = str.format("catalogue/{0}/item/{1}/parameter/{2}/first_image",
-                                             self.item.category.id, self.item.id, self.default_name)
-            if field.name == 'second_image':
-                field.upload_to = str.format("catalogue/{0}/item/{1}/parameter/{2}/first_image",
-                                             self.item.category.id, self.item.id, self.default_name)
-        super(ItemParameter, self).save()
+    @classmethod
+    def prefetch_translations(cls, ids: [int]) -> None:
+        localization_resolver.get_resolver().prefetch(ItemParameterName, 'item_parameter', ids, has_default=False)
 
     def delete(self, using=None):
-        path = os.path.join(settings.BASE_DIR,
-                            settings.MEDIA_ROOT,
-                            str.format('catalogue/{0}/item/{1}/parameter/{2}',
-                                       self.item.category.id, self.item.id, self.default_name))
-        try:
-            super(ItemParameter, self).delete()
-            shutil.rmtree(path)
-        except Exception as e:
-            pass
+        # Files are removed by sweep_media once the deletion is committed
+        with transaction.atomic(using=using):
+            media_store_garbage.collect(str.format('catalogue/{0}/item/{1}/parameter/{2}', self.item.category_id,
+                                                  self.item_id, self.default_name))
+            super(ItemParameter, self).delete(using)
 
     @property
     def name(self):
@@ -857,3 +808,46 @@ class ItemParameterName(models.Model):
         unique_together = ('language', 'item_parameter')
         verbose_name = _('Item Parameter Name')
         verbose_name_plural = _('Items Parameters Names')
+
+
+class ItemFacet(models.Model):
+    """Denormalized index of parameter values and flags of active items, maintained by catalogue.facets.
+
+    Holds plain ids instead of foreign keys, so rows of deleted items stay until reindexing removes them
+    together with their counts.
+    """
+    KIND_PARAMETER = 0
+    KIND_FLAG = 1
+    KINDS = (
+        (KIND_PARAMETER, _('Parameter')),
+        (KIND_FLAG, _('Flag')),
+    )
+
+    id = models.AutoField(primary_key=True, verbose_name=_('Id'), help_text=_('Unique identifier'))
+    category_id = models.IntegerField()
+    item_id = models.IntegerField(db_index=True)
+    kind = models.SmallIntegerField(choices=KINDS)
+    name = models.CharField(max_length=256)
+    value = models.CharField(max_length=256)
+
+    class Meta:
+        db_table = 'catalogue_item_facets'
+        index_together = (('category_id', 'kind', 'name', 'value', 'item_id'), )
+        verbose_name = _('Item facet')
+        verbose_name_plural = _('Items facets')
+
+
+class CategoryFacetCount(models.Model):
+    """Number of active items of the category having the facet value"""
+    id = models.AutoField(primary_key=True, verbose_name=_('Id'), help_text=_('Unique identifier'))
+    category_id = models.IntegerField()
+    kind = models.SmallIntegerField(choices=ItemFacet.KINDS)
+    name = models.CharField(max_length=256)
+    value = models.CharField(max_length=256)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'catalogue_category_facet_counts'
+        unique_together = ('category_id', 'kind', 'name', 'value')
+        verbose_name = _('Category facet count')
+        verbose_name_plural = _('Categories facets counts')
@@ -0,0 +1,106 @@
+import math
+import catalogue.models as catalogue_models
+import neutrino.cache as neutrino_cache
+from neutrino.settings import CATALOGUE_CATEGORY_CACHE_TIME
+
+
+class InvalidPage(Exception):
+    pass
+
+
+class Page:
+    def __init__(self, rows: [tuple], number: int, max_page: int, next_cursor: int) -> None:
+        self.__rows = rows
+        self.__number = number
+        self.__max_page = max_page
+        self.__next_cursor = next_cursor
+
+    @property
+    def rows(self) -> [tuple]:
+        return self.__rows
+
+    @property
+    def number(self) -> int:
+        """Number of the page, None for pages requested by cursor"""
+        return self.__number
+
+    @property
+    def max_page(self) -> int:
+        return self.__max_page
+
+    @property
+    def next_cursor(self) -> int:
+        """Value for ?after= to get the next page, None on the last page"""
+        return self.__next_cursor
+
+
+ORDERINGS = {
+    'id': ('id',),
+    'new': ('-id',),
+    'price': ('base_price', 'id'),
+    '-price': ('-base_price', '-id'),
+}
+CURSOR_ORDERING = 'id'
+
+
+class CategoryPaginator:
+    """Splits active items of the category, optionally filtered by facet selection, into pages.
+
+    Default ordering by id follows (category, active, id) index of items, so cursor pages are read straight
+    from the index no matter how deep they are. Other orderings are available through numbered pages only.
+    """
+
+    def __init__(self, category_id: int, fields: (str,), per_page: int, selection=None,
+                 ordering: str = CURSOR_ORDERING) -> None:
+        if ordering not in ORDERINGS:
+            raise InvalidPage(ordering)
+        self.__category_id = category_id
+        # id goes first, the cursor is built from it
+        self.__fields = ('id',) + tuple(field for field in fields if field != 'id')
+        self.__per_page = per_page
+        self.__selection = selection if selection is not None and not selection.is_empty else None
+        self.__ordering = ordering
+
+    def __queryset(self):
+        queryset = catalogue_models.Item.objects.filter(category=self.__category_id, active=True)
+        if self.__selection is not None:
+            queryset = self.__selection.apply(queryset, self.__category_id)
+        return queryset.order_by(*ORDERINGS[self.__ordering])
+
+    def count(self) -> int:
+        """Number of matching items, cached until an item of the category is changed"""
+        key = str.format('catalogue:category:{0}:items_count:{1}', self.__category_id,
+                         self.__selection.signature if self.__selection is not None else '')
+        count = neutrino_cache.get_tagged(key)
+        if count is None:
+            count = self.__queryset().count()
+            neutrino_cache.set_tagged(key, count,
+                                      [neutrino_cache.tag(catalogue_models.Category, self.__category_id)],
+                                      CATALOGUE_CATEGORY_CACHE_TIME)
+        return count
+
+    @property
+    def max_page(self) -> int:
+        return max(1, int(math.ceil(self.count() / self.__per_page)))
+
+    def page(self, number: int) -> Page:
+        max_page = self.max_page
+        if number < 1 or number > max_page:
+            raise InvalidPage(number)
+        offset = (number - 1) * self.__per_page
+        rows = list(self.__queryset().values_list(*self.__fields)[offset:offset + self.__per_page])
+        next_cursor = None
+        if self.__ordering == CURSOR_ORDERING and number < max_page and rows.__len__() > 0:
+            next_cursor = rows[-1][0]
+        return Page(rows, number, max_page, next_cursor)
+
+    def after(self, cursor: int) -> Page:
+        """Page of items following the item with id equal to cursor"""
+        if self.__ordering != CURSOR_ORDERING:
+            raise InvalidPage(cursor)
+        rows = list(self.__queryset().filter(id__gt=cursor).values_list(*self.__fields)[:self.__per_page + 1])
+        next_cursor = None
+        if rows.__len__() > self.__per_page:
+            rows = rows[:self.__per_page]
+            next_cursor = rows[-1][0]
+        return Page(rows, None, self.max_page, next_cursor)
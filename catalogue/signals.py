@@ -0,0 +1,106 @@
+from django.db.models.signals import pre_save, post_save, post_delete, m2m_changed
+from django.db.models import F
+from django.dispatch import receiver
+import catalogue.facets as catalogue_facets
+import catalogue.models as catalogue_models
+import localization.models as localization_models
+import media_store.references as media_store_references
+import neutrino.cache as neutrino_cache
+
+
+def item_tags(item_id: int) -> [str]:
+    """Item page and listing of its category show item data"""
+    tags = [neutrino_cache.tag(catalogue_models.Item, item_id)]
+    category_id = catalogue_models.Item.objects.filter(id=item_id).values_list('category', flat=True).first()
+    if category_id is not None:
+        tags.append(neutrino_cache.tag(catalogue_models.Category, category_id))
+    return tags
+
+
+@receiver(post_save, sender=catalogue_models.CategoryTemplate)
+@receiver(post_delete, sender=catalogue_models.CategoryTemplate)
+@receiver(post_save, sender=catalogue_models.ItemTemplate)
+@receiver(post_delete, sender=catalogue_models.ItemTemplate)
+@receiver(post_save, sender=catalogue_models.Category)
+@receiver(post_delete, sender=catalogue_models.Category)
+def invalidate_instance(sender, instance, **kwargs) -> None:
+    neutrino_cache.invalidate_tags([neutrino_cache.instance_tag(instance)])
+
+
+@receiver(post_save, sender=catalogue_models.CategoryName)
+@receiver(post_delete, sender=catalogue_models.CategoryName)
+@receiver(post_save, sender=catalogue_models.CategoryText)
+@receiver(post_delete, sender=catalogue_models.CategoryText)
+@receiver(post_save, sender=catalogue_models.CategorySeoInformation)
+@receiver(post_delete, sender=catalogue_models.CategorySeoInformation)
+def invalidate_category(sender, instance, **kwargs) -> None:
+    neutrino_cache.invalidate_tags([neutrino_cache.tag(catalogue_models.Category, instance.category_id)])
+
+
+@receiver(m2m_changed, sender=catalogue_models.Category.galleries.through)
+def invalidate_category_galleries(sender, instance, **kwargs) -> None:
+    if isinstance(instance, catalogue_models.Category):
+        neutrino_cache.invalidate_tags([neutrino_cache.instance_tag(instance)])
+
+
+@receiver(pre_save, sender=catalogue_models.Item)
+def invalidate_previous_category(sender, instance, **kwargs) -> None:
+    """Item moved to another category disappears from listing of the previous one"""
+    if instance.id is not None:
+        neutrino_cache.invalidate_tags(item_tags(instance.id))
+
+
+@receiver(post_save, sender=catalogue_models.Item)
+@receiver(post_delete, sender=catalogue_models.Item)
+def invalidate_item(sender, instance, **kwargs) -> None:
+    neutrino_cache.invalidate_tags([neutrino_cache.instance_tag(instance),
+                                    neutrino_cache.tag(catalogue_models.Category, instance.category_id)])
+
+
+@receiver(post_save, sender=catalogue_models.ItemName)
+@receiver(post_delete, sender=catalogue_models.ItemName)
+@receiver(post_save, sender=catalogue_models.ItemText)
+@receiver(post_delete, sender=catalogue_models.ItemText)
+@receiver(post_save, sender=catalogue_models.ItemShortText)
+@receiver(post_delete, sender=catalogue_models.ItemShortText)
+@receiver(post_save, sender=catalogue_models.ItemSeoInformation)
+@receiver(post_delete, sender=catalogue_models.ItemSeoInformation)
+@receiver(post_save, sender=catalogue_models.ItemImagePosition)
+@receiver(post_delete, sender=catalogue_models.ItemImagePosition)
+@receiver(post_save, sender=catalogue_models.ItemParameter)
+@receiver(post_delete, sender=catalogue_models.ItemParameter)
+def invalidate_item_data(sender, instance, **kwargs) -> None:
+    neutrino_cache.invalidate_tags(item_tags(instance.item_id))
+
+
+@receiver(post_save, sender=catalogue_models.ItemParameterName)
+@receiver(post_delete, sender=catalogue_models.ItemParameterName)
+def invalidate_item_parameter(sender, instance, **kwargs) -> None:
+    item_id = catalogue_models.ItemParameter.objects.filter(id=instance.item_parameter_id).\
+        values_list('item', flat=True).first()
+    if item_id is not None:
+        neutrino_cache.invalidate_tags([neutrino_cache.tag(catalogue_models.Item, item_id)])
+
+
+@receiver(post_save, sender=catalogue_models.Item)
+@receiver(post_delete, sender=catalogue_models.Item)
+def reindex_item_facets(sender, instance, **kwargs) -> None:
+    catalogue_facets.mark_dirty(instance.id)
+
+
+@receiver(post_save, sender=catalogue_models.ItemParameter)
+@receiver(post_delete, sender=catalogue_models.ItemParameter)
+def reindex_item_parameter_facets(sender, instance, **kwargs) -> None:
+    catalogue_facets.mark_dirty(instance.item_id)
+
+
+@receiver(post_save, sender=localization_models.Currency)
+def update_base_prices(sender, instance, **kwargs) -> None:
+    """Base prices are kept in line with coefficient of the currency"""
+    catalogue_models.Item.objects.filter(currency=instance).\
+        update(base_price=F('default_price') * instance.coefficient)
+
+
+media_store_references.track(catalogue_models.Category, 'first_image', 'second_image')
+media_store_references.track(catalogue_models.ItemImagePosition, 'image_original')
+media_store_references.track(catalogue_models.ItemParameter, 'first_image', 'second_image')
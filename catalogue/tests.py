@@ -1,2 +1,68 @@
-from django.test import TestCase
+from django.test import RequestFactory, TestCase
+import catalogue.admin as catalogue_admin
+import catalogue.models as catalogue_models
+import localization.models as localization_models
 
+
+class NotRealizedLanguageFiltersTest(TestCase):
+    """SQL filters of unrealized languages select the same categories as checks of every row do"""
+
+    # Languages of texts and SEO information by category url
+    CATEGORIES = {
+        'complete': (('en', 'ru', 'de'), ('en', 'ru', 'de')),
+        'no-seo': (('en', 'ru', 'de'), ()),
+        'no-texts': ((), ('en', 'ru')),
+        'matching': (('en', 'ru'), ('ru', 'en')),
+        'mismatching': (('en',), ('ru',)),
+        'empty': ((), ()),
+    }
+
+    def setUp(self) -> None:
+        self.languages = {short_name: localization_models.Language.objects.create(name=name, short_name=short_name)
+                          for short_name, name in (('en', 'English'), ('ru', 'Russian'), ('de', 'German'))}
+        template = catalogue_models.CategoryTemplate.objects.create(name='default', path='default.html')
+        for url, (text_languages, seo_languages) in self.CATEGORIES.items():
+            category = catalogue_models.Category.objects.create(url=url, template=template,
+                                                                default_language=self.languages['en'])
+            for short_name in text_languages:
+                catalogue_models.CategoryText.objects.create(category=category, language=self.languages[short_name],
+                                                             name='text', body='body', weight=0)
+            for short_name in seo_languages:
+                catalogue_models.CategorySeoInformation.objects.create(category=category,
+                                                                       language=self.languages[short_name])
+
+    def filtered(self, filter_class, value: str) -> {str}:
+        params = {filter_class.parameter_name: value}
+        list_filter = filter_class(RequestFactory().get('/'), params, catalogue_models.Category,
+                                   catalogue_admin.CategoryAdmin)
+        return set(list_filter.queryset(None, catalogue_models.Category.objects.all()).values_list('url', flat=True))
+
+    def checked(self, value: str, check, languages) -> {str}:
+        """Result of the filter as it was computed before, row by row"""
+        if value in ('True', 'False'):
+            return set(category.url for category in catalogue_models.Category.objects.all()
+                       if check(category) == (value == 'True'))
+        return set(category.url for category in catalogue_models.Category.objects.all()
+                   if localization_models.Language.objects.filter(pk=value).exists() and
+                   int(value) not in languages(category))
+
+    def values(self) -> [str]:
+        return ['True', 'False', '999'] + [str(language.id) for language in self.languages.values()]
+
+    def test_text_filter(self) -> None:
+        for value in self.values():
+            self.assertEqual(self.filtered(catalogue_admin.CategoryTextNotRealizedLanguageFilter, value),
+                             self.checked(value, lambda category: category.check_language_for_text,
+                                          lambda category: list(category.text_languages_ids)), value)
+
+    def test_seo_information_filter(self) -> None:
+        for value in self.values():
+            self.assertEqual(self.filtered(catalogue_admin.CategorySeoInformationNotRealizedLanguageFilter, value),
+                             self.checked(value, lambda category: category.check_language_for_seo_information,
+                                          lambda category: list(category.seo_information_languages_ids)), value)
+
+    def test_matching_languages_filter(self) -> None:
+        for value in ('True', 'False'):
+            self.assertEqual(self.filtered(catalogue_admin.CategoryNotRealizedLanguageFilter, value),
+                             self.checked(value, lambda category: category.check_language, None), value)
+        self.assertEqual(self.filtered(catalogue_admin.CategoryNotRealizedLanguageFilter, 'unknown'), set())
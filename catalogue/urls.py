@@ -2,6 +2,7 @@ from django.conf.urls import url
 from catalogue import views as views
 
 urlpatterns = [
+     url('^feed\.(jsonl|xml)$', view=views.catalogue_feed, name='catalogue_feed'),
      url('^(\w+)/(\d+)?$', view=views.catalogue_category, name='catalogue_category'),
      url('^(\w+)/(\w+)$', view=views.catalogue_item, name='catalogue_item'),
 ]
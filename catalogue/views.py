@@ -1,17 +1,25 @@
 from django.shortcuts import render
-from django.http import HttpResponseNotFound
+from django.http import HttpResponseNotFound, StreamingHttpResponse
 from django.template.loader import get_template
 from django.template import Context
+from django.views.decorators.http import condition
 import django.utils.translation as translation
 import catalogue.models as catalogue_models
 import localization.models as localization_models
+import localization.currency as localization_currency
+import localization.registry as localization_registry
+from localization.registry import registry
+import catalogue.facets as catalogue_facets
+import catalogue.feeds as catalogue_feeds
+import catalogue.pagination as catalogue_pagination
 import catalogue.settings as catalogue_settings
 import gallery.models as gallery_models
-import banner.models as banner_models
-import menu.models as menu_models
-from django.views.decorators.cache import cache_page
+import gallery.renditions as gallery_renditions
 from static_page.forms import ContactUs
-import info_storage.models as info_storage_models
+import neutrino.cache as neutrino_cache
+import menu.builder as menu_builder
+import neutrino.chrome as chrome
+import neutrino.conditional as neutrino_conditional
 from neutrino.settings import CATALOGUE_CATEGORY_CACHE_TIME, CATALOGUE_ITEM_CACHE_TIME
 
 
@@ -50,10 +58,20 @@ class ItemContainer:
 
 
 class ItemsContainer:
-    def __init__(self, items: [catalogue_models.Item], currency: localization_models.Currency):
+    def __init__(self, items: [(int, str, str, float, int)], currency: localization_models.Currency):
+        """Takes (id, url, code, default_price, currency id) rows of items"""
         self.__items = []
-        for item in items:
-            self.append(item.url, item.name, item.code, item.short_text, item.price(currency), item.image)
+        items = list(items)
+        item_ids = [item[0] for item in items]
+        catalogue_models.Item.prefetch_translations(item_ids)
+        prices = registry.convert_prices([(item[3], item[4]) for item in items], currency)
+        images = {}
+        for image in catalogue_models.ItemImagePosition.objects.filter(item__in=item_ids,
+                                                                       default=True).order_by('id'):
+            images.setdefault(image.item_id, image)
+        for (item_id, url, code, default_price, currency_id), price in zip(items, prices):
+            self.append(url, catalogue_models.Item.name_by_id(item_id), code,
+                        catalogue_models.Item.short_text_by_id(item_id), price, images.get(item_id))
 
     def append(self, url: str, name: str, code: str, short_text: str, price: float, image: catalogue_models.ItemImagePosition):
         self.__items.append(ItemContainer(url, name, code, short_text, price, image))
@@ -104,6 +122,7 @@ class GalleryImageContainer:
         self.__medium_image = image.medium_image
         self.__large_image = image.large_image
         self.__original_image = image.original_image
+        self.__pictures = image.pictures
         self.__weight = image.weight
 
     @property
@@ -130,6 +149,10 @@ class GalleryImageContainer:
     def original_image(self) -> str:
         return self.__original_image
 
+    @property
+    def pictures(self) -> {str: gallery_renditions.Picture}:
+        return self.__pictures
+
     @property
     def weight(self) -> int:
         return self.__weight
@@ -141,6 +164,7 @@ class GalleryContainer:
         self.__second_image = gallery.second_image
         images = gallery_models.GalleryImagePosition.objects. \
             filter(gallery=gallery, active=True).order_by('weight').all()
+        gallery_models.GalleryImagePosition.prefetch_translations([image.id for image in images])
         self.__items = []
         for image in images:
             self.append(image)
@@ -168,6 +192,7 @@ class GalleriesContainer:
             self.append(item)
 
     def append(self, item: gallery_models.Gallery) -> None:
+        neutrino_cache.depends_on(neutrino_cache.instance_tag(item))
         self.__items[item.marker] = GalleryContainer(item)
 
     @property
@@ -175,97 +200,43 @@ class GalleriesContainer:
         return self.__items
 
 
-class BannerImageContainer:
-    def __init__(self, image: banner_models.BannerImagePosition) -> None:
-        self.__name = image.name
-        self.__description = image.description
-        self.__small_image = image.small_image
-        self.__medium_image = image.medium_image
-        self.__large_image = image.large_image
-        self.__original_image = image.original_image
-        self.__weight = image.weight
-
-    @property
-    def name(self) -> str:
-        return self.__name
-
-    @property
-    def description(self) -> str:
-        return self.__description
-
-    @property
-    def small_image(self) -> str:
-        return self.__small_image
-
-    @property
-    def medium_image(self) -> str:
-        return self.__medium_image
-
-    @property
-    def large_image(self) -> str:
-        return self.__large_image
-
-    @property
-    def original_image(self) -> str:
-        return self.__original_image
-
-    @property
-    def weight(self) -> int:
-        return self.__weight
-
-
-class BannerContainer:
-    def __init__(self, banner: banner_models.Banner) -> None:
-        images = banner_models.BannerImagePosition.objects. \
-            filter(banner=banner, active=True).order_by('weight').all()
-        self.__items = []
-        for image in images:
-            self.append(image)
-
-    def append(self, image: banner_models.BannerImagePosition) -> None:
-        self.__items.append(BannerImageContainer(image))
-
-    @property
-    def images(self) -> {str: BannerImageContainer}:
-        return self.__items
-
-
-class BannersContainer:
-    def __init__(self, banners: [banner_models.Banner]) -> None:
-        self.__items = {}
-        for item in banners:
-            self.append(item)
-
-    def append(self, item: banner_models.Banner) -> None:
-        self.__items[item.marker] = BannerContainer(item)
-
-    @property
-    def banners(self) -> {str: banner_models.Banner}:
-        return self.__items
-
-
-def get_currency(request):
-    currency = None
-    if 'currency' not in request.session:
-        try:
-            request.session['currency'] = localization_models.Currency.objects.get(default=True).short_name
-        except Exception:
-            request.session['currency'] = 'None'
-
-    if request.session['currency'] != 'None':
-        try:
-            currency = localization_models.Currency.objects.get(short_name=request.session['currency'])
-        except Exception:
-            request.session['currency'] = 'None'
-    return currency
-
-
-@cache_page(CATALOGUE_CATEGORY_CACHE_TIME)
+def category_state(request, category: str, page: str = 1) -> neutrino_conditional.PageState:
+    row = catalogue_models.Category.objects.filter(url=category).values_list('id', 'template').first()
+    if row is None:
+        return None
+    category_id, template_id = row
+    dates = neutrino_conditional.label_dates(
+        catalogue_models.CategoryDateTimeUserLabel.objects.filter(category=category_id))
+    dates += neutrino_conditional.label_dates(
+        catalogue_models.ItemDateTimeUserLabel.objects.filter(item__category=category_id))
+    dates += neutrino_conditional.gallery_dates(gallery_models.Gallery.objects.filter(category=category_id))
+    dates += neutrino_conditional.shared_dates()
+    return neutrino_conditional.PageState(dates, [neutrino_cache.tag(catalogue_models.Category, category_id),
+                                                  neutrino_cache.tag(catalogue_models.CategoryTemplate, template_id)])
+
+
+def item_state(request, category: str, item: str) -> neutrino_conditional.PageState:
+    row = catalogue_models.Item.objects.filter(url=item, category__url=category).\
+        values_list('id', 'template', 'category').first()
+    if row is None:
+        return None
+    item_id, template_id, category_id = row
+    dates = neutrino_conditional.label_dates(catalogue_models.ItemDateTimeUserLabel.objects.filter(item=item_id))
+    dates += neutrino_conditional.shared_dates()
+    return neutrino_conditional.PageState(dates, [neutrino_cache.tag(catalogue_models.Item, item_id),
+                                                  neutrino_cache.tag(catalogue_models.ItemTemplate, template_id)])
+
+
+@neutrino_conditional.conditional_page(category_state)
+@neutrino_cache.tagged_cache_page(CATALOGUE_CATEGORY_CACHE_TIME, vary_on=localization_currency.currency_code)
 def catalogue_category(request, category: str, page: str = 1):
     try:
         category = catalogue_models.Category.objects.get(url=category)
     except Exception:
         return HttpResponseNotFound(get_template('system/404.html').render(Context({})))
+    neutrino_cache.depends_on(neutrino_cache.instance_tag(category),
+                              neutrino_cache.tag(catalogue_models.CategoryTemplate, category.template_id),
+                              localization_registry.TAG)
 
     language_code = translation.get_language()
     texts = TextsContainer(catalogue_models.CategoryText.objects.order_by('weight').
@@ -275,97 +246,115 @@ def catalogue_category(request, category: str, page: str = 1):
     seo_info = catalogue_models.CategorySeoInformation.objects.filter(category=category,
                                                                       language__short_name=language_code).first()
     galleries = GalleriesContainer(category.galleries.all())
-    banners = BannersContainer(banner_models.Banner.objects.all())
 
     if page is None:
         page = 1
-    currency = get_currency(request)
+    currency = localization_currency.get_currency(request)
+    site_chrome = chrome.get_chrome(localization_currency.currency_code(request))
+    selection = catalogue_facets.FacetSelection.from_query(request.GET, currency)
+    ordering = request.GET.get('sort', catalogue_pagination.CURSOR_ORDERING)
     try:
-        items = ItemsContainer(catalogue_models.Item.objects.filter(category=category, active=True)
-                               [(int(page) - 1): (int(page) * catalogue_settings.PRODUCT_ON_PAGE)],
-                               currency).items
-        max_page = round(catalogue_models.Item.objects.filter(category=category,
-                                                              active=True).count() / catalogue_settings.PRODUCT_ON_PAGE)
-    except Exception:
+        paginator = catalogue_pagination.CategoryPaginator(category.id, ('url', 'code', 'default_price', 'currency'),
+                                                           catalogue_settings.PRODUCT_ON_PAGE, selection, ordering)
+        if 'after' in request.GET:
+            items_page = paginator.after(int(request.GET['after']))
+        else:
+            items_page = paginator.page(int(page))
+    except (ValueError, catalogue_pagination.InvalidPage):
         return HttpResponseNotFound(get_template('system/404.html').render(Context({})))
-
-    main_menu = menu_models.MainMenu.objects.all()
-    additional_menu = menu_models.AdditionalMenu.objects.all()
-    extra_menu = menu_models.ExtraMenu.objects.all()
+    items = ItemsContainer(items_page.rows, currency).items
+    facets = catalogue_facets.facet_counts(category.id, selection)
+    min_price, max_price = catalogue_facets.price_bounds(category.id, currency)
 
     template = category.template.path
 
-    info_storage = info_storage_models.Storage.objects.all().values_list('key', 'value')
-    info_storage_dict = {}
-    for key, value in info_storage:
-        info_storage_dict[key] = value
-
     return render(request, template, {
         'category': category,
-        'languages': localization_models.Language.objects.all(),
+        'languages': registry.languages(),
         'language_code': language_code,
         'texts_container': texts.texts,
         'galleries_container': galleries.galleries,
-        'banners_container': banners,
-        'main_menu': main_menu,
-        'additional_menu': additional_menu,
-        'extra_menu': extra_menu,
+        'banners_container': site_chrome.banners,
+        'main_menu': site_chrome.main_menu,
+        'additional_menu': site_chrome.additional_menu,
+        'extra_menu': site_chrome.extra_menu,
+        'breadcrumbs': site_chrome.breadcrumbs(request.path),
+        'active_branch': site_chrome.active_branch(request.path),
+        'menu_url': menu_builder.page_url(request.path),
         'seo_info': seo_info,
         'items': items,
-        'max_page': max_page,
-        'current_page': page,
+        'max_page': items_page.max_page,
+        'current_page': items_page.number,
+        'next_cursor': items_page.next_cursor,
+        'facets': facets,
+        'selection': selection,
+        'min_price': min_price,
+        'max_price': max_price,
         'currency': currency,
-        'info_storage': info_storage_dict
+        'info_storage': site_chrome.info_storage
     })
 
 
-@cache_page(CATALOGUE_ITEM_CACHE_TIME)
+@neutrino_conditional.conditional_page(item_state)
+@neutrino_cache.tagged_cache_page(CATALOGUE_ITEM_CACHE_TIME, vary_on=localization_currency.currency_code)
 def catalogue_item(request, category: str, item: str):
     try:
         item = catalogue_models.Item.objects.get(url=item, category__url=category)
     except Exception:
         return HttpResponseNotFound(get_template('system/404.html').render(Context({})))
+    neutrino_cache.depends_on(neutrino_cache.instance_tag(item),
+                              neutrino_cache.tag(catalogue_models.ItemTemplate, item.template_id),
+                              localization_registry.TAG)
 
     language_code = translation.get_language()
     texts = TextsContainer(catalogue_models.ItemText.objects.order_by('weight').
                            filter(item=item, language__short_name=language_code).all().values_list('name', 'body',
                                                                                                    'weight'))
 
-    parameters = catalogue_models.ItemParameter.objects.filter(item=item).all()
+    parameters = list(catalogue_models.ItemParameter.objects.filter(item=item).all())
+    catalogue_models.ItemParameter.prefetch_translations([parameter.id for parameter in parameters])
     seo_info = catalogue_models.ItemSeoInformation.objects.filter(item=item,
                                                                   language__short_name=language_code).first()
-    banners = BannersContainer(banner_models.Banner.objects.all())
 
     images = catalogue_models.ItemImagePosition.objects.filter(item=item).all()
 
-    currency = get_currency(request)
-
-    main_menu = menu_models.MainMenu.objects.all()
-    additional_menu = menu_models.AdditionalMenu.objects.all()
-    extra_menu = menu_models.ExtraMenu.objects.all()
+    currency = localization_currency.get_currency(request)
+    site_chrome = chrome.get_chrome(localization_currency.currency_code(request))
 
     template = item.template.path
 
     price = item.price(currency)
 
-    info_storage = info_storage_models.Storage.objects.all().values_list('key', 'value')
-    info_storage_dict = {}
-    for key, value in info_storage:
-        info_storage_dict[key] = value
-
     return render(request, template, {
         'item': item,
         'language_code': language_code,
         'texts_container': texts.texts,
-        'banners_container': banners,
-        'main_menu': main_menu,
-        'additional_menu': additional_menu,
-        'extra_menu': extra_menu,
+        'banners_container': site_chrome.banners,
+        'main_menu': site_chrome.main_menu,
+        'additional_menu': site_chrome.additional_menu,
+        'extra_menu': site_chrome.extra_menu,
+        'breadcrumbs': site_chrome.breadcrumbs(request.path),
+        'active_branch': site_chrome.active_branch(request.path),
+        'menu_url': menu_builder.page_url(request.path),
         'seo_info': seo_info,
         'parameters': parameters,
         'short_text': item.short_text,
         'images': images,
         'currency': currency,
         'price': price,
-        'info_storage': info_storage_dict
+        'info_storage': site_chrome.info_storage
     })
+
+
+@condition(etag_func=catalogue_feeds.etag)
+def catalogue_feed(request, feed_format: str):
+    """Active items with prices in ?currency=<code> as JSON lines or Google Merchant XML"""
+    currency = catalogue_feeds.requested_currency(request)
+    if request.GET.get('currency') and currency is None:
+        return HttpResponseNotFound(get_template('system/404.html').render(Context({})))
+    items = catalogue_feeds.feed_items(request, translation.get_language(), currency)
+    if feed_format == 'xml':
+        content = catalogue_feeds.xml(items, request.get_host(), request.build_absolute_uri('/'))
+    else:
+        content = catalogue_feeds.jsonl(items)
+    return StreamingHttpResponse(content, content_type=catalogue_feeds.CONTENT_TYPES[feed_format])
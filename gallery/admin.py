@@ -2,7 +2,7 @@ from datetime import datetime
 from django.contrib import admin
 from django.db.models import Max
 from django.contrib.auth import models as auth_models
-from localization import models as localization_models
+import localization.filters as localization_filters
 import gallery.models as gallery_models
 import image_cropping
 from django.utils.translation import ugettext_lazy as _
@@ -33,40 +33,14 @@ class GalleryImagePositionFilter(SimpleListFilter):
         return queryset.filter(gallery=gallery_models.Gallery.objects.filter(id=self.value()).first())
 
 
-class GalleryImagePositionTextDataNotRealizedLanguageFilter(SimpleListFilter):
+class GalleryImagePositionTextDataNotRealizedLanguageFilter(localization_filters.NotRealizedLanguageFilter):
     title = _('Realized Text Data')
 
     parameter_name = 'text_data_lang'
 
-    def lookups(self, request, model_admin) -> [(int, str)]:
-        languages = localization_models.Language.objects.all().values_list('id', 'name')
-        lookup = [('True', 'Has no unrealized languages'), ('False', 'Has unrealized languages')]
-        for lang_id, name in languages:
-            lookup.append((lang_id, name))
-        return lookup
-
-    def queryset(self, request, queryset) -> [gallery_models.GalleryImagePosition]:
-        if self.value() is None:
-            return queryset
-        result = []
-        if self.value() == 'True':
-            for gallery_image_position in queryset:
-                if gallery_image_position.check_language_for_text_data:
-                    result.append(gallery_image_position.id)
-        elif self.value() == 'False':
-            for gallery_image_position in queryset:
-                if not gallery_image_position.check_language_for_text_data:
-                    result.append(gallery_image_position.id)
-        else:
-            language = localization_models.Language.objects.filter(pk=self.value()).all().values_list('id',
-                                                                                                          flat=True)
-            if language.__len__() > 0:
-                language = language[0]
-                for gallery_image_position in queryset:
-                    if language not in gallery_image_position.text_data_languages_ids and \
-                                    gallery_image_position.text_data_languages_ids.__len__() > 0:
-                        result.append(gallery_image_position.id)
-        return queryset.filter(id__in=result)
+    translation_model = gallery_models.GalleryImagePositionTextData
+    owner_field = 'gallery_image_position'
+    require_translations = True
 
 
 # GalleryImagePosition
@@ -198,38 +172,13 @@ class LastModifiedByGalleryFilter(SimpleListFilter):
         return queryset.filter(id__in=galleries)
 
 
-class GalleryTextDataNotRealizedLanguageFilter(SimpleListFilter):
+class GalleryTextDataNotRealizedLanguageFilter(localization_filters.NotRealizedLanguageFilter):
     title = _('Realized Text Data')
 
     parameter_name = 'text_data_lang'
 
-    def lookups(self, request, model_admin) -> [(int, str)]:
-        languages = localization_models.Language.objects.all().values_list('id', 'name')
-        lookup = [('True', 'Has no unrealized languages'), ('False', 'Has unrealized languages')]
-        for language_id, language_name in languages:
-            lookup.append((language_id, language_name))
-        return lookup
-
-    def queryset(self, request, queryset) -> [gallery_models.Gallery]:
-        if self.value() is None:
-            return queryset
-        result = []
-        if self.value() == 'True':
-            for gallery in queryset:
-                if gallery.check_language_for_text_data:
-                    result.append(gallery.id)
-        elif self.value() == 'False':
-            for gallery in queryset:
-                if not gallery.check_language_for_text_data:
-                    result.append(gallery.id)
-        else:
-            language = localization_models.Language.objects.filter(pk=self.value()).all().values_list('id', flat=True)
-            if language.__len__() > 0:
-                language = language[0]
-                for gallery in queryset:
-                    if language not in gallery.text_data_languages_ids:
-                        result.append(gallery.id)
-        return queryset.filter(id__in=result)
+    translation_model = gallery_models.GalleryTextData
+    owner_field = 'gallery'
 
 
 # Gallery
@@ -5,3 +5,6 @@ from django.apps import AppConfig
 class GalleryAppConfig(AppConfig):
     name = 'gallery'
     verbose_name = _('Gallery')
+
+    def ready(self) -> None:
+        import gallery.signals
@@ -0,0 +1,59 @@
+import datetime
+import traceback
+from django.apps import apps
+from django.db.models import F, Q
+from django.utils import timezone
+import gallery.models as gallery_models
+import gallery.renditions as gallery_renditions
+
+
+# Job claimed earlier than this is considered abandoned by a crashed worker
+CLAIM_TIMEOUT = datetime.timedelta(minutes=10)
+MAX_ATTEMPTS = 3
+
+
+def claim(limit: int) -> [int]:
+    """Marks up to limit waiting jobs as taken by this worker; safe to run in several workers at once"""
+    now = timezone.now()
+    candidates = gallery_models.RenditionJob.objects.\
+        filter(Q(claimed_at=None) | Q(claimed_at__lt=now - CLAIM_TIMEOUT), attempts__lt=MAX_ATTEMPTS).\
+        order_by('id').values_list('id', 'claimed_at')[:limit]
+    claimed = []
+    for job_id, claimed_at in candidates:
+        # Only one worker succeeds in changing claimed_at from the value it has read
+        if gallery_models.RenditionJob.objects.filter(id=job_id, claimed_at=claimed_at).update(claimed_at=now) == 1:
+            claimed.append(job_id)
+    return claimed
+
+
+def failed() -> [gallery_models.RenditionJob]:
+    """Jobs which are not claimed any more after MAX_ATTEMPTS failures; they are kept until requested again"""
+    return list(gallery_models.RenditionJob.objects.filter(attempts__gte=MAX_ATTEMPTS).order_by('id'))
+
+
+def give_up(job: gallery_models.RenditionJob) -> None:
+    """Clears pending flag of the image position, so it is not shown as processing forever"""
+    try:
+        apps.get_model(job.model_label).objects.filter(id=job.object_id).update(renditions_pending=False)
+    except LookupError:
+        pass
+
+
+def process(job_id: int) -> bool:
+    """Generates renditions of the job's image position; returns whether it succeeded"""
+    job = gallery_models.RenditionJob.objects.filter(id=job_id).first()
+    if job is None:
+        return True
+    try:
+        instance = apps.get_model(job.model_label).objects.filter(id=job.object_id).first()
+        if instance is not None:
+            gallery_renditions.store(instance)
+    except Exception:
+        gallery_models.RenditionJob.objects.filter(id=job.id).\
+            update(claimed_at=None, attempts=F('attempts') + 1, error=traceback.format_exc())
+        if job.attempts + 1 >= MAX_ATTEMPTS:
+            give_up(job)
+        return False
+    # Job requested again while it was processed stays in the queue
+    gallery_models.RenditionJob.objects.filter(id=job.id, requested_at=job.requested_at).delete()
+    return True
@@ -0,0 +1,40 @@
+import multiprocessing
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection
+import gallery.jobs as gallery_jobs
+
+
+class Command(BaseCommand):
+    help = 'Generates thumbnails of uploaded images waiting in the rendition queue using a pool of processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=multiprocessing.cpu_count(),
+                            help='Number of worker processes')
+        parser.add_argument('--batch', type=int, default=50, help='Number of jobs claimed at once')
+        parser.add_argument('--loop', action='store_true', default=False,
+                            help='Keep polling the queue instead of exiting when it is empty')
+        parser.add_argument('--interval', type=float, default=5, help='Seconds between polls in loop mode')
+
+    def handle(self, *args, **options):
+        # Forked processes must not share the connection of the parent
+        connection.close()
+        pool = multiprocessing.Pool(options['processes'], initializer=connection.close)
+        try:
+            while True:
+                job_ids = gallery_jobs.claim(options['batch'])
+                connection.close()
+                if job_ids.__len__() > 0:
+                    results = pool.map(gallery_jobs.process, job_ids)
+                    self.stdout.write(str.format('{0} processed, {1} failed', results.count(True),
+                                                 results.count(False)))
+                    continue
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+        finally:
+            pool.close()
+            pool.join()
+        for job in gallery_jobs.failed():
+            self.stderr.write(str.format('{0} failed {1} times: {2}', job, job.attempts,
+                                         job.error.strip().splitlines()[-1] if job.error.strip() else ''))
@@ -0,0 +1,32 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+import gallery.renditions as gallery_renditions
+
+
+MODELS = ('gallery.GalleryImagePosition', 'catalogue.ItemImagePosition', 'banner.BannerImagePosition')
+
+
+class Command(BaseCommand):
+    help = 'Fills stored thumbnail urls of image positions, regenerating only thumbnails whose crop has changed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verify', action='store_true', default=False,
+                            help='Also regenerate thumbnails whose files are missing in storage')
+        parser.add_argument('--dry-run', action='store_true', default=False,
+                            help='Only report stale thumbnails')
+
+    def handle(self, *args, **options):
+        for label in MODELS:
+            model = apps.get_model(label)
+            checked = 0
+            refreshed = 0
+            for instance in model.objects.order_by('id').iterator():
+                checked += 1
+                stale = gallery_renditions.stale_sizes(instance, options['verify'])
+                if stale.__len__() == 0:
+                    continue
+                refreshed += 1
+                self.stdout.write(str.format('{0} {1}: {2}', label, instance.id, ', '.join(stale)))
+                if not options['dry_run']:
+                    gallery_renditions.store(instance, options['verify'])
+            self.stdout.write(str.format('{0}: {1} checked, {2} stale', label, checked, refreshed))
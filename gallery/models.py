@@ -1,19 +1,22 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.utils import timezone
 from django.contrib.auth import models as auth_models
 from django.utils.translation import ugettext_lazy as _
 import localization.models as localization_models
+from localization.registry import registry
+import localization.resolver as localization_resolver
 from image_cropping import ImageRatioField
-from easy_thumbnails.files import get_thumbnailer
+import gallery.renditions as gallery_renditions
+import media_store.garbage as media_store_garbage
+import media_store.storage as media_store_storage
 # Config variables
-import django.utils.translation as translation
-import os
 import neutrino.settings as settings
-import shutil
 
 
 class GalleryImagePosition(models.Model):
     id = models.AutoField(primary_key=True, verbose_name=_('Id'), help_text=_('Unique identifier'))
-    image_original = models.ImageField(verbose_name=_('Original image'), help_text=_('Original Image'))
+    image_original = models.ImageField(storage=media_store_storage.storage, verbose_name=_('Original image'),
+                                       help_text=_('Original Image'))
     cropping_large = ImageRatioField('image_original', settings.GALLERY['large'], verbose_name=_('Large image'),
                                      help_text=_('Large image'))
     cropping_medium = ImageRatioField('image_original', settings.GALLERY['medium'], verbose_name=_('Medium image'),
@@ -28,6 +31,13 @@ class GalleryImagePosition(models.Model):
     image_large = models.CharField(max_length=256, null=True, blank=True, editable=False)
     image_medium = models.CharField(max_length=256, null=True, blank=True, editable=False)
     image_small = models.CharField(max_length=256, null=True, blank=True, editable=False)
+    renditions = models.TextField(null=True, blank=True, editable=False,
+                                  help_text=_('Urls of thumbnails in other formats and densities'))
+    renditions_signature = models.CharField(max_length=512, null=True, blank=True, editable=False)
+    renditions_pending = models.BooleanField(default=False, editable=False, verbose_name=_('Is processing?'),
+                                             help_text=_('Thumbnails are being generated'))
+
+    RENDITION_DIMENSIONS = settings.GALLERY
 
     @property
     def original_image(self) -> str:
@@ -35,36 +45,21 @@ class GalleryImagePosition(models.Model):
 
     @property
     def large_image(self) -> str:
-        url = get_thumbnailer(self.image_original).get_thumbnail({
-            'size': (settings.GALLERY['large'][:settings.GALLERY['large'].index('x')],
-                     settings.GALLERY['large'][settings.GALLERY['large'].index('x') + 1:]),
-            'box': self.cropping_large,
-            'crop': True,
-            'detail': True,
-        }).url
-        return url
+        """Stored thumbnail, original image while thumbnails are being generated"""
+        return self.image_large or self.original_image
 
     @property
     def medium_image(self) -> str:
-        url = get_thumbnailer(self.image_original).get_thumbnail({
-            'size': (settings.GALLERY['medium'][:settings.GALLERY['medium'].index('x')],
-                     settings.GALLERY['medium'][settings.GALLERY['medium'].index('x') + 1:]),
-            'box': self.cropping_small,
-            'crop': True,
-            'detail': True,
-        }).url
-        return url
+        return self.image_medium or self.original_image
 
     @property
     def small_image(self) -> str:
-        url = get_thumbnailer(self.image_original).get_thumbnail({
-            'size': (settings.GALLERY['small'][:settings.GALLERY['small'].index('x')],
-                     settings.GALLERY['small'][settings.GALLERY['small'].index('x') + 1:]),
-            'box': self.cropping_medium,
-            'crop': True,
-            'detail': True,
-        }).url
-        return url
+        return self.image_small or self.original_image
+
+    @property
+    def pictures(self) -> {str: gallery_renditions.Picture}:
+        """Thumbnails of all sizes with srcset of every format and density, by size"""
+        return gallery_renditions.pictures(self)
 
     @property
     def large_image_path(self) -> str:
@@ -81,68 +76,42 @@ class GalleryImagePosition(models.Model):
     @property
     def check_language_for_text_data(self) -> bool:
         """Checks if languages of text data are corresponding to languages of the website"""
-        languages = localization_models.Language.objects.all().values_list('id', flat=True)
+        languages = registry.language_ids()
+        text_data_languages_ids = self.text_data_languages_ids
         for language in languages:
-            if language not in self.text_data_languages_ids:
+            if language not in text_data_languages_ids:
                 return False
         return True
 
     def save(self, force_insert=False, force_update=False, using=None,
              update_fields=None) -> None:
-        for field in self._meta.fields:
-            if field.name == 'image_original':
-                field.upload_to = str.format('gallery/{0}/images/{1}/', self.gallery.marker,
-                                             self.image_original.__str__()[0:self.image_original.__str__().index('.')])
-        super(GalleryImagePosition, self).save()
-        self.image_large = self.large_image
-        self.image_medium = self.medium_image
-        self.image_small = self.small_image
-
-        super(GalleryImagePosition, self).save()
-
-    def delete(self, using=None):
-        path = os.path.join(settings.BASE_DIR,
-                            settings.MEDIA_ROOT,
-                            self.image_original.__str__()[0:self.image_original.__str__().rfind('/')])
-        try:
-            shutil.rmtree(path)
-            super(GalleryImagePosition, self).delete()
-        except Exception as e:
-            pass
+        super(GalleryImagePosition, self).save(force_insert, force_update, using, update_fields)
+        # Thumbnails are generated by process_thumbnails command
+        if update_fields is None and gallery_renditions.mark_pending(self):
+            RenditionJob.enqueue(self)
 
     def __str__(self) -> str:
-        lang = translation.get_language()
-        language = localization_models.Language.objects.filter(short_name=lang).values_list('id', flat=True)
-        if language.__len__() > 0:
-            language = language[0]
-            gallery_image_position_text_data = GalleryImagePositionTextData.objects.filter(gallery_image_position=self,
-                                                                                           language=language).first()
-            if gallery_image_position_text_data is not None:
-                return gallery_image_position_text_data.name
-        gallery_image_position_text_data = GalleryImagePositionTextData.objects.filter(gallery_image_position=self,
-                                                                                       default=True).first()
+        gallery_image_position_text_data = localization_resolver.get_resolver().resolve(
+            GalleryImagePositionTextData, 'gallery_image_position', self.id, ('name', 'description'))
         if gallery_image_position_text_data is None:
             return _('Image has no name').__str__()
-        return gallery_image_position_text_data.name
+        return gallery_image_position_text_data[0]
+
+    @classmethod
+    def prefetch_translations(cls, ids: [int]) -> None:
+        localization_resolver.get_resolver().prefetch(GalleryImagePositionTextData, 'gallery_image_position', ids,
+                                                      ('name', 'description'))
 
     def name(self) -> str:
         return self.__str__()
 
     @property
     def description(self) -> str:
-        lang = translation.get_language()
-        language = localization_models.Language.objects.filter(short_name=lang).values_list('id', flat=True)
-        if language.__len__() > 0:
-            language = language[0]
-            gallery_image_position_text_data = GalleryImagePositionTextData.objects.filter(gallery_image_position=self,
-                                                                                           language=language).first()
-            if gallery_image_position_text_data is not None:
-                return gallery_image_position_text_data.description
-        gallery_image_position_text_data = GalleryImagePositionTextData.objects.filter(gallery_image_position=self,
-                                                                                       default=True).first()
+        gallery_image_position_text_data = localization_resolver.get_resolver().resolve(
+            GalleryImagePositionTextData, 'gallery_image_position', self.id, ('name', 'description'))
         if gallery_image_position_text_data is None:
             return _('Image has no description').__str__()
-        return gallery_image_position_text_data.description
+        return gallery_image_position_text_data[1]
 
     name.short_description = _('Name')
 
@@ -153,48 +122,29 @@ class GalleryImagePosition(models.Model):
     original_image_admin_display.short_description = _('Original image')
 
     def large_image_admin_display(self) -> str:
-        url = get_thumbnailer(self.image_original).get_thumbnail({
-            'size': (settings.GALLERY['large'][:settings.GALLERY['large'].index('x')],
-                     settings.GALLERY['large'][settings.GALLERY['large'].index('x') + 1:]),
-            'box': self.cropping_large,
-            'crop': True,
-            'detail': True,
-        }).url
-        return str.format('<img src={0} style="width:10em" alt="Large Image: {1}"/>', url, self.image_original)
+        return str.format('<img src={0} style="width:10em" alt="Large Image: {1}"/>', self.image_large,
+                          self.image_original)
 
     large_image_admin_display.allow_tags = True
     large_image_admin_display.short_description = _('Large image')
 
     def medium_image_admin_display(self) -> str:
-        url = get_thumbnailer(self.image_original).get_thumbnail({
-            'size': (settings.GALLERY['medium'][:settings.GALLERY['medium'].index('x')],
-                     settings.GALLERY['medium'][settings.GALLERY['medium'].index('x') + 1:]),
-            'box': self.cropping_medium,
-            'crop': True,
-            'detail': True,
-        }).url
-        return str.format('<img src={0} style="width:10em" alt="Medium Image: {1}"/>', url, self.image_original)
+        return str.format('<img src={0} style="width:10em" alt="Medium Image: {1}"/>', self.image_medium,
+                          self.image_original)
 
     medium_image_admin_display.allow_tags = True
     medium_image_admin_display.short_description = _('Medium image')
 
     def small_image_admin_display(self) -> str:
-        url = get_thumbnailer(self.image_original).get_thumbnail({
-            'size': (settings.GALLERY['small'][:settings.GALLERY['small'].index('x')],
-                     settings.GALLERY['small'][settings.GALLERY['small'].index('x') + 1:]),
-            'box': self.cropping_small,
-            'crop': True,
-            'detail': True,
-        }).url
-        return str.format('<img src={0} style="width:10em" alt="Small Image: {1}"/>', url, self.image_original)
+        return str.format('<img src={0} style="width:10em" alt="Small Image: {1}"/>', self.image_small,
+                          self.image_original)
 
     small_image_admin_display.allow_tags = True
     small_image_admin_display.short_description = _('Small image')
 
     def check_language_for_text_data_admin_display(self) -> str:
         """Checks if languages of text data are corresponding to languages of the website"""
-        unrealized_languages = localization_models.Language.objects.exclude(
-            id__in=self.text_data_languages_ids).all().values_list('name', flat=True)
+        unrealized_languages = registry.unrealized_languages_names(self.text_data_languages_ids)
         languages__str = "<br/>".join(unrealized_languages)
         if unrealized_languages.__len__() > 0:
             return str.format(
@@ -209,9 +159,10 @@ class GalleryImagePosition(models.Model):
     @property
     def check_language_for_text_data(self) -> bool:
         """Checks if languages of text data are corresponding to languages of the website"""
-        languages = localization_models.Language.objects.all().values_list('id', flat=True)
+        languages = registry.language_ids()
+        text_data_languages_ids = self.text_data_languages_ids
         for language in languages:
-            if language not in self.text_data_languages_ids:
+            if language not in text_data_languages_ids:
                 return False
         return True
 
@@ -233,37 +184,23 @@ class GalleryImagePosition(models.Model):
 
 class Gallery(models.Model):
     id = models.AutoField(primary_key=True, verbose_name=_('Id'), help_text=_('Unique identifier'))
-    first_image = models.ImageField(null=True, blank=True, verbose_name=_('First cover'), help_text=_('First cover'))
-    second_image = models.ImageField(null=True, blank=True, verbose_name=_('Second cover'), help_text=_('Second cover'))
+    first_image = models.ImageField(null=True, blank=True, storage=media_store_storage.storage,
+                                    verbose_name=_('First cover'), help_text=_('First cover'))
+    second_image = models.ImageField(null=True, blank=True, storage=media_store_storage.storage,
+                                     verbose_name=_('Second cover'), help_text=_('Second cover'))
     marker = models.CharField(max_length=256, verbose_name=_('Marker'), help_text=_('Marker'))
 
     def __str__(self) -> str:
-        lang = translation.get_language()
-        language = localization_models.Language.objects.filter(short_name=lang).values_list('id', flat=True)
-        if language.__len__() > 0:
-            language = language[0]
-            gallery_text_data = GalleryTextData.objects.filter(gallery=self, language=language).first()
-            if gallery_text_data is not None:
-                return gallery_text_data.name
-        gallery_text_data = GalleryTextData.objects.filter(gallery=self, default=True).first()
-        return gallery_text_data.name
-
-    def save(self, force_insert: bool = False, force_update: bool = False, using=None,
-             update_fields=None) -> None:
-        for field in self._meta.fields:
-            if field.name == 'first_image':
-                field.upload_to = str.format("gallery/{0}/cover/first_image/", self.marker)
-            if field.name == 'second_image':
-                field.upload_to = str.format("gallery/{0}/cover/second_image/", self.marker)
-        super(Gallery, self).save()
+        gallery_text_data = localization_resolver.get_resolver().resolve(GalleryTextData, 'gallery', self.id)
+        if gallery_text_data is None:
+            return ''
+        return gallery_text_data[0]
 
     def delete(self, using=None):
-        path = os.path.join(settings.BASE_DIR, settings.MEDIA_ROOT, str.format('gallery/{0}', self.marker))
-        try:
-            shutil.rmtree(path)
-            super(Gallery, self).delete()
-        except Exception:
-            pass
+        # Files are removed by sweep_media once the deletion is committed
+        with transaction.atomic(using=using):
+            media_store_garbage.collect(str.format('gallery/{0}', self.marker))
+            super(Gallery, self).delete(using)
 
     def name(self) -> str:
         return self.__str__()
@@ -301,8 +238,7 @@ class Gallery(models.Model):
 
     def check_language_for_text_data_admin_display(self) -> str:
         """Checks if languages of text data are corresponding to languages of the website"""
-        unrealized_languages = localization_models.Language.objects.exclude(
-            id__in=self.text_data_languages_ids).all().values_list('name', flat=True)
+        unrealized_languages = registry.unrealized_languages_names(self.text_data_languages_ids)
         languages__str = "<br/>".join(unrealized_languages)
         if unrealized_languages.__len__() > 0:
             return str.format(
@@ -317,7 +253,7 @@ class Gallery(models.Model):
     @property
     def check_language_for_text_data(self) -> bool:
         """Checks if languages of text data are corresponding to languages of the website"""
-        languages = localization_models.Language.objects.all().values_list('id', flat=True)
+        languages = registry.language_ids()
         text_languages = self.text_data_languages_ids
         for language in languages:
             if language not in text_languages:
@@ -390,3 +326,51 @@ class GalleryTextData(models.Model):
         unique_together = ('language', 'gallery')
         verbose_name = _('Gallery metadata')
         verbose_name_plural = _('Galleries metadata')
+
+
+class RenditionJob(models.Model):
+    """Image position waiting for its thumbnails, processed by process_thumbnails command"""
+    id = models.AutoField(primary_key=True, verbose_name=_('Id'), help_text=_('Unique identifier'))
+    model_label = models.CharField(max_length=128)
+    object_id = models.IntegerField()
+    requested_at = models.DateTimeField()
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.IntegerField(default=0)
+    error = models.TextField(blank=True, default='')
+
+    @classmethod
+    def enqueue(cls, instance) -> None:
+        label = str.format('{0}.{1}', instance._meta.app_label, instance._meta.object_name)
+        now = timezone.now()
+        updated = cls.objects.filter(model_label=label, object_id=instance.id).\
+            update(requested_at=now, claimed_at=None, attempts=0, error='')
+        if updated > 0:
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(model_label=label, object_id=instance.id, requested_at=now)
+        except IntegrityError:
+            # Created by a concurrent save of the same image position
+            cls.objects.filter(model_label=label, object_id=instance.id).\
+                update(requested_at=now, claimed_at=None, attempts=0, error='')
+
+    @classmethod
+    def enqueue_many(cls, model, ids: [int]) -> None:
+        """Queues image positions of the model created in bulk, without saving them one by one"""
+        label = str.format('{0}.{1}', model._meta.app_label, model._meta.object_name)
+        now = timezone.now()
+        ids = set(ids)
+        queued = cls.objects.filter(model_label=label, object_id__in=ids)
+        existing = set(queued.values_list('object_id', flat=True))
+        queued.update(requested_at=now, claimed_at=None, attempts=0, error='')
+        cls.objects.bulk_create([cls(model_label=label, object_id=object_id, requested_at=now)
+                                 for object_id in ids if object_id not in existing])
+
+    def __str__(self) -> str:
+        return str.format('{0} {1}', self.model_label, self.object_id)
+
+    class Meta:
+        db_table = 'gallery_rendition_jobs'
+        unique_together = ('model_label', 'object_id')
+        verbose_name = _('Rendition job')
+        verbose_name_plural = _('Rendition jobs')
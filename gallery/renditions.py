@@ -0,0 +1,198 @@
+import hashlib
+import json
+from PIL import Image
+from easy_thumbnails.files import get_thumbnailer
+from neutrino.settings import RENDITION_FORMATS, RENDITION_DENSITIES
+
+
+SIZES = ('large', 'medium', 'small')
+# Fields written when renditions are stored, so concurrent edits of other fields are not overwritten
+FIELDS = ['image_large', 'image_medium', 'image_small', 'renditions', 'renditions_signature', 'renditions_pending']
+MIME_TYPES = {
+    'webp': 'image/webp',
+    'avif': 'image/avif',
+}
+# Key of variants in the format of the original image
+ORIGINAL_FORMAT = ''
+
+
+class Picture:
+    """Thumbnail of one size in every format and density, ready for <picture> element"""
+
+    def __init__(self, fallback: str, fallback_srcset: str, sources: [(str, str)]) -> None:
+        self.__fallback = fallback
+        self.__fallback_srcset = fallback_srcset
+        self.__sources = sources
+
+    @property
+    def fallback(self) -> str:
+        """Url of thumbnail in the format of the original image"""
+        return self.__fallback
+
+    @property
+    def fallback_srcset(self) -> str:
+        return self.__fallback_srcset
+
+    @property
+    def sources(self) -> [(str, str)]:
+        """(mime type, srcset) pairs of modern formats, preferred first"""
+        return self.__sources
+
+
+def formats() -> [str]:
+    """Formats from RENDITION_FORMATS the installed Pillow is able to write"""
+    Image.init()
+    return [extension for extension in RENDITION_FORMATS
+            if str.format('.{0}', extension) in Image.EXTENSION and
+            Image.EXTENSION[str.format('.{0}', extension)] in Image.SAVE]
+
+
+def size(dimensions: str) -> (int, int):
+    """Parses 'WIDTHxHEIGHT'"""
+    width, height = dimensions.split('x')
+    return int(width), int(height)
+
+
+def signature(image_name: str, dimensions: str, box: str) -> str:
+    """Identifies the thumbnails a size would have, so changed crops, sizes, originals and formats are detected"""
+    return hashlib.sha1(str.format('{0}|{1}|{2}|{3}|{4}', image_name, dimensions, box, formats(),
+                                   RENDITION_DENSITIES).encode('utf-8')).hexdigest()
+
+
+def signatures(instance) -> {str: str}:
+    """Signatures of all sizes computed from the current state of an image position"""
+    dimensions = type(instance).RENDITION_DIMENSIONS
+    return {name: signature(instance.image_original.name, dimensions[name], getattr(instance, 'cropping_' + name))
+            for name in SIZES}
+
+
+def stored_signatures(instance) -> {str: str}:
+    try:
+        return json.loads(instance.renditions_signature or '{}')
+    except ValueError:
+        return {}
+
+
+def stored_url(instance, name: str) -> str:
+    """Stored url of the thumbnail, original image while thumbnails are being generated.
+
+    Rows created before thumbnail urls were stored hold relative file names, which are not usable as src until
+    refresh_renditions replaces them.
+    """
+    url = getattr(instance, 'image_' + name)
+    if url and (url.startswith('/') or '://' in url):
+        return url
+    return instance.original_image
+
+
+def stale_sizes(instance, verify: bool = False) -> [str]:
+    """Sizes whose stored url is missing or was built from other original, crop box or dimensions.
+
+    With verify thumbnail files are checked for existence as well.
+    """
+    current = signatures(instance)
+    stored = stored_signatures(instance)
+    stale = []
+    for name in SIZES:
+        url = getattr(instance, 'image_' + name)
+        if not url or current[name] != stored.get(name):
+            stale.append(name)
+        elif verify and not get_thumbnailer(instance.image_original).thumbnail_storage.exists(
+                thumbnail_path(instance, name)):
+            stale.append(name)
+    return stale
+
+
+def thumbnail_options(instance, name: str) -> dict:
+    return {
+        'size': size(type(instance).RENDITION_DIMENSIONS[name]),
+        'box': getattr(instance, 'cropping_' + name),
+        'crop': True,
+        'detail': True,
+    }
+
+
+def thumbnail_path(instance, name: str) -> str:
+    thumbnailer = get_thumbnailer(instance.image_original)
+    return thumbnailer.get_thumbnail_name(thumbnailer.get_options(thumbnail_options(instance, name)))
+
+
+def variant(instance, name: str, extension: str, density: int) -> str:
+    """Generates thumbnail of the size in given format (format of the original if empty) and pixel density"""
+    thumbnailer = get_thumbnailer(instance.image_original)
+    if extension != ORIGINAL_FORMAT:
+        thumbnailer.thumbnail_extension = extension
+        thumbnailer.thumbnail_transparency_extension = extension
+        thumbnailer.thumbnail_preserve_extensions = False
+    options = thumbnail_options(instance, name)
+    options['size'] = (options['size'][0] * density, options['size'][1] * density)
+    return thumbnailer.get_thumbnail(options).url
+
+
+def variants(instance, name: str) -> {str: {str: str}}:
+    """Urls by format and density; 1x thumbnail in the original format is kept in image_<size> field"""
+    result = {}
+    for extension in [ORIGINAL_FORMAT] + formats():
+        for density in RENDITION_DENSITIES:
+            if extension == ORIGINAL_FORMAT and density == 1:
+                continue
+            result.setdefault(extension, {})[str(density)] = variant(instance, name, extension, density)
+    return result
+
+
+def stored_variants(instance) -> {str: {str: {str: str}}}:
+    try:
+        return json.loads(instance.renditions or '{}')
+    except ValueError:
+        return {}
+
+
+def refresh(instance, verify: bool = False) -> [str]:
+    """Regenerates stale thumbnails of an image position and stores their urls; returns regenerated sizes"""
+    stale = stale_sizes(instance, verify)
+    if stale.__len__() == 0:
+        return stale
+    stored = stored_variants(instance)
+    for name in stale:
+        setattr(instance, 'image_' + name, variant(instance, name, ORIGINAL_FORMAT, 1))
+        stored[name] = variants(instance, name)
+    instance.renditions = json.dumps(stored, sort_keys=True)
+    instance.renditions_signature = json.dumps(signatures(instance), sort_keys=True)
+    return stale
+
+
+def srcset(urls: {str: str}) -> str:
+    return ', '.join(str.format('{0} {1}x', urls[density], density)
+                     for density in sorted(urls.keys(), key=int))
+
+
+def pictures(instance) -> {str: Picture}:
+    """Pictures of all sizes built from stored urls only, without touching storage"""
+    stored = stored_variants(instance)
+    result = {}
+    for name in SIZES:
+        fallback = stored_url(instance, name)
+        size_variants = stored.get(name, {})
+        fallback_urls = dict(size_variants.get(ORIGINAL_FORMAT, {}))
+        fallback_urls['1'] = fallback
+        sources = [(MIME_TYPES.get(extension, str.format('image/{0}', extension)), srcset(size_variants[extension]))
+                   for extension in RENDITION_FORMATS if extension in size_variants]
+        result[name] = Picture(fallback, srcset(fallback_urls), sources)
+    return result
+
+
+def mark_pending(instance) -> bool:
+    """Flags the image position as waiting for renditions if some of them are stale; returns whether it was flagged"""
+    if stale_sizes(instance).__len__() == 0:
+        return False
+    instance.renditions_pending = True
+    type(instance).objects.filter(id=instance.id).update(renditions_pending=True)
+    return True
+
+
+def store(instance, verify: bool = False) -> [str]:
+    """Regenerates stale thumbnails and saves their urls, clearing pending flag"""
+    regenerated = refresh(instance, verify)
+    instance.renditions_pending = False
+    instance.save(update_fields=FIELDS)
+    return regenerated
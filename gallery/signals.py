@@ -0,0 +1,32 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+import gallery.models as gallery_models
+import media_store.references as media_store_references
+import neutrino.cache as neutrino_cache
+
+
+@receiver(post_save, sender=gallery_models.Gallery)
+@receiver(post_delete, sender=gallery_models.Gallery)
+def invalidate_gallery(sender, instance, **kwargs) -> None:
+    neutrino_cache.invalidate_tags([neutrino_cache.instance_tag(instance)])
+
+
+@receiver(post_save, sender=gallery_models.GalleryTextData)
+@receiver(post_delete, sender=gallery_models.GalleryTextData)
+@receiver(post_save, sender=gallery_models.GalleryImagePosition)
+@receiver(post_delete, sender=gallery_models.GalleryImagePosition)
+def invalidate_gallery_data(sender, instance, **kwargs) -> None:
+    neutrino_cache.invalidate_tags([neutrino_cache.tag(gallery_models.Gallery, instance.gallery_id)])
+
+
+@receiver(post_save, sender=gallery_models.GalleryImagePositionTextData)
+@receiver(post_delete, sender=gallery_models.GalleryImagePositionTextData)
+def invalidate_gallery_image(sender, instance, **kwargs) -> None:
+    gallery_id = gallery_models.GalleryImagePosition.objects.filter(id=instance.gallery_image_position_id).\
+        values_list('gallery', flat=True).first()
+    if gallery_id is not None:
+        neutrino_cache.invalidate_tags([neutrino_cache.tag(gallery_models.Gallery, gallery_id)])
+
+
+media_store_references.track(gallery_models.Gallery, 'first_image', 'second_image')
+media_store_references.track(gallery_models.GalleryImagePosition, 'image_original')
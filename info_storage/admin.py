@@ -6,7 +6,6 @@ from django.utils.translation import ugettext_lazy as _
 from django import forms
 from django.core.exceptions import ValidationError
 from django.contrib.admin import SimpleListFilter
-from django.core.cache import cache
 
 
 class StorageValuesInlineFormset(forms.models.BaseInlineFormSet):
@@ -33,7 +32,6 @@ class StorageAdmin(mptt_admin.DjangoMpttAdmin):
     inlines = (StorageValuesInline, )
 
     def save_model(self, request, obj, form, change):
-        cache.clear()
         form.save()
 
 admin.register(info_storage_models.StorageValue)
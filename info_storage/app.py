@@ -5,3 +5,6 @@ from django.apps import AppConfig
 class InfoStorageAppConfig(AppConfig):
     name = 'info_storage'
     verbose_name = _('Information Storage')
+
+    def ready(self) -> None:
+        import info_storage.signals
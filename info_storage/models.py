@@ -1,8 +1,8 @@
 from django.core.validators import RegexValidator
 from django.db import models
-import django.utils.translation as translation
 from django.utils.translation import ugettext_lazy as _
 import localization.models as localization_models
+import localization.resolver as localization_resolver
 
 
 class Storage(models.Model):
@@ -12,15 +12,15 @@ class Storage(models.Model):
                            validators=[alphanumeric], db_index=True)
 
     def __str__(self) -> str:
-        lang = translation.get_language()
-        lang_data = localization_models.Language.objects.filter(short_name=lang).values_list('id', flat=True)
-        if lang_data.__len__() > 0:
-            value = StorageValue.objects.filter(storage=self, language=lang_data[0]).values_list('name', flat=True)
-            if value.__len__() > 0:
-                return value[0]
-        value = StorageValue.objects.filter(storage=self, default=True).values_list('name', flat=True)
+        value = localization_resolver.get_resolver().resolve(StorageValue, 'storage', self.id, ('value',))
+        if value is None:
+            return ''
         return value[0]
 
+    @classmethod
+    def prefetch_translations(cls, ids: [int]) -> None:
+        localization_resolver.get_resolver().prefetch(StorageValue, 'storage', ids, ('value',))
+
     @property
     def name(self):
         return str.format("{0} : {1}", self.key, self.__str__())
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+import info_storage.models as info_storage_models
+import neutrino.chrome as chrome
+
+
+@receiver(post_save, sender=info_storage_models.Storage)
+@receiver(post_delete, sender=info_storage_models.Storage)
+@receiver(post_save, sender=info_storage_models.StorageValue)
+@receiver(post_delete, sender=info_storage_models.StorageValue)
+def invalidate_info_storage(sender, **kwargs) -> None:
+    chrome.invalidate(chrome.INFO_STORAGE)
@@ -0,0 +1,37 @@
+from django.contrib.admin.views.main import ChangeList
+from django.db import connection
+
+
+def language_ids(owner_model, model, owner_field: str) -> str:
+    """SQL subquery listing comma separated ids of languages of the owner's rows of the model"""
+    quote = connection.ops.quote_name
+    language = str.format('t.{0}', quote(model._meta.get_field('language').column))
+    if connection.vendor == 'postgresql':
+        aggregate = str.format("STRING_AGG(DISTINCT CAST({0} AS TEXT), ',')", language)
+    else:
+        aggregate = str.format('GROUP_CONCAT(DISTINCT {0})', language)
+    return str.format('SELECT {0} FROM {1} t WHERE t.{2} = {3}.{4}', aggregate, quote(model._meta.db_table),
+                      quote(model._meta.get_field(owner_field).column), quote(owner_model._meta.db_table),
+                      quote(owner_model._meta.pk.column))
+
+
+def annotate_languages(queryset, annotations: {str: (object, str)}):
+    """Adds annotations listing languages of translations, {annotation name: (translation model, owner field)}"""
+    return queryset.extra(select={name: language_ids(queryset.model, model, owner_field)
+                                  for name, (model, owner_field) in annotations.items()})
+
+
+def annotated_ids(instance, name: str) -> [int]:
+    """Language ids of the annotation, None if the instance was loaded without it"""
+    if not hasattr(instance, name):
+        return None
+    value = getattr(instance, name)
+    return sorted(int(language_id) for language_id in str(value).split(',')) if value else []
+
+
+class TranslatedChangeList(ChangeList):
+    """Loads translated names of the listed objects with one query"""
+
+    def get_results(self, request) -> None:
+        super(TranslatedChangeList, self).get_results(request)
+        self.model.prefetch_translations([instance.pk for instance in self.result_list])
@@ -5,3 +5,6 @@ from django.apps import AppConfig
 class LocalizationAppConfig(AppConfig):
     name = 'localization'
     verbose_name = _('Localization')
+
+    def ready(self) -> None:
+        import localization.signals
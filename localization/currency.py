@@ -0,0 +1,30 @@
+from django.conf import settings as django_settings
+import localization.models as localization_models
+from localization.registry import registry
+from neutrino.settings import CURRENCY_COOKIE_NAME
+
+
+SESSION_KEY = 'currency'
+
+
+def get_currency(request) -> localization_models.Currency:
+    """Returns currency chosen by the visitor or the default one.
+
+    The choice is read from cookie, then from existing session; a session is never created just to read it.
+    """
+    if hasattr(request, '_currency'):
+        return request._currency
+    currency = registry.currency(request.COOKIES.get(CURRENCY_COOKIE_NAME, ''))
+    if currency is None and django_settings.SESSION_COOKIE_NAME in request.COOKIES:
+        currency = registry.currency(request.session.get(SESSION_KEY, ''))
+    if currency is None:
+        currency = registry.default_currency()
+    request._currency = currency
+    return currency
+
+
+def currency_code(request) -> str:
+    currency = get_currency(request)
+    if currency is None:
+        return 'None'
+    return currency.short_name
@@ -0,0 +1,95 @@
+from django.contrib.admin import SimpleListFilter
+from django.db import connection
+from django.db.models import Count
+import localization.models as localization_models
+from localization.registry import registry
+
+
+def translated_owners(model, owner_field: str, language_id: int = None):
+    """Ids of owners having rows of the model, in given language if it is given"""
+    rows = model.objects.order_by()
+    if language_id is not None:
+        rows = rows.filter(language=language_id)
+    return rows.values_list(owner_field, flat=True)
+
+
+def complete_owners(model, owner_field: str):
+    """Ids of owners having rows of the model in every language of the website"""
+    return model.objects.order_by().values(owner_field).annotate(languages=Count('language', distinct=True)).\
+        filter(languages=registry.language_ids().__len__()).values_list(owner_field, flat=True)
+
+
+def mismatched_languages(owner_model, first_model, second_model, owner_field: str) -> str:
+    """SQL condition true for owners which have a row of one model in a language missing in rows of the other"""
+    quote = connection.ops.quote_name
+    owner = str.format('{0}.{1}', quote(owner_model._meta.db_table), quote(owner_model._meta.pk.column))
+    conditions = []
+    for model, other in ((first_model, second_model), (second_model, first_model)):
+        owner_column = quote(model._meta.get_field(owner_field).column)
+        language_column = quote(model._meta.get_field('language').column)
+        conditions.append(str.format(
+            'EXISTS (SELECT 1 FROM {0} f WHERE f.{2} = {4} AND NOT EXISTS '
+            '(SELECT 1 FROM {1} s WHERE s.{2} = f.{2} AND s.{3} = f.{3}))',
+            quote(model._meta.db_table), quote(other._meta.db_table), owner_column, language_column, owner))
+    return str.format('({0})', ' OR '.join(conditions))
+
+
+class NotRealizedLanguageFilter(SimpleListFilter):
+    """Owners by languages of their translations: 'True' - translated to every language of the website,
+    'False' - missing a language, language id - missing that language.
+
+    Subclasses set translation_model and owner_field, the field of the translation pointing at the owner.
+    """
+    translation_model = None
+    owner_field = None
+    # Language choice lists only owners having at least one translation
+    require_translations = False
+
+    def lookups(self, request, model_admin) -> [(int, str)]:
+        languages = localization_models.Language.objects.all().values_list('id', 'name')
+        lookup = [('True', 'Has no unrealized languages'), ('False', 'Has unrealized languages')]
+        for language_id, language_name in languages:
+            lookup.append((language_id, language_name))
+        return lookup
+
+    def queryset(self, request, queryset):
+        if self.value() is None:
+            return queryset
+        if self.value() in ('True', 'False'):
+            if registry.language_ids().__len__() == 0:
+                return queryset if self.value() == 'True' else queryset.none()
+            complete = complete_owners(self.translation_model, self.owner_field)
+            if self.value() == 'True':
+                return queryset.filter(pk__in=complete)
+            return queryset.exclude(pk__in=complete)
+        if not localization_models.Language.objects.filter(pk=self.value()).exists():
+            return queryset.none()
+        queryset = queryset.exclude(pk__in=translated_owners(self.translation_model, self.owner_field, self.value()))
+        if self.require_translations:
+            queryset = queryset.filter(pk__in=translated_owners(self.translation_model, self.owner_field))
+        return queryset
+
+
+class MatchingLanguagesFilter(SimpleListFilter):
+    """Owners by languages of two kinds of translations (e.g. texts and SEO information): 'True' - both are in
+    the same languages, 'False' - they differ.
+
+    Subclasses set first_model, second_model and owner_field, the field of both models pointing at the owner.
+    """
+    first_model = None
+    second_model = None
+    owner_field = None
+
+    def lookups(self, request, model_admin) -> [(str, str)]:
+        return [('False', 'Has unrealized languages'),
+                ('True', 'Has no unrealized languages')]
+
+    def queryset(self, request, queryset):
+        if self.value() is None:
+            return queryset
+        if self.value() not in ('True', 'False'):
+            return queryset.none()
+        condition = mismatched_languages(queryset.model, self.first_model, self.second_model, self.owner_field)
+        if self.value() == 'True':
+            condition = str.format('NOT {0}', condition)
+        return queryset.extra(where=[condition])
@@ -0,0 +1,10 @@
+import localization.resolver as localization_resolver
+
+
+class TranslationResolverMiddleware(object):
+    def process_request(self, request) -> None:
+        localization_resolver.activate()
+
+    def process_response(self, request, response):
+        localization_resolver.deactivate()
+        return response
@@ -0,0 +1,144 @@
+import threading
+import time
+from django.core.cache import cache
+import localization.models as localization_models
+import neutrino.cache as neutrino_cache
+
+
+TAG = 'localization.registry'
+VERSION_CACHE_KEY = neutrino_cache.tag_key(TAG)
+VERSION_CHECK_INTERVAL = 1
+
+
+class LocalizationData:
+    """Immutable snapshot of languages and currencies tables"""
+
+    def __init__(self, languages: [localization_models.Language], currencies: [localization_models.Currency]) -> None:
+        self.__languages = tuple(languages)
+        self.__currencies = tuple(currencies)
+        self.__languages_by_short_name = {language.short_name: language for language in languages}
+        self.__languages_by_id = {language.id: language for language in languages}
+        self.__currencies_by_short_name = {currency.short_name: currency for currency in currencies}
+        self.__currencies_by_id = {currency.id: currency for currency in currencies}
+        self.__default_currency = None
+        for currency in currencies:
+            if currency.default:
+                self.__default_currency = currency
+        self.__conversion_rates = {}
+        for target in currencies:
+            self.__conversion_rates[target.id] = {source.id: source.coefficient / target.coefficient
+                                                  for source in currencies if target.coefficient}
+
+    @property
+    def languages(self) -> (localization_models.Language,):
+        return self.__languages
+
+    @property
+    def languages_by_short_name(self) -> {str: localization_models.Language}:
+        return self.__languages_by_short_name
+
+    @property
+    def languages_by_id(self) -> {int: localization_models.Language}:
+        return self.__languages_by_id
+
+    @property
+    def currencies(self) -> (localization_models.Currency,):
+        return self.__currencies
+
+    @property
+    def currencies_by_short_name(self) -> {str: localization_models.Currency}:
+        return self.__currencies_by_short_name
+
+    @property
+    def currencies_by_id(self) -> {int: localization_models.Currency}:
+        return self.__currencies_by_id
+
+    @property
+    def default_currency(self) -> localization_models.Currency:
+        return self.__default_currency
+
+    @property
+    def conversion_rates(self) -> {int: {int: float}}:
+        """Rates by target currency id and source currency id"""
+        return self.__conversion_rates
+
+
+class LocalizationRegistry:
+    """Process wide in-memory copy of languages and currencies.
+
+    Rebuilt after Language/Currency changes; other processes notice changes through version stamp in shared cache.
+    """
+
+    def __init__(self) -> None:
+        self.__lock = threading.Lock()
+        self.__data = None
+        self.__version = None
+        self.__checked_at = 0
+
+    def __load(self, version: str) -> LocalizationData:
+        data = LocalizationData(localization_models.Language.objects.all().order_by('id'),
+                                localization_models.Currency.objects.all().order_by('id'))
+        self.__data = data
+        self.__version = version
+        return data
+
+    @property
+    def data(self) -> LocalizationData:
+        data = self.__data
+        now = time.time()
+        if data is not None and now - self.__checked_at < VERSION_CHECK_INTERVAL:
+            return data
+        version = cache.get(VERSION_CACHE_KEY)
+        with self.__lock:
+            self.__checked_at = now
+            if self.__data is None or (version is not None and version != self.__version):
+                return self.__load(version)
+            return self.__data
+
+    def invalidate(self) -> None:
+        with self.__lock:
+            self.__data = None
+        neutrino_cache.invalidate_tags([TAG])
+
+    def languages(self) -> (localization_models.Language,):
+        return self.data.languages
+
+    def language_ids(self) -> [int]:
+        return [language.id for language in self.data.languages]
+
+    def language(self, short_name: str) -> localization_models.Language:
+        return self.data.languages_by_short_name.get(short_name)
+
+    def language_by_id(self, language_id: int) -> localization_models.Language:
+        return self.data.languages_by_id.get(language_id)
+
+    def unrealized_languages_names(self, language_ids: [int]) -> [str]:
+        """Returns names of languages of the website that are absent in given ids"""
+        language_ids = set(language_ids)
+        return [language.name for language in self.data.languages if language.id not in language_ids]
+
+    def currencies(self) -> (localization_models.Currency,):
+        return self.data.currencies
+
+    def currency(self, short_name: str) -> localization_models.Currency:
+        return self.data.currencies_by_short_name.get(short_name)
+
+    def currency_by_id(self, currency_id: int) -> localization_models.Currency:
+        return self.data.currencies_by_id.get(currency_id)
+
+    def default_currency(self) -> localization_models.Currency:
+        return self.data.default_currency
+
+    def convert_prices(self, prices: [(float, int)], currency: localization_models.Currency) -> [float]:
+        """Converts (price, currency id) pairs to given currency; None where price or its currency is unknown"""
+        if currency is None:
+            return [None] * prices.__len__()
+        rates = self.data.conversion_rates.get(currency.id, {})
+        result = []
+        for price, currency_id in prices:
+            rate = rates.get(currency_id)
+            result.append(price * rate if price is not None and rate is not None else None)
+        return result
+
+
+registry = LocalizationRegistry()
@@ -0,0 +1,77 @@
+import threading
+from django.db.models import Q
+import django.utils.translation as translation
+from localization.registry import registry
+
+
+_state = threading.local()
+
+
+class TranslationResolver:
+    """Holds localized values of the current request, loaded in bulk with one query per table"""
+
+    def __init__(self) -> None:
+        self.__values = {}
+
+    def __storage(self, model, owner_field: str, fields: (str,), has_default: bool) -> {int: (str,)}:
+        key = (model, owner_field, fields, has_default, translation.get_language())
+        if key not in self.__values:
+            self.__values[key] = {}
+        return self.__values[key]
+
+    def prefetch(self, model, owner_field: str, owner_ids: [int], fields: (str,) = ('name',),
+                 has_default: bool = True) -> None:
+        """Loads values of the active language (or default ones) for all given owners in one query"""
+        storage = self.__storage(model, owner_field, fields, has_default)
+        owner_ids = set(owner_id for owner_id in owner_ids if owner_id is not None and owner_id not in storage)
+        if owner_ids.__len__() == 0:
+            return
+        language = registry.language(translation.get_language())
+        language_id = language.id if language is not None else None
+        if language_id is not None and has_default:
+            query = Q(language=language_id) | Q(default=True)
+        elif language_id is not None:
+            query = Q(language=language_id)
+        elif has_default:
+            query = Q(default=True)
+        else:
+            for owner_id in owner_ids:
+                storage[owner_id] = None
+            return
+        rows = model.objects.filter(query, **{owner_field + '__in': owner_ids}).\
+            values_list(owner_field, 'language', *fields)
+        default_values = {}
+        for row in rows:
+            if row[1] == language_id:
+                storage[row[0]] = row[2:]
+            else:
+                default_values[row[0]] = row[2:]
+        for owner_id in owner_ids:
+            if owner_id not in storage:
+                storage[owner_id] = default_values.get(owner_id)
+
+    def resolve(self, model, owner_field: str, owner_id: int, fields: (str,) = ('name',),
+                has_default: bool = True) -> (str,):
+        """Returns localized values of the owner, None if owner has neither translation nor default values"""
+        if owner_id is None:
+            return None
+        storage = self.__storage(model, owner_field, fields, has_default)
+        if owner_id not in storage:
+            self.prefetch(model, owner_field, [owner_id], fields, has_default)
+        return storage[owner_id]
+
+
+def activate() -> None:
+    _state.resolver = TranslationResolver()
+
+
+def deactivate() -> None:
+    _state.resolver = None
+
+
+def get_resolver() -> TranslationResolver:
+    """Returns resolver of the current request or a short-living one outside of request"""
+    resolver = getattr(_state, 'resolver', None)
+    if resolver is None:
+        return TranslationResolver()
+    return resolver
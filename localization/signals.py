@@ -0,0 +1,12 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+import localization.models as localization_models
+from localization.registry import registry
+
+
+@receiver(post_save, sender=localization_models.Language)
+@receiver(post_delete, sender=localization_models.Language)
+@receiver(post_save, sender=localization_models.Currency)
+@receiver(post_delete, sender=localization_models.Currency)
+def invalidate_registry(sender, **kwargs) -> None:
+    registry.invalidate()
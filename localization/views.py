@@ -1,5 +1,8 @@
 from django.utils.translation import activate
 from django.http import JsonResponse
+import localization.currency as localization_currency
+from localization.registry import registry
+from neutrino.settings import CURRENCY_COOKIE_NAME, CURRENCY_COOKIE_AGE
 
 
 def lang(request, lang_code: str):
@@ -11,4 +14,11 @@ def lang(request, lang_code: str):
 
 
 def currency(request, currency_code: str):
-    request.session['currency'] = currency_code
+    """Remembers chosen currency in cookie, so pages are served from the cache variant of that currency"""
+    if registry.currency(currency_code) is None:
+        return JsonResponse({404: currency_code}, status=404)
+    response = JsonResponse({200: currency_code})
+    response.set_cookie(CURRENCY_COOKIE_NAME, currency_code, max_age=CURRENCY_COOKIE_AGE)
+    if localization_currency.SESSION_KEY in request.session:
+        request.session[localization_currency.SESSION_KEY] = currency_code
+    return response
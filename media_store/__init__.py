@@ -0,0 +1 @@
+default_app_config = 'media_store.app.MediaStoreAppConfig'
@@ -0,0 +1,7 @@
+from django.utils.translation import ugettext_lazy as _
+from django.apps import AppConfig
+
+
+class MediaStoreAppConfig(AppConfig):
+    name = 'media_store'
+    verbose_name = _('Media store')
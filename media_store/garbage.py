@@ -0,0 +1,105 @@
+import datetime
+import os
+import shutil
+from django.apps import apps
+from django.db import models
+from django.db.models import F
+from easy_thumbnails.models import Source
+import media_store.models as media_store_models
+import media_store.settings as media_store_settings
+from media_store.storage import storage
+from neutrino.settings import CKEDITOR_UPLOAD_PATH
+
+
+def collect(path: str) -> None:
+    """Schedules removal of a file or directory of media storage.
+
+    The row is written in the current transaction, so nothing is removed if the transaction is rolled back.
+    """
+    if path and path.strip('/'):
+        media_store_models.MediaGarbage.objects.create(path=path.strip('/'))
+
+
+def remove(path: str) -> None:
+    if storage.is_blob(path):
+        # The same content could be uploaded again after it was released
+        if media_store_models.MediaBlob.objects.filter(name=path, references__gt=0).exists():
+            return
+        media_store_models.MediaBlob.objects.filter(name=path).delete()
+        Source.objects.filter(name=path).delete()
+        storage.delete_blob(path)
+        return
+    full_path = storage.path(path)
+    if os.path.isdir(full_path):
+        shutil.rmtree(full_path)
+    elif os.path.exists(full_path):
+        os.remove(full_path)
+
+
+def sweep(limit: int) -> (int, int):
+    """Removes up to limit scheduled paths; returns numbers of removed and failed ones"""
+    entries = list(media_store_models.MediaGarbage.objects.
+                   filter(attempts__lt=media_store_settings.GARBAGE_MAX_ATTEMPTS).order_by('id')[:limit])
+    removed = []
+    failed = 0
+    for entry in entries:
+        try:
+            remove(entry.path)
+        except OSError as e:
+            failed += 1
+            media_store_models.MediaGarbage.objects.filter(id=entry.id).\
+                update(attempts=F('attempts') + 1, error=str(e))
+            continue
+        removed.append(entry.id)
+    media_store_models.MediaGarbage.objects.filter(id__in=removed).delete()
+    return removed.__len__(), failed
+
+
+def referenced_names() -> {str}:
+    """Names stored in file fields of all models and in the blob table"""
+    names = set(media_store_models.MediaBlob.objects.filter(references__gt=0).values_list('name', flat=True))
+    for model in apps.get_models():
+        fields = [field.name for field in model._meta.concrete_fields if isinstance(field, models.FileField)]
+        if fields.__len__() == 0:
+            continue
+        for row in model.objects.values_list(*fields).iterator():
+            names.update(name for name in row if name)
+    return names
+
+
+def is_referenced(name: str, referenced: {str}) -> bool:
+    """Checks the file itself or the image it is a thumbnail of (thumbnails are named '<image>.<options>')"""
+    if name in referenced:
+        return True
+    position = name.find('.', name.rfind('/') + 1)
+    while position != -1:
+        if name[0:position] in referenced:
+            return True
+        position = name.find('.', position + 1)
+    return False
+
+
+def orphans(min_age: int = media_store_settings.ORPHAN_MIN_AGE) -> [str]:
+    """Files of media storage older than min_age hours that nothing in the database refers to.
+
+    Uploads of the rich text editor are only referenced from html and are never reported.
+    """
+    referenced = referenced_names()
+    scheduled = set(media_store_models.MediaGarbage.objects.values_list('path', flat=True))
+    threshold = datetime.datetime.now() - datetime.timedelta(hours=min_age)
+    result = []
+    for directory, directories, files in os.walk(storage.location):
+        relative_directory = os.path.relpath(directory, storage.location)
+        if relative_directory == '.':
+            relative_directory = ''
+        if relative_directory.startswith(CKEDITOR_UPLOAD_PATH.strip('/')):
+            directories[:] = []
+            continue
+        for file_name in files:
+            name = os.path.join(relative_directory, file_name).replace(os.sep, '/')
+            if name in scheduled or is_referenced(name, referenced):
+                continue
+            modified = datetime.datetime.fromtimestamp(os.path.getmtime(os.path.join(directory, file_name)))
+            if modified < threshold:
+                result.append(name)
+    return result
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+import media_store.references as media_store_references
+
+
+class Command(BaseCommand):
+    help = 'Recounts references of files in the media store from image fields using them'
+
+    def handle(self, *args, **options):
+        media_store_references.rebuild()
+        self.stdout.write('Media references rebuilt')
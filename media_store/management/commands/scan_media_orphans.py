@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+import media_store.garbage as media_store_garbage
+import media_store.settings as media_store_settings
+
+
+class Command(BaseCommand):
+    help = 'Lists files of media storage no database row refers to, optionally scheduling their removal'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--min-age', type=int, default=media_store_settings.ORPHAN_MIN_AGE,
+                            help='Ignore files modified less than this number of hours ago')
+        parser.add_argument('--collect', action='store_true', default=False,
+                            help='Schedule found files for removal by sweep_media')
+
+    def handle(self, *args, **options):
+        orphans = media_store_garbage.orphans(options['min_age'])
+        with transaction.atomic():
+            for name in orphans:
+                self.stdout.write(name)
+                if options['collect']:
+                    media_store_garbage.collect(name)
+        self.stdout.write(str.format('{0} orphaned files', orphans.__len__()))
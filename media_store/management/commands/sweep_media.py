@@ -0,0 +1,24 @@
+import time
+from django.core.management.base import BaseCommand
+import media_store.garbage as media_store_garbage
+
+
+class Command(BaseCommand):
+    help = 'Removes files and directories of media storage scheduled for removal by deletes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch', type=int, default=500, help='Number of paths removed at once')
+        parser.add_argument('--loop', action='store_true', default=False,
+                            help='Keep polling for scheduled paths instead of exiting when there are none')
+        parser.add_argument('--interval', type=float, default=60, help='Seconds between polls in loop mode')
+
+    def handle(self, *args, **options):
+        while True:
+            removed, failed = media_store_garbage.sweep(options['batch'])
+            if removed + failed > 0:
+                self.stdout.write(str.format('{0} removed, {1} failed', removed, failed))
+            if removed == options['batch']:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,38 @@
+from django.db import models
+from django.utils.translation import ugettext_lazy as _
+
+
+class MediaBlob(models.Model):
+    """Uploaded file stored once under the hash of its content, with number of fields referencing it"""
+    id = models.AutoField(primary_key=True, verbose_name=_('Id'), help_text=_('Unique identifier'))
+    name = models.CharField(max_length=256, unique=True, verbose_name=_('Name'), help_text=_('Path in media storage'))
+    references = models.IntegerField(default=0, verbose_name=_('References'),
+                                     help_text=_('Number of image fields using the file'))
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name=_('Creating date'),
+                                      help_text=_('Date of the first upload'))
+
+    def __str__(self) -> str:
+        return self.name
+
+    class Meta:
+        db_table = 'media_store_blobs'
+        verbose_name = _('Media blob')
+        verbose_name_plural = _('Media blobs')
+
+
+class MediaGarbage(models.Model):
+    """Path in media storage to be removed once the transaction that made it unused is committed"""
+    id = models.AutoField(primary_key=True, verbose_name=_('Id'), help_text=_('Unique identifier'))
+    path = models.CharField(max_length=512, verbose_name=_('Path'), help_text=_('File or directory in media storage'))
+    requested_at = models.DateTimeField(auto_now_add=True, verbose_name=_('Requested at'),
+                                        help_text=_('Date the path became unused'))
+    attempts = models.IntegerField(default=0, verbose_name=_('Attempts'), help_text=_('Number of failed removals'))
+    error = models.TextField(null=True, blank=True, verbose_name=_('Error'), help_text=_('Last removal error'))
+
+    def __str__(self) -> str:
+        return self.path
+
+    class Meta:
+        db_table = 'media_store_garbage'
+        verbose_name = _('Media garbage')
+        verbose_name_plural = _('Media garbage')
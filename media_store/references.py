@@ -0,0 +1,95 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.signals import pre_save, post_save, post_delete
+import media_store.garbage as media_store_garbage
+import media_store.models as media_store_models
+from media_store.storage import storage
+
+
+# Model -> names of its fields stored in the media store
+TRACKED = {}
+
+
+def acquire(name: str) -> None:
+    """Counts one more field referencing the stored file"""
+    if not storage.is_blob(name):
+        return
+    if media_store_models.MediaBlob.objects.filter(name=name).update(references=F('references') + 1) > 0:
+        return
+    try:
+        with transaction.atomic():
+            media_store_models.MediaBlob.objects.create(name=name, references=1)
+    except IntegrityError:
+        # Created by a concurrent upload of the same file
+        media_store_models.MediaBlob.objects.filter(name=name).update(references=F('references') + 1)
+
+
+@transaction.atomic
+def release(name: str) -> None:
+    """Counts one field less referencing the stored file, scheduling its removal when nothing references it"""
+    if not storage.is_blob(name):
+        return
+    blob = media_store_models.MediaBlob.objects.select_for_update().filter(name=name).first()
+    if blob is None:
+        return
+    if blob.references > 1:
+        media_store_models.MediaBlob.objects.filter(id=blob.id).update(references=F('references') - 1)
+        return
+    blob.delete()
+    media_store_garbage.collect(name)
+
+
+def field_names(instance, fields: (str,)) -> {str: str}:
+    return {field: getattr(instance, field).name or None for field in fields}
+
+
+def remember_names(sender, instance, update_fields=None, **kwargs) -> None:
+    fields = TRACKED[sender]
+    if update_fields is not None and not set(fields) & set(update_fields):
+        return
+    old = {}
+    if instance.pk is not None:
+        row = sender.objects.filter(pk=instance.pk).values_list(*fields).first()
+        if row is not None:
+            old = dict(zip(fields, row))
+    instance._media_store_names = old
+
+
+def count_names(sender, instance, **kwargs) -> None:
+    old = instance.__dict__.pop('_media_store_names', None)
+    if old is None:
+        return
+    for field, name in field_names(instance, TRACKED[sender]).items():
+        if name != old.get(field):
+            acquire(name)
+            release(old.get(field))
+
+
+def release_names(sender, instance, **kwargs) -> None:
+    for name in field_names(instance, TRACKED[sender]).values():
+        release(name)
+
+
+def track(model, *fields: str) -> None:
+    """Keeps reference counts of files stored in given file fields of the model"""
+    TRACKED[model] = fields
+    pre_save.connect(remember_names, sender=model, weak=False)
+    post_save.connect(count_names, sender=model, weak=False)
+    post_delete.connect(release_names, sender=model, weak=False)
+
+
+def rebuild() -> None:
+    """Recounts references of stored files from the tracked fields"""
+    counts = {}
+    for model, fields in TRACKED.items():
+        for row in model.objects.values_list(*fields).iterator():
+            for name in row:
+                if storage.is_blob(name):
+                    counts[name] = counts.get(name, 0) + 1
+    with transaction.atomic():
+        for blob in media_store_models.MediaBlob.objects.select_for_update():
+            references = counts.pop(blob.name, 0)
+            if blob.references != references:
+                media_store_models.MediaBlob.objects.filter(id=blob.id).update(references=references)
+        media_store_models.MediaBlob.objects.bulk_create(
+            [media_store_models.MediaBlob(name=name, references=references) for name, references in counts.items()])
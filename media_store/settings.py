@@ -0,0 +1,6 @@
+# Directory of MEDIA_ROOT holding uploaded files named by hash of their content
+BLOB_DIRECTORY = 'blobs'
+# Removal of a path is not retried after this number of failures
+GARBAGE_MAX_ATTEMPTS = 3
+# Files younger than this (in hours) are never reported as orphans, they may belong to an unfinished upload
+ORPHAN_MIN_AGE = 24
@@ -0,0 +1,55 @@
+import hashlib
+import os
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+import media_store.settings as media_store_settings
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """File system storage naming files by sha256 of their content.
+
+    Upload of a file that is already stored writes nothing and returns the name of the stored copy,
+    so identical images share one file and one set of thumbnails.
+    """
+
+    @staticmethod
+    def digest(content) -> str:
+        sha = hashlib.sha256()
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        for chunk in content.chunks():
+            sha.update(chunk)
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        return sha.hexdigest()
+
+    @staticmethod
+    def blob_name(digest: str, name: str) -> str:
+        extension = os.path.splitext(name)[1].lower()
+        return str.format('{0}/{1}/{2}/{3}{4}', media_store_settings.BLOB_DIRECTORY, digest[0:2], digest[2:4],
+                          digest, extension)
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content)
+        name = self.blob_name(self.digest(content), name)
+        if self.exists(name):
+            return name
+        return self._save(name, content)
+
+    def is_blob(self, name: str) -> bool:
+        return name is not None and name.startswith(media_store_settings.BLOB_DIRECTORY + '/')
+
+    def delete_blob(self, name: str) -> None:
+        """Deletes stored file together with thumbnails generated next to it"""
+        directory, file_name = os.path.split(name)
+        if self.exists(directory):
+            for thumbnail in self.listdir(directory)[1]:
+                if thumbnail.startswith(file_name + '.'):
+                    self.delete(os.path.join(directory, thumbnail))
+        self.delete(name)
+
+
+storage = ContentAddressedStorage()
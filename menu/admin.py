@@ -1,12 +1,10 @@
 from django.contrib import admin
 from menu import models as menu_models
-from localization import models as localization_models
+import localization.filters as localization_filters
 import django_mptt_admin.admin as mptt_admin
 from django.utils.translation import ugettext_lazy as _
 from django import forms
 from django.core.exceptions import ValidationError
-from django.contrib.admin import SimpleListFilter
-from django.core.cache import cache
 
 
 class MainMenuItemNamesInlineFormset(forms.models.BaseInlineFormSet):
@@ -28,38 +26,13 @@ class MainMenuItemNamesInline(admin.TabularInline):
     extra = 1
 
 
-class MainMenuTextDataNotRealizedLanguageFilter(SimpleListFilter):
+class MainMenuTextDataNotRealizedLanguageFilter(localization_filters.NotRealizedLanguageFilter):
     title = _('Realized Text Data')
 
     parameter_name = 'text_data_lang'
 
-    def lookups(self, request, model_admin) -> [(int, str)]:
-        languages = localization_models.Language.objects.all().values_list('id', 'name')
-        lookup = [('True', 'Has no unrealized languages'), ('False', 'Has unrealized languages')]
-        for lang_id, name in languages:
-            lookup.append((lang_id, name))
-        return lookup
-
-    def queryset(self, request, queryset) -> [menu_models.MainMenu]:
-        if self.value() is None:
-            return queryset
-        result = []
-        if self.value() == 'True':
-            for menu_item in queryset:
-                if menu_item.check_language_for_name:
-                    result.append(menu_item.id)
-        elif self.value() == 'False':
-            for menu_item in queryset:
-                if not menu_item.check_language_for_name:
-                    result.append(menu_item.id)
-        else:
-            language = localization_models.Language.objects.filter(pk=self.value()).values_list('id', flat=True)
-            if language.__len__() > 0:
-                language = language[0]
-                for menu_item in queryset:
-                    if language not in menu_item.name_languages_ids:
-                        result.append(menu_item.id)
-        return queryset.filter(id__in=result)
+    translation_model = menu_models.MainMenuItemName
+    owner_field = 'menu_item'
 
 
 class MainMenuAdmin(mptt_admin.DjangoMpttAdmin):
@@ -68,7 +41,6 @@ class MainMenuAdmin(mptt_admin.DjangoMpttAdmin):
     inlines = (MainMenuItemNamesInline, )
 
     def save_model(self, request, obj, form, change):
-        cache.clear()
         form.save()
 
 
@@ -92,38 +64,13 @@ class AdditionalMenuItemNamesInline(admin.TabularInline):
     extra = 1
 
 
-class AdditionalMenuTextDataNotRealizedLanguageFilter(SimpleListFilter):
+class AdditionalMenuTextDataNotRealizedLanguageFilter(localization_filters.NotRealizedLanguageFilter):
     title = _('Realized Text Data')
 
     parameter_name = 'text_data_lang'
 
-    def lookups(self, request, model_admin) -> [(int, str)]:
-        languages = localization_models.Language.objects.all().values_list('id', 'name')
-        lookup = [('True', 'Has no unrealized languages'), ('False', 'Has unrealized languages')]
-        for lang_id, name in languages:
-            lookup.append((lang_id, name))
-        return lookup
-
-    def queryset(self, request, queryset) -> [menu_models.AdditionalMenu]:
-        if self.value() is None:
-            return queryset
-        result = []
-        if self.value() == 'True':
-            for menu_item in queryset:
-                if menu_item.check_language_for_name:
-                    result.append(menu_item.id)
-        elif self.value() == 'False':
-            for menu_item in queryset:
-                if not menu_item.check_language_for_name:
-                    result.append(menu_item.id)
-        else:
-            language = localization_models.Language.objects.filter(pk=self.value()).values_list('id', flat=True)
-            if language.__len__() > 0:
-                language = language[0]
-                for menu_item in queryset:
-                    if language not in menu_item.name_languages_ids:
-                        result.append(menu_item.id)
-        return queryset.filter(id__in=result)
+    translation_model = menu_models.AdditionalMenuItemName
+    owner_field = 'menu_item'
 
 
 class AdditionalMenuAdmin(mptt_admin.DjangoMpttAdmin):
@@ -132,7 +79,6 @@ class AdditionalMenuAdmin(mptt_admin.DjangoMpttAdmin):
     inlines = (AdditionalMenuItemNamesInline, )
 
     def save_model(self, request, obj, form, change):
-        cache.clear()
         form.save()
 
 
@@ -155,38 +101,13 @@ class ExtraMenuItemNamesInline(admin.TabularInline):
     extra = 1
 
 
-class ExtraMenuTextDataNotRealizedLanguageFilter(SimpleListFilter):
+class ExtraMenuTextDataNotRealizedLanguageFilter(localization_filters.NotRealizedLanguageFilter):
     title = _('Realized Text Data')
 
     parameter_name = 'text_data_lang'
 
-    def lookups(self, request, model_admin) -> [(int, str)]:
-        languages = localization_models.Language.objects.all().values_list('id', 'name')
-        lookup = [('True', 'Has no unrealized languages'), ('False', 'Has unrealized languages')]
-        for lang_id, name in languages:
-            lookup.append((lang_id, name))
-        return lookup
-
-    def queryset(self, request, queryset) -> [menu_models.ExtraMenu]:
-        if self.value() is None:
-            return queryset
-        result = []
-        if self.value() == 'True':
-            for menu_item in queryset:
-                if menu_item.check_language_for_name:
-                    result.append(menu_item.id)
-        elif self.value() == 'False':
-            for menu_item in queryset:
-                if not menu_item.check_language_for_name:
-                    result.append(menu_item.id)
-        else:
-            language = localization_models.Language.objects.filter(pk=self.value()).values_list('id', flat=True)
-            if language.__len__() > 0:
-                language = language[0]
-                for menu_item in queryset:
-                    if language not in menu_item.name_languages_ids:
-                        result.append(menu_item.id)
-        return queryset.filter(id__in=result)
+    translation_model = menu_models.ExtraMenuItemName
+    owner_field = 'menu_item'
 
 
 class ExtraMenuAdmin(mptt_admin.DjangoMpttAdmin):
@@ -195,7 +116,6 @@ class ExtraMenuAdmin(mptt_admin.DjangoMpttAdmin):
     inlines = (ExtraMenuItemNamesInline, )
 
     def save_model(self, request, obj, form, change):
-        cache.clear()
         form.save()
 
 
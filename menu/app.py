@@ -5,3 +5,6 @@ from django.apps import AppConfig
 class MenuAppConfig(AppConfig):
     name = 'menu'
     verbose_name = _('Menu')
+
+    def ready(self) -> None:
+        import menu.signals
@@ -0,0 +1,156 @@
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+import django.utils.translation as translation
+import localization.resolver as localization_resolver
+import menu.models as menu_models
+import neutrino.cache as neutrino_cache
+from neutrino.settings import CHROME_CACHE_TIME
+
+
+# Stands in for class of the active element in pre-rendered menus, see menu.fragments
+ACTIVE_MARKER = '__menu_active_{0}__'
+MENUS = {
+    'main': (menu_models.MainMenu, menu_models.MainMenuItemName),
+    'additional': (menu_models.AdditionalMenu, menu_models.AdditionalMenuItemName),
+    'extra': (menu_models.ExtraMenu, menu_models.ExtraMenuItemName),
+}
+
+
+class MenuNode:
+    """Menu element with its localized name and child elements, detached from the database"""
+
+    def __init__(self, node_id: int, url: str, name: str, level: int, first_image: str, second_image: str) -> None:
+        self.__id = node_id
+        self.__url = url
+        self.__name = name
+        self.__level = level
+        self.__first_image = first_image
+        self.__second_image = second_image
+        self.__children = []
+
+    @property
+    def id(self) -> int:
+        return self.__id
+
+    @property
+    def url(self) -> str:
+        return self.__url
+
+    @property
+    def name(self) -> str:
+        return self.__name
+
+    @property
+    def level(self) -> int:
+        return self.__level
+
+    @property
+    def first_image(self) -> str:
+        """Url of the image, None if there is no image"""
+        return self.__first_image
+
+    @property
+    def second_image(self) -> str:
+        return self.__second_image
+
+    @property
+    def children(self) -> ['MenuNode']:
+        return self.__children
+
+    @property
+    def active_marker(self) -> str:
+        return str.format(ACTIVE_MARKER, self.__id)
+
+    @property
+    def is_leaf_node(self) -> bool:
+        return self.__children.__len__() == 0
+
+    def append(self, node: 'MenuNode') -> None:
+        self.__children.append(node)
+
+
+def menu_tag(menu: str) -> str:
+    return str.format('menu.{0}', menu)
+
+
+class Menu:
+    """Root nodes of a menu and paths from the root to every node, indexed by url of the node"""
+
+    def __init__(self, nodes: [MenuNode], paths: {str: (MenuNode,)}) -> None:
+        self.__nodes = nodes
+        self.__paths = paths
+
+    @property
+    def nodes(self) -> [MenuNode]:
+        return self.__nodes
+
+    def path(self, url: str) -> (MenuNode,):
+        """Nodes from the root to the element of url, or of the longest leading part of url found in the menu"""
+        url = url.strip('/')
+        while url:
+            path = self.__paths.get(url)
+            if path is not None:
+                return path
+            url = url.rpartition('/')[0]
+        return ()
+
+
+def page_url(path: str) -> str:
+    """Url of the page as menu elements hold it: request path without language prefix, 'index' for the root"""
+    prefix = str.format('/{0}/', translation.get_language())
+    if path.startswith(prefix):
+        path = path[prefix.__len__():]
+    return path.strip('/') or 'index'
+
+
+def build(menu: str) -> Menu:
+    """Menu in the active language, built with one query for the tree and one for names"""
+    model, name_model = MENUS[menu]
+    rows = list(model.objects.order_by('tree_id', 'lft').
+                values_list('id', 'url', 'level', 'lft', 'rght', 'first_image', 'second_image'))
+    resolver = localization_resolver.get_resolver()
+    resolver.prefetch(name_model, 'menu_item', [row[0] for row in rows])
+    roots = []
+    paths = {}
+    # Rows are in tree order, so ancestors of a node are the open nodes whose range contains its lft
+    ancestors = []
+    for node_id, url, level, lft, rght, first_image, second_image in rows:
+        while ancestors.__len__() > 0 and ancestors[-1][1] < lft:
+            ancestors.pop()
+        name = resolver.resolve(name_model, 'menu_item', node_id)
+        node = MenuNode(node_id, url, name[0] if name is not None else '', level,
+                        default_storage.url(first_image) if first_image else None,
+                        default_storage.url(second_image) if second_image else None)
+        if ancestors.__len__() > 0:
+            ancestors[-1][0].append(node)
+        else:
+            roots.append(node)
+        path = tuple(ancestor for ancestor, ancestor_rght in ancestors) + (node,)
+        if url:
+            paths.setdefault(url.strip('/'), path)
+        ancestors.append((node, rght))
+    return Menu(roots, paths)
+
+
+def get_menus(menus: (str,) = tuple(MENUS)) -> {str: Menu}:
+    """Returns menus of the active language, building only the ones missing in cache"""
+    language_code = translation.get_language()
+    neutrino_cache.depends_on(*[menu_tag(menu) for menu in menus])
+    versions = neutrino_cache.get_versions([neutrino_cache.tag_key(menu_tag(menu)) for menu in menus])
+    keys = {menu: str.format('menu:{0}:{1}:{2}', menu, versions[neutrino_cache.tag_key(menu_tag(menu))],
+                             language_code) for menu in menus}
+    cached = cache.get_many(list(keys.values()))
+    result = {}
+    missing = {}
+    for menu in menus:
+        value = cached.get(keys[menu])
+        if value is None:
+            value = missing[keys[menu]] = build(menu)
+        result[menu] = value
+    if missing.__len__() > 0:
+        cache.set_many(missing, CHROME_CACHE_TIME)
+    return result
+
+
+def invalidate(menu: str) -> None:
+    neutrino_cache.invalidate_tags([menu_tag(menu)])
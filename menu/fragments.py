@@ -0,0 +1,63 @@
+import re
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+import django.utils.translation as translation
+import menu.builder as menu_builder
+import neutrino.cache as neutrino_cache
+from neutrino.settings import CHROME_CACHE_TIME
+
+
+ACTIVE = 'class="active"'
+# menu_builder.ACTIVE_MARKER with id of the node
+ACTIVE_PATTERN = re.compile(r'__menu_active_(\d+)__')
+# Trees rendered once per menu change; system/partials/<menu>_menu.html serve them through menu_html tag
+TEMPLATES = {
+    'main': 'system/partials/main_menu_tree.html',
+    'additional': 'system/partials/additional_menu_tree.html',
+    'extra': 'system/partials/main_menu_tree.html',
+}
+
+
+class MenuFragment:
+    """Menu HTML rendered once per language, with markers in place of class of the active elements"""
+
+    def __init__(self, html: str, urls: {int: str}) -> None:
+        self.__html = html
+        self.__urls = urls
+
+    def render(self, url: str) -> str:
+        """HTML with elements linking to url, as menu.builder.page_url returns it, marked active"""
+        active = set(str(node_id) for node_id, node_url in self.__urls.items()
+                     if node_url and node_url.strip('/') == url)
+        return mark_safe(ACTIVE_PATTERN.sub(lambda match: ACTIVE if match.group(1) in active else '', self.__html))
+
+
+def node_urls(nodes: [menu_builder.MenuNode]) -> {int: str}:
+    urls = {}
+    for node in nodes:
+        urls[node.id] = node.url
+        urls.update(node_urls(node.children))
+    return urls
+
+
+def prerender(menu: str, nodes: [menu_builder.MenuNode]) -> MenuFragment:
+    html = render_to_string(TEMPLATES[menu], {'menu': nodes, 'selected_language': translation.get_language()})
+    return MenuFragment(html, node_urls(nodes))
+
+
+def get_fragment(menu: str) -> MenuFragment:
+    """Pre-rendered menu of the active language, rendered again only after the menu changes"""
+    neutrino_cache.depends_on(menu_builder.menu_tag(menu))
+    version_key = neutrino_cache.tag_key(menu_builder.menu_tag(menu))
+    key = str.format('menu_html:{0}:{1}:{2}', menu, neutrino_cache.get_versions([version_key])[version_key],
+                     translation.get_language())
+    fragment = cache.get(key)
+    if fragment is None:
+        fragment = prerender(menu, menu_builder.get_menus((menu,))[menu].nodes)
+        cache.set(key, fragment, CHROME_CACHE_TIME)
+    return fragment
+
+
+def render(menu: str, url: str) -> str:
+    return get_fragment(menu).render(url)
@@ -1,8 +1,9 @@
 from django.db import models
 from mptt.models import MPTTModel, TreeForeignKey
 from django.utils.translation import ugettext_lazy as _
-import django.utils.translation as translation
 import localization.models as localization_models
+from localization.registry import registry
+import localization.resolver as localization_resolver
 
 
 class MainMenu(MPTTModel):
@@ -15,17 +16,15 @@ class MainMenu(MPTTModel):
     second_image = models.ImageField(null=True, blank=True, verbose_name=_('Second image'), help_text=_('Second image'))
 
     def __str__(self) -> str:
-        lang = translation.get_language()
-        lang_data = localization_models.Language.objects.filter(short_name=lang).values_list('id', flat=True)
-        if lang_data.__len__() > 0:
-            menu_item_name = \
-                MainMenuItemName.objects.filter(menu_item=self, language=lang_data[0]).values_list('name', flat=True)
-            if menu_item_name.__len__() > 0:
-                return menu_item_name[0]
-        menu_item_name = MainMenuItemName.objects.filter(menu_item=self, default=True).values_list('name',
-                                                                                                           flat=True)
+        menu_item_name = localization_resolver.get_resolver().resolve(MainMenuItemName, 'menu_item', self.id)
+        if menu_item_name is None:
+            return ''
         return menu_item_name[0]
 
+    @classmethod
+    def prefetch_translations(cls, ids: [int]) -> None:
+        localization_resolver.get_resolver().prefetch(MainMenuItemName, 'menu_item', ids)
+
     def save(self, force_insert=False, force_update=False, using=None, update_fields=None) -> None:
         for field in self._meta.fields:
             if field.name == 'first_image':
@@ -40,8 +39,7 @@ class MainMenu(MPTTModel):
 
     def check_language_for_name_admin_display(self) -> str:
         """Checks if languages of text data are corresponding to languages of the website"""
-        unrealized_languages = localization_models.Language.objects.exclude(
-            id__in=self.name_languages_ids).all().values_list('name', flat=True)
+        unrealized_languages = registry.unrealized_languages_names(self.name_languages_ids)
         languages__str = "<br/>".join(unrealized_languages)
         if unrealized_languages.__len__() > 0:
             return str.format(
@@ -56,9 +54,10 @@ class MainMenu(MPTTModel):
     @property
     def check_language_for_name(self) -> bool:
         """Checks if languages of text data are corresponding to languages of the website"""
-        languages = localization_models.Language.objects.all().values_list('id', flat=True)
+        languages = registry.language_ids()
+        name_languages_ids = self.name_languages_ids
         for language in languages:
-            if language not in self.name_languages_ids:
+            if language not in name_languages_ids:
                 return False
         return True
 
@@ -103,18 +102,15 @@ class AdditionalMenu(MPTTModel):
     second_image = models.ImageField(null=True, blank=True, verbose_name=_('Second image'), help_text=_('Second image'))
 
     def __str__(self) -> str:
-        lang = translation.get_language()
-        lang_data = localization_models.Language.objects.filter(short_name=lang).values_list('id', flat=True)
-        if lang_data.__len__() > 0:
-            menu_item_name = \
-                AdditionalMenuItemName.objects.filter(menu_item=self, language=lang_data[0]).values_list('name',
-                                                                                                         flat=True)
-            if menu_item_name.__len__() > 0:
-                return menu_item_name[0]
-        menu_item_name = AdditionalMenuItemName.objects.filter(menu_item=self, default=True).\
-            values_list('name', flat=True)
+        menu_item_name = localization_resolver.get_resolver().resolve(AdditionalMenuItemName, 'menu_item', self.id)
+        if menu_item_name is None:
+            return ''
         return menu_item_name[0]
 
+    @classmethod
+    def prefetch_translations(cls, ids: [int]) -> None:
+        localization_resolver.get_resolver().prefetch(AdditionalMenuItemName, 'menu_item', ids)
+
     def save(self, force_insert=False, force_update=False, using=None, update_fields=None) -> None:
         for field in self._meta.fields:
             if field.name == 'first_image':
@@ -129,8 +125,7 @@ class AdditionalMenu(MPTTModel):
 
     def check_language_for_name_admin_display(self) -> str:
         """Checks if languages of text data are corresponding to languages of the website"""
-        unrealized_languages = localization_models.Language.objects.exclude(
-            id__in=self.name_languages_ids).all().values_list('name', flat=True)
+        unrealized_languages = registry.unrealized_languages_names(self.name_languages_ids)
         languages__str = "<br/>".join(unrealized_languages)
         if unrealized_languages.__len__() > 0:
             return str.format(
@@ -145,9 +140,10 @@ class AdditionalMenu(MPTTModel):
     @property
     def check_language_for_name(self) -> bool:
         """Checks if languages of text data are corresponding to languages of the website"""
-        languages = localization_models.Language.objects.all().values_list('id', flat=True)
+        languages = registry.language_ids()
+        name_languages_ids = self.name_languages_ids
         for language in languages:
-            if language not in self.name_languages_ids:
+            if language not in name_languages_ids:
                 return False
         return True
 
@@ -192,16 +188,15 @@ class ExtraMenu(MPTTModel):
     second_image = models.ImageField(null=True, blank=True, verbose_name=_('Second image'), help_text=_('Second image'))
 
     def __str__(self) -> str:
-        lang = translation.get_language()
-        lang_data = localization_models.Language.objects.filter(short_name=lang).values_list('id', flat=True)
-        if lang_data.__len__() > 0:
-            menu_item_name = \
-                ExtraMenuItemName.objects.filter(menu_item=self, language=lang_data[0]).values_list('name', flat=True)
-            if menu_item_name.__len__() > 0:
-                return menu_item_name[0]
-        menu_item_name = ExtraMenu.objects.filter(menu_item=self, default=True).values_list('name', flat=True)
+        menu_item_name = localization_resolver.get_resolver().resolve(ExtraMenuItemName, 'menu_item', self.id)
+        if menu_item_name is None:
+            return ''
         return menu_item_name[0]
 
+    @classmethod
+    def prefetch_translations(cls, ids: [int]) -> None:
+        localization_resolver.get_resolver().prefetch(ExtraMenuItemName, 'menu_item', ids)
+
     def save(self, force_insert=False, force_update=False, using=None, update_fields=None) -> None:
         for field in self._meta.fields:
             if field.name == 'first_image':
@@ -216,8 +211,7 @@ class ExtraMenu(MPTTModel):
 
     def check_language_for_name_admin_display(self) -> str:
         """Checks if languages of text data are corresponding to languages of the website"""
-        unrealized_languages = localization_models.Language.objects.exclude(
-            id__in=self.name_languages_ids).all().values_list('name', flat=True)
+        unrealized_languages = registry.unrealized_languages_names(self.name_languages_ids)
         languages__str = "<br/>".join(unrealized_languages)
         if unrealized_languages.__len__() > 0:
             return str.format(
@@ -232,9 +226,10 @@ class ExtraMenu(MPTTModel):
     @property
     def check_language_for_name(self) -> bool:
         """Checks if languages of text data are corresponding to languages of the website"""
-        languages = localization_models.Language.objects.all().values_list('id', flat=True)
+        languages = registry.language_ids()
+        name_languages_ids = self.name_languages_ids
         for language in languages:
-            if language not in self.name_languages_ids:
+            if language not in name_languages_ids:
                 return False
         return True
 
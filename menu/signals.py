@@ -0,0 +1,24 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+import menu.builder as menu_builder
+import menu.models as menu_models
+
+
+# Model -> menu it belongs to
+MENU_MODELS = {model: menu for menu, models in menu_builder.MENUS.items() for model in models}
+
+
+@receiver(post_save, sender=menu_models.MainMenu)
+@receiver(post_delete, sender=menu_models.MainMenu)
+@receiver(post_save, sender=menu_models.MainMenuItemName)
+@receiver(post_delete, sender=menu_models.MainMenuItemName)
+@receiver(post_save, sender=menu_models.AdditionalMenu)
+@receiver(post_delete, sender=menu_models.AdditionalMenu)
+@receiver(post_save, sender=menu_models.AdditionalMenuItemName)
+@receiver(post_delete, sender=menu_models.AdditionalMenuItemName)
+@receiver(post_save, sender=menu_models.ExtraMenu)
+@receiver(post_delete, sender=menu_models.ExtraMenu)
+@receiver(post_save, sender=menu_models.ExtraMenuItemName)
+@receiver(post_delete, sender=menu_models.ExtraMenuItemName)
+def invalidate_menu(sender, **kwargs) -> None:
+    menu_builder.invalidate(MENU_MODELS[sender])
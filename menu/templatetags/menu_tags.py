@@ -0,0 +1,11 @@
+from django import template
+import menu.fragments as menu_fragments
+
+register = template.Library()
+
+
+@register.simple_tag
+def menu_html(menu: str, url: str = None) -> str:
+    """Pre-rendered menu of the active language with elements linking to url marked active,
+    e.g. {% menu_html 'main' menu_url %}; url is the request path normalised by menu.builder.page_url"""
+    return menu_fragments.render(menu, url)
@@ -0,0 +1,143 @@
+import hashlib
+import threading
+import uuid
+from functools import wraps
+from django.core.cache import cache
+from django.core.signals import request_finished
+from django.db import connection
+from django.dispatch import receiver
+from django.utils import timezone
+import django.utils.translation as translation
+from neutrino.settings import VERSION_MODIFIED_CACHE_TIME
+
+
+_state = threading.local()
+
+
+def get_versions(keys: [str]) -> {str: str}:
+    """Returns version stamps stored in shared cache, creating missing ones"""
+    versions = cache.get_many(keys)
+    missing = {key: uuid.uuid4().hex for key in keys if key not in versions}
+    if missing.__len__() > 0:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return versions
+
+
+def bump_versions(keys: [str]) -> None:
+    """Changes version stamps, so every entry built with the old stamps becomes unreachable"""
+    cache.set_many({key: uuid.uuid4().hex for key in keys}, None)
+    if connection.in_atomic_block:
+        # Other processes could rebuild entries from uncommitted state, so stamps are changed once more
+        # when the request is finished
+        pending = getattr(_state, 'pending', None)
+        if pending is None:
+            pending = _state.pending = set()
+        pending.update(keys)
+
+
+def versions_modified(versions: {str: str}):
+    """Returns the latest time one of version stamps was first seen, which is never earlier than its change"""
+    keys = [str.format('modified:{0}', version) for version in versions.values()]
+    times = cache.get_many(keys)
+    missing = {key: timezone.now() for key in keys if key not in times}
+    if missing.__len__() > 0:
+        # Stamps change on every edit, so the times expire; an expired time is seen again later, never earlier
+        cache.set_many(missing, VERSION_MODIFIED_CACHE_TIME)
+        times.update(missing)
+    return max(times.values()) if times.__len__() > 0 else None
+
+
+@receiver(request_finished)
+def bump_pending_versions(sender, **kwargs) -> None:
+    pending = getattr(_state, 'pending', None)
+    if pending:
+        _state.pending = None
+        cache.set_many({key: uuid.uuid4().hex for key in pending}, None)
+
+
+# Tags
+def tag(model, pk: int) -> str:
+    return str.format('{0}.{1}:{2}', model._meta.app_label, model._meta.model_name, pk)
+
+
+def instance_tag(instance) -> str:
+    return tag(type(instance), instance.pk)
+
+
+def tag_key(name: str) -> str:
+    return str.format('tag:{0}', name)
+
+
+def invalidate_tags(tags: [str]) -> None:
+    """Evicts every cached entry that depends on one of the tags"""
+    bump_versions([tag_key(name) for name in tags])
+
+
+def get_tagged(key: str):
+    """Returns cached value, or None if it is missing or one of its tags was invalidated"""
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    versions, value = entry
+    if versions.__len__() > 0 and cache.get_many(list(versions.keys())) != versions:
+        return None
+    return value
+
+
+def set_tagged(key: str, value, tags: [str], timeout: int) -> None:
+    versions = get_versions([tag_key(name) for name in set(tags)])
+    cache.set(key, (versions, value), timeout)
+
+
+def depends_on(*tags: str) -> None:
+    """Marks value which is built right now (e.g. view response) as dependent on tags"""
+    collectors = getattr(_state, 'collectors', None)
+    if collectors:
+        collectors[-1].update(tags)
+
+
+def collect_start() -> None:
+    collectors = getattr(_state, 'collectors', None)
+    if collectors is None:
+        collectors = _state.collectors = []
+    collectors.append(set())
+
+
+def collect_stop() -> {str}:
+    collectors = _state.collectors
+    tags = collectors.pop()
+    if collectors.__len__() > 0:
+        collectors[-1].update(tags)
+    return tags
+
+
+def page_cache_key(request, variant: str = '') -> str:
+    url = hashlib.md5(request.build_absolute_uri().encode('utf-8')).hexdigest()
+    return str.format('page:{0}:{1}:{2}', translation.get_language(), variant, url)
+
+
+def tagged_cache_page(timeout: int, vary_on=None):
+    """Caches GET responses of the view until timeout or until one of tags the view depends on is invalidated.
+
+    vary_on(request) returns a string selecting one of cached variants of the same url (e.g. currency code).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            key = page_cache_key(request, vary_on(request) if vary_on is not None else '')
+            response = get_tagged(key)
+            if response is not None:
+                return response
+            collect_start()
+            try:
+                response = view(request, *args, **kwargs)
+            finally:
+                tags = collect_stop()
+            if response.status_code == 200 and not response.streaming:
+                set_tagged(key, response, tags, timeout)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,190 @@
+from django.core.cache import cache
+import django.utils.translation as translation
+import banner.models as banner_models
+import gallery.renditions as gallery_renditions
+import menu.builder as menu_builder
+import info_storage.models as info_storage_models
+import neutrino.cache as neutrino_cache
+from neutrino.settings import CHROME_CACHE_TIME
+
+
+BANNER = 'banner'
+INFO_STORAGE = 'info_storage'
+PARTS = (BANNER, INFO_STORAGE)
+
+
+class BannerImageContainer:
+    def __init__(self, image: banner_models.BannerImagePosition) -> None:
+        self.__name = image.name()
+        self.__description = image.description()
+        self.__small_image = image.small_image
+        self.__medium_image = image.medium_image
+        self.__large_image = image.large_image
+        self.__original_image = image.original_image
+        self.__pictures = image.pictures
+        self.__weight = image.weight
+
+    @property
+    def name(self) -> str:
+        return self.__name
+
+    @property
+    def description(self) -> str:
+        return self.__description
+
+    @property
+    def small_image(self) -> str:
+        return self.__small_image
+
+    @property
+    def medium_image(self) -> str:
+        return self.__medium_image
+
+    @property
+    def large_image(self) -> str:
+        return self.__large_image
+
+    @property
+    def original_image(self) -> str:
+        return self.__original_image
+
+    @property
+    def pictures(self) -> {str: gallery_renditions.Picture}:
+        return self.__pictures
+
+    @property
+    def weight(self) -> int:
+        return self.__weight
+
+
+class BannerContainer:
+    def __init__(self, images: [banner_models.BannerImagePosition]) -> None:
+        self.__items = []
+        for image in images:
+            self.append(image)
+
+    def append(self, image: banner_models.BannerImagePosition) -> None:
+        self.__items.append(BannerImageContainer(image))
+
+    @property
+    def images(self) -> [BannerImageContainer]:
+        return self.__items
+
+
+class BannersContainer:
+    def __init__(self, banners: [banner_models.Banner]) -> None:
+        banners = list(banners)
+        images = list(banner_models.BannerImagePosition.objects.filter(
+            banner__in=[banner.id for banner in banners], active=True).order_by('weight'))
+        banner_models.BannerImagePosition.prefetch_translations([image.id for image in images])
+        banner_images = {}
+        for image in images:
+            banner_images.setdefault(image.banner_id, []).append(image)
+        self.__items = {}
+        for banner in banners:
+            self.__items[banner.marker] = BannerContainer(banner_images.get(banner.id, []))
+
+    @property
+    def banners(self) -> {str: BannerContainer}:
+        return self.__items
+
+
+class Chrome:
+    """Parts of the page shared by every page of the site: menus, banners and info storage"""
+
+    def __init__(self, menus: {str: menu_builder.Menu}, banners: BannersContainer,
+                 info_storage: {str: str}) -> None:
+        self.__menus = menus
+        self.__banners = banners
+        self.__info_storage = info_storage
+
+    @property
+    def main_menu(self) -> [menu_builder.MenuNode]:
+        return self.__menus['main'].nodes
+
+    @property
+    def additional_menu(self) -> [menu_builder.MenuNode]:
+        return self.__menus['additional'].nodes
+
+    @property
+    def extra_menu(self) -> [menu_builder.MenuNode]:
+        return self.__menus['extra'].nodes
+
+    def breadcrumbs(self, path: str) -> (menu_builder.MenuNode,):
+        """Elements of the main menu from the root to the section of the request path"""
+        return self.__menus['main'].path(menu_builder.page_url(path))
+
+    def active_branch(self, path: str) -> {str: {int}}:
+        """Ids of elements leading to the section of the request path, by menu"""
+        url = menu_builder.page_url(path)
+        return {name: set(node.id for node in menu.path(url)) for name, menu in self.__menus.items()}
+
+    @property
+    def banners(self) -> BannersContainer:
+        return self.__banners
+
+    @property
+    def info_storage(self) -> {str: str}:
+        return dict(self.__info_storage)
+
+
+def build_banners() -> BannersContainer:
+    return BannersContainer(banner_models.Banner.objects.all())
+
+
+def build_info_storage() -> {str: str}:
+    storage = list(info_storage_models.Storage.objects.all())
+    info_storage_models.Storage.prefetch_translations([item.id for item in storage])
+    info_storage = {}
+    for item in storage:
+        info_storage[item.key] = item.__str__()
+    return info_storage
+
+
+BUILDERS = {
+    BANNER: build_banners,
+    INFO_STORAGE: build_info_storage,
+}
+
+
+def part_tag(part: str) -> str:
+    return str.format('chrome.{0}', part)
+
+
+def version_key(part: str) -> str:
+    return neutrino_cache.tag_key(part_tag(part))
+
+
+def tags() -> [str]:
+    """Tags of everything the chrome is built from"""
+    return [part_tag(part) for part in PARTS] + [menu_builder.menu_tag(menu) for menu in menu_builder.MENUS]
+
+
+def get_chrome(currency_code: str) -> Chrome:
+    """Returns chrome of the active language and given currency, building only parts missing in cache
+
+    Menus do not depend on currency, so they are cached by menu builder per language only.
+    """
+    language_code = translation.get_language()
+    neutrino_cache.depends_on(*[part_tag(part) for part in PARTS])
+    versions = neutrino_cache.get_versions([version_key(part) for part in PARTS])
+    keys = {}
+    for part in PARTS:
+        keys[part] = str.format('chrome:{0}:{1}:{2}:{3}', part, versions[version_key(part)], language_code,
+                                currency_code)
+    cached = cache.get_many(list(keys.values()))
+    parts = {}
+    missing = {}
+    for part in PARTS:
+        value = cached.get(keys[part])
+        if value is None:
+            value = BUILDERS[part]()
+            missing[keys[part]] = value
+        parts[part] = value
+    if missing.__len__() > 0:
+        cache.set_many(missing, CHROME_CACHE_TIME)
+    return Chrome(menu_builder.get_menus(), parts[BANNER], parts[INFO_STORAGE])
+
+
+def invalidate(part: str) -> None:
+    neutrino_cache.invalidate_tags([part_tag(part)])
@@ -0,0 +1,77 @@
+import hashlib
+from django.db.models import Max
+from django.views.decorators.http import condition
+import django.utils.translation as translation
+import banner.models as banner_models
+import gallery.models as gallery_models
+import localization.currency as localization_currency
+import localization.registry as localization_registry
+import neutrino.cache as neutrino_cache
+import neutrino.chrome as chrome
+
+
+class PageState:
+    """Dates of labels of everything shown on a page and tags of the cached data it is built from"""
+
+    def __init__(self, dates: list, tags: [str]) -> None:
+        self.__dates = [date for date in dates if date is not None]
+        self.__tags = list(tags) + chrome.tags() + [localization_registry.TAG]
+
+    @property
+    def dates(self) -> list:
+        return self.__dates
+
+    @property
+    def tags(self) -> [str]:
+        return self.__tags
+
+
+def label_dates(labels) -> list:
+    """Latest creating and modification dates among given DateTimeUserLabel rows"""
+    dates = labels.aggregate(created=Max('creating_date'), modified=Max('last_modified_date'))
+    return [dates['created'], dates['modified']]
+
+
+def shared_dates() -> list:
+    """Banners are shown on every page"""
+    return label_dates(banner_models.BannerDateTimeUserLabel.objects.all())
+
+
+def gallery_dates(galleries) -> list:
+    return label_dates(gallery_models.GalleryDateTimeUserLabel.objects.filter(gallery__in=galleries))
+
+
+def validators(request, state: PageState) -> (str, object):
+    """ETag and Last-Modified of the page.
+
+    Tags cover data without labels (texts, menus, currency rates), so the time their version stamps changed counts
+    as a modification too.
+    """
+    versions = neutrino_cache.get_versions([neutrino_cache.tag_key(name) for name in state.tags])
+    dates = state.dates + [neutrino_cache.versions_modified(versions)]
+    last_modified = max(date for date in dates if date is not None)
+    data = repr((request.get_full_path(), translation.get_language(), localization_currency.currency_code(request),
+                 sorted(versions.items()), last_modified))
+    return hashlib.md5(data.encode('utf-8')).hexdigest(), last_modified
+
+
+def conditional_page(page_state):
+    """Answers conditional GET of the view with 304 Not Modified when its page has not changed.
+
+    page_state(request, *args, **kwargs) takes arguments of the view and returns PageState, or None if there is no
+    such page; it is called once per request for both validators.
+    """
+    def request_validators(request, *args, **kwargs) -> (str, object):
+        cached = getattr(request, '_page_validators', None)
+        if cached is None:
+            state = page_state(request, *args, **kwargs)
+            cached = validators(request, state) if state is not None else (None, None)
+            request._page_validators = cached
+        return cached
+
+    def etag(request, *args, **kwargs) -> str:
+        return request_validators(request, *args, **kwargs)[0]
+
+    def last_modified(request, *args, **kwargs):
+        return request_validators(request, *args, **kwargs)[1]
+    return condition(etag_func=etag, last_modified_func=last_modified)
@@ -0,0 +1,33 @@
+import threading
+from django.core.signals import request_finished
+from django.db import connection
+
+
+class DeferredBatch:
+    """Collects ids of changed objects and processes them with one handler call.
+
+    Changes made inside a transaction are processed when the request is finished, i.e. after the data is committed,
+    so several saves of the same object during one admin request cost one call. Outside of transactions the handler
+    is called at once.
+    """
+
+    def __init__(self, handler) -> None:
+        self.__handler = handler
+        self.__state = threading.local()
+        request_finished.connect(self.flush, weak=False)
+
+    def add(self, ids: [int]) -> None:
+        if not connection.in_atomic_block:
+            self.__handler(set(ids))
+            return
+        pending = getattr(self.__state, 'pending', None)
+        if pending is None:
+            pending = self.__state.pending = set()
+        pending.update(ids)
+
+    def flush(self, sender=None, **kwargs) -> None:
+        """Processes ids collected in the current thread"""
+        pending = getattr(self.__state, 'pending', None)
+        if pending:
+            self.__state.pending = None
+            self.__handler(pending)
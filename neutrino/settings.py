@@ -44,10 +44,14 @@ SITE_APPS = (
     'static_page',
     'menu',
     'localization',
+    'media_store',
     'gallery',
     'banner',
     'catalogue',
-    'info_storage'
+    'info_storage',
+    'search',
+    'sitemap',
+    'api',
 )
 
 if DEBUG:
@@ -59,6 +63,7 @@ INSTALLED_APPS = EXTERNAL_APPS + DJANGO_APPS + SITE_APPS
 MIDDLEWARE_CLASSES = (
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',
+    'localization.middleware.TranslationResolverMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -93,6 +98,16 @@ if not DEBUG:
 STATIC_PAGE_CACHE_TIME = 60*60*24
 CATALOGUE_CATEGORY_CACHE_TIME = 60*60*24
 CATALOGUE_ITEM_CACHE_TIME = 60*60*24
+CHROME_CACHE_TIME = 60*60*24
+# First-seen times of version stamps (Last-Modified) outlive every page built with the stamps
+VERSION_MODIFIED_CACHE_TIME = max(STATIC_PAGE_CACHE_TIME, CATALOGUE_CATEGORY_CACHE_TIME, CATALOGUE_ITEM_CACHE_TIME,
+                                  CHROME_CACHE_TIME)
+
+CURRENCY_COOKIE_NAME = 'currency'
+CURRENCY_COOKIE_AGE = 60*60*24*365
+
+# search.backends.postgresql.PostgreSQLBackend for PostgreSQL databases
+SEARCH_BACKEND = 'search.backends.sqlite.SQLiteBackend'
 
 ROOT_URLCONF = 'neutrino.urls'
 
@@ -179,6 +194,17 @@ CATALOGUE_ITEM_GALLERY = {
     'small': '62x44'
 }
 
+BANNER = {
+    'large': '1920x600',
+    'medium': '1200x375',
+    'small': '750x234'
+}
+
+# Thumbnails are generated in these formats besides the format of the original, preferred first.
+# Formats Pillow can not write are skipped ('avif' needs an AVIF plugin for Pillow).
+RENDITION_FORMATS = ('avif', 'webp')
+RENDITION_DENSITIES = (1, 2)
+
 CKEDITOR_IMAGE_BACKEND = 'pillow'
 CKEDITOR_UPLOAD_PATH = 'ckeditor/uploads'
 CKEDITOR_RESTRICT_BY_USER = True
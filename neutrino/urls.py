@@ -28,6 +28,7 @@ urlpatterns = i18n_patterns(
     url(r'^admin/', include(admin.site.urls)),
     url(r'^ckeditor/', include('ckeditor_uploader.urls')),
     url(r'^catalogue/', include('catalogue.urls')),
+    url(r'^search/', include('search.urls')),
     url(r'', include('static_page.urls')),
 )
 
@@ -35,6 +36,12 @@ urlpatterns += patterns(
     url(r'^localization_api/', include('localization.urls')),
 )
 
+# Sitemaps list every language themselves and API takes ?language=, so they are served without a language prefix
+urlpatterns += patterns('',
+    url(r'^', include('sitemap.urls')),
+    url(r'^api/', include('api.urls')),
+)
+
 if settings.DEBUG:
     import debug_toolbar
     urlpatterns += patterns('',
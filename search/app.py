@@ -0,0 +1,13 @@
+from django.utils.translation import ugettext_lazy as _
+from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+class SearchAppConfig(AppConfig):
+    name = 'search'
+    verbose_name = _('Search')
+
+    def ready(self) -> None:
+        import search.signals
+        # The app has no models module, so post_migrate is never sent for it; the index is set up after any app
+        post_migrate.connect(search.signals.setup_index, dispatch_uid='search.setup_index')
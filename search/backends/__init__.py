@@ -0,0 +1,31 @@
+from django.utils.module_loading import import_string
+from neutrino.settings import SEARCH_BACKEND
+
+
+_backend = None
+
+
+class SearchBackend:
+    """Keeps full-text index of items, one document per item and language"""
+
+    def setup(self) -> None:
+        """Creates index structures if they do not exist"""
+        raise NotImplementedError
+
+    def update(self, item_ids: [int], documents: list) -> None:
+        """Replaces documents of given items; items without documents are removed from index"""
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def search(self, query: str, language_id: int, offset: int, limit: int) -> ([int], int):
+        """Returns ids of items ranked by relevance and total number of hits"""
+        raise NotImplementedError
+
+
+def get_backend() -> SearchBackend:
+    global _backend
+    if _backend is None:
+        _backend = import_string(SEARCH_BACKEND)()
+    return _backend
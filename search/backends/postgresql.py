@@ -0,0 +1,56 @@
+import re
+from django.db import connection
+from search.backends import SearchBackend
+
+
+TABLE = 'search_items'
+# 'simple' configuration does not stem, so it works the same way for every language of the site
+CONFIGURATION = 'simple'
+
+
+class PostgreSQLBackend(SearchBackend):
+    """PostgreSQL tsvector table with GIN index ranked with ts_rank"""
+
+    def setup(self) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(str.format('CREATE TABLE IF NOT EXISTS {0} (item_id integer NOT NULL, '
+                                      'language_id integer NOT NULL, document tsvector NOT NULL, '
+                                      'PRIMARY KEY (item_id, language_id))', TABLE))
+            cursor.execute(str.format('CREATE INDEX IF NOT EXISTS {0}_document ON {0} USING gin(document)', TABLE))
+
+    def update(self, item_ids: [int], documents: list) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(str.format('DELETE FROM {0} WHERE item_id = ANY(%s)', TABLE), [list(item_ids)])
+            cursor.executemany(str.format(
+                'INSERT INTO {0} (item_id, language_id, document) VALUES (%s, %s, '
+                'setweight(to_tsvector(\'{1}\', %s), \'A\') || setweight(to_tsvector(\'{1}\', %s), \'C\') || '
+                'setweight(to_tsvector(\'{1}\', %s), \'B\') || setweight(to_tsvector(\'{1}\', %s), \'B\') || '
+                'setweight(to_tsvector(\'{1}\', %s), \'D\'))', TABLE, CONFIGURATION),
+                [(document.item_id, document.language_id, document.name, document.category_name,
+                  document.short_text, ' '.join(document.parameters), ' '.join(document.body))
+                 for document in documents])
+
+    def clear(self) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(str.format('TRUNCATE {0}', TABLE))
+
+    @staticmethod
+    def query_expression(query: str) -> str:
+        terms = re.findall(r'\w+', query, re.UNICODE)
+        return ' & '.join(str.format('{0}:*', term) for term in terms)
+
+    def search(self, query: str, language_id: int, offset: int, limit: int) -> ([int], int):
+        expression = self.query_expression(query)
+        if expression == '':
+            return [], 0
+        with connection.cursor() as cursor:
+            cursor.execute(str.format('SELECT count(*) FROM {0} WHERE language_id = %s AND '
+                                      'document @@ to_tsquery(\'{1}\', %s)', TABLE, CONFIGURATION),
+                           [language_id, expression])
+            total = cursor.fetchone()[0]
+            cursor.execute(str.format('SELECT item_id FROM {0} WHERE language_id = %s AND '
+                                      'document @@ to_tsquery(\'{1}\', %s) '
+                                      'ORDER BY ts_rank(document, to_tsquery(\'{1}\', %s)) DESC, item_id '
+                                      'LIMIT %s OFFSET %s', TABLE, CONFIGURATION),
+                           [language_id, expression, expression, limit, offset])
+            return [row[0] for row in cursor.fetchall()], total
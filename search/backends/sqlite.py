@@ -0,0 +1,58 @@
+import re
+from django.db import connection
+from search.backends import SearchBackend
+
+
+TABLE = 'search_items'
+# Relative weights of columns in bm25 ranking: item_id, language_id, name, category_name, short_text, parameters, body
+WEIGHTS = (0.0, 0.0, 10.0, 2.0, 4.0, 3.0, 1.0)
+# Documents of an item occupy rowids item_id * ROWIDS_PER_ITEM + language_id, so they are found by a rowid range;
+# item_id column is UNINDEXED and filtering by it scans the whole table
+ROWIDS_PER_ITEM = 1 << 16
+
+
+class SQLiteBackend(SearchBackend):
+    """SQLite FTS5 virtual table ranked with bm25"""
+
+    def setup(self) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(str.format('CREATE VIRTUAL TABLE IF NOT EXISTS {0} USING fts5('
+                                      'item_id UNINDEXED, language_id UNINDEXED, name, category_name, short_text, '
+                                      'parameters, body, tokenize="unicode61 remove_diacritics 2")', TABLE))
+
+    def update(self, item_ids: [int], documents: list) -> None:
+        with connection.cursor() as cursor:
+            cursor.executemany(str.format('DELETE FROM {0} WHERE rowid BETWEEN %s AND %s', TABLE),
+                               [(item_id * ROWIDS_PER_ITEM, (item_id + 1) * ROWIDS_PER_ITEM - 1)
+                                for item_id in item_ids])
+            cursor.executemany(str.format('INSERT INTO {0} (rowid, item_id, language_id, name, category_name, '
+                                          'short_text, parameters, body) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)',
+                                          TABLE),
+                               [(document.item_id * ROWIDS_PER_ITEM + document.language_id, document.item_id,
+                                 document.language_id, document.name, document.category_name, document.short_text,
+                                 ' '.join(document.parameters), ' '.join(document.body))
+                                for document in documents])
+
+    def clear(self) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(str.format('DELETE FROM {0}', TABLE))
+
+    @staticmethod
+    def match_expression(query: str) -> str:
+        """Turns user input into FTS5 query of prefix terms, so FTS5 syntax in the input is never interpreted"""
+        terms = re.findall(r'\w+', query, re.UNICODE)
+        return ' '.join(str.format('"{0}"*', term) for term in terms)
+
+    def search(self, query: str, language_id: int, offset: int, limit: int) -> ([int], int):
+        expression = self.match_expression(query)
+        if expression == '':
+            return [], 0
+        with connection.cursor() as cursor:
+            cursor.execute(str.format('SELECT count(*) FROM {0} WHERE {0} MATCH %s AND language_id = %s', TABLE),
+                           [expression, language_id])
+            total = cursor.fetchone()[0]
+            cursor.execute(str.format('SELECT item_id FROM {0} WHERE {0} MATCH %s AND language_id = %s '
+                                      'ORDER BY bm25({0}, {1}) LIMIT %s OFFSET %s', TABLE,
+                                      ', '.join(str(weight) for weight in WEIGHTS)),
+                           [expression, language_id, limit, offset])
+            return [row[0] for row in cursor.fetchall()], total
@@ -0,0 +1,85 @@
+import catalogue.models as catalogue_models
+from localization.registry import registry
+
+
+class Document:
+    """Searchable texts of one item in one language"""
+
+    def __init__(self, item_id: int, language_id: int) -> None:
+        self.__item_id = item_id
+        self.__language_id = language_id
+        self.name = ''
+        self.category_name = ''
+        self.short_text = ''
+        self.parameters = []
+        self.body = []
+
+    @property
+    def item_id(self) -> int:
+        return self.__item_id
+
+    @property
+    def language_id(self) -> int:
+        return self.__language_id
+
+
+def _localized(rows: [(int, int, bool, str)], owner_ids: [int], language_ids: [int]) -> {(int, int): str}:
+    """Picks value of every language for every owner from (owner id, language id, default, value) rows,
+    falling back to the default value"""
+    values = {}
+    defaults = {}
+    for owner_id, language_id, default, value in rows:
+        values[(owner_id, language_id)] = value
+        if default:
+            defaults[owner_id] = value
+    result = {}
+    for owner_id in owner_ids:
+        for language_id in language_ids:
+            value = values.get((owner_id, language_id), defaults.get(owner_id))
+            if value is not None:
+                result[(owner_id, language_id)] = value
+    return result
+
+
+def build_documents(item_ids: [int]) -> [Document]:
+    """Builds documents of active items in every language of the site with a fixed number of queries"""
+    items = dict(catalogue_models.Item.objects.filter(id__in=item_ids, active=True).values_list('id', 'category'))
+    if items.__len__() == 0:
+        return []
+    language_ids = registry.language_ids()
+    category_ids = set(items.values())
+    names = _localized(catalogue_models.ItemName.objects.filter(item__in=items.keys()).
+                       values_list('item', 'language', 'default', 'name'), items.keys(), language_ids)
+    category_names = _localized(catalogue_models.CategoryName.objects.filter(category__in=category_ids).
+                                values_list('category', 'language', 'default', 'name'), category_ids, language_ids)
+    documents = {}
+    for item_id, category_id in items.items():
+        for language_id in language_ids:
+            document = Document(item_id, language_id)
+            document.name = names.get((item_id, language_id), '')
+            document.category_name = category_names.get((category_id, language_id), '')
+            documents[(item_id, language_id)] = document
+    for item_id, language_id, body in catalogue_models.ItemShortText.objects.filter(item__in=items.keys()).\
+            values_list('item', 'language', 'body'):
+        if (item_id, language_id) in documents:
+            documents[(item_id, language_id)].short_text = body
+    for item_id, language_id, name, body in catalogue_models.ItemText.objects.filter(item__in=items.keys()).\
+            values_list('item', 'language', 'name', 'body'):
+        if (item_id, language_id) in documents:
+            documents[(item_id, language_id)].body.extend((name, body))
+    parameters = {}
+    for parameter_id, item_id, name, value in catalogue_models.ItemParameter.objects.filter(item__in=items.keys()).\
+            values_list('id', 'item', 'default_name', 'default_value'):
+        parameters[parameter_id] = (item_id, name, value)
+    translated = set()
+    for parameter_id, language_id, name, value in catalogue_models.ItemParameterName.objects.\
+            filter(item_parameter__in=parameters.keys()).values_list('item_parameter', 'language', 'name', 'value'):
+        item_id = parameters[parameter_id][0]
+        if (item_id, language_id) in documents:
+            documents[(item_id, language_id)].parameters.extend((name, value))
+            translated.add((parameter_id, language_id))
+    for parameter_id, (item_id, name, value) in parameters.items():
+        for language_id in language_ids:
+            if (parameter_id, language_id) not in translated:
+                documents[(item_id, language_id)].parameters.extend((name, value))
+    return list(documents.values())
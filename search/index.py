@@ -0,0 +1,43 @@
+import logging
+from django.db import DatabaseError, transaction
+import catalogue.models as catalogue_models
+import neutrino.deferred as neutrino_deferred
+from search.backends import get_backend
+from search.documents import build_documents
+
+
+REBUILD_CHUNK = 500
+logger = logging.getLogger(__name__)
+
+
+def update_items(item_ids: [int]) -> None:
+    """Reindexes given items; inactive and deleted items are removed from index
+
+    A broken index never breaks saving of the catalogue: the failure is logged and the items stay stale until
+    rebuild_search_index is run.
+    """
+    item_ids = list(item_ids)
+    documents = build_documents(item_ids)
+    try:
+        # Savepoint keeps the surrounding transaction usable if the index statement fails
+        with transaction.atomic():
+            get_backend().update(item_ids, documents)
+    except DatabaseError:
+        logger.exception('Search index is not updated for items %s', item_ids)
+
+
+def rebuild() -> None:
+    backend = get_backend()
+    backend.setup()
+    backend.clear()
+    item_ids = list(catalogue_models.Item.objects.order_by('id').values_list('id', flat=True))
+    for start in range(0, item_ids.__len__(), REBUILD_CHUNK):
+        chunk = item_ids[start:start + REBUILD_CHUNK]
+        backend.update(chunk, build_documents(chunk))
+
+
+dirty_items = neutrino_deferred.DeferredBatch(update_items)
+
+
+def mark_dirty(item_ids: [int]) -> None:
+    dirty_items.add(item_ids)
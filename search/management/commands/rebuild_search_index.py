@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+import search.index as search_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds full-text index of items, e.g. after a language was added to the site'
+
+    def handle(self, *args, **options):
+        search_index.rebuild()
+        self.stdout.write('Search index rebuilt')
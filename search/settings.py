@@ -0,0 +1 @@
+RESULTS_ON_PAGE = 20
@@ -0,0 +1,49 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+import catalogue.exchange as catalogue_exchange
+import catalogue.models as catalogue_models
+import search.index as search_index
+from search.backends import get_backend
+
+
+def setup_index(sender, **kwargs) -> None:
+    get_backend().setup()
+
+
+@receiver(post_save, sender=catalogue_models.Item)
+@receiver(post_delete, sender=catalogue_models.Item)
+def reindex_item(sender, instance, **kwargs) -> None:
+    search_index.mark_dirty([instance.id])
+
+
+@receiver(post_save, sender=catalogue_models.ItemName)
+@receiver(post_delete, sender=catalogue_models.ItemName)
+@receiver(post_save, sender=catalogue_models.ItemText)
+@receiver(post_delete, sender=catalogue_models.ItemText)
+@receiver(post_save, sender=catalogue_models.ItemShortText)
+@receiver(post_delete, sender=catalogue_models.ItemShortText)
+@receiver(post_save, sender=catalogue_models.ItemParameter)
+@receiver(post_delete, sender=catalogue_models.ItemParameter)
+def reindex_item_data(sender, instance, **kwargs) -> None:
+    search_index.mark_dirty([instance.item_id])
+
+
+@receiver(post_save, sender=catalogue_models.ItemParameterName)
+@receiver(post_delete, sender=catalogue_models.ItemParameterName)
+def reindex_item_parameter(sender, instance, **kwargs) -> None:
+    search_index.mark_dirty(catalogue_models.ItemParameter.objects.filter(id=instance.item_parameter_id).
+                            values_list('item', flat=True))
+
+
+@receiver(post_save, sender=catalogue_models.CategoryName)
+@receiver(post_delete, sender=catalogue_models.CategoryName)
+def reindex_category_items(sender, instance, **kwargs) -> None:
+    search_index.mark_dirty(catalogue_models.Item.objects.filter(category=instance.category_id).
+                            values_list('id', flat=True))
+
+
+@receiver(catalogue_exchange.items_imported)
+def reindex_imported_items(sender, item_ids, **kwargs) -> None:
+    search_index.update_items(item_ids)
+    # Items of rows deleted during the import were queued by model signals
+    search_index.dirty_items.flush()
@@ -0,0 +1,7 @@
+from django.conf.urls import url
+from search import views
+
+
+urlpatterns = [
+     url('^$', view=views.search, name='search'),
+]
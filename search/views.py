@@ -0,0 +1,51 @@
+import math
+from django.shortcuts import render
+from django.http import HttpResponseNotFound
+from django.template.loader import get_template
+from django.template import Context
+import django.utils.translation as translation
+import catalogue.models as catalogue_models
+from catalogue.views import ItemsContainer
+import localization.currency as localization_currency
+from localization.registry import registry
+import neutrino.chrome as chrome
+import search.settings as search_settings
+from search.backends import get_backend
+
+
+def search(request):
+    query = request.GET.get('q', '').strip()
+    language_code = translation.get_language()
+    language = registry.language(language_code)
+    try:
+        page = int(request.GET.get('page', 1))
+    except ValueError:
+        return HttpResponseNotFound(get_template('system/404.html').render(Context({})))
+    if page < 1:
+        return HttpResponseNotFound(get_template('system/404.html').render(Context({})))
+
+    item_ids, total = [], 0
+    if query != '' and language is not None:
+        item_ids, total = get_backend().search(query, language.id, (page - 1) * search_settings.RESULTS_ON_PAGE,
+                                               search_settings.RESULTS_ON_PAGE)
+    rows = {row[0]: row for row in catalogue_models.Item.objects.filter(id__in=item_ids, active=True).
+            values_list('id', 'url', 'code', 'default_price', 'currency')}
+    currency = localization_currency.get_currency(request)
+    items = ItemsContainer([rows[item_id] for item_id in item_ids if item_id in rows], currency).items
+    site_chrome = chrome.get_chrome(localization_currency.currency_code(request))
+
+    return render(request, 'search/index.html', {
+        'query': query,
+        'languages': registry.languages(),
+        'language_code': language_code,
+        'banners_container': site_chrome.banners,
+        'main_menu': site_chrome.main_menu,
+        'additional_menu': site_chrome.additional_menu,
+        'extra_menu': site_chrome.extra_menu,
+        'items': items,
+        'total': total,
+        'max_page': max(1, int(math.ceil(total / search_settings.RESULTS_ON_PAGE))),
+        'current_page': page,
+        'currency': currency,
+        'info_storage': site_chrome.info_storage
+    })
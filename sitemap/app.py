@@ -0,0 +1,7 @@
+from django.utils.translation import ugettext_lazy as _
+from django.apps import AppConfig
+
+
+class SitemapAppConfig(AppConfig):
+    name = 'sitemap'
+    verbose_name = _('Sitemap')
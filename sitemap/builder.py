@@ -0,0 +1,198 @@
+import hashlib
+import math
+import os
+from xml.sax.saxutils import escape
+from django.core.urlresolvers import reverse
+from django.db.models import Count, Max, Sum
+from django.utils import timezone
+import django.utils.translation as translation
+import catalogue.models as catalogue_models
+import catalogue.settings as catalogue_settings
+import static_page.models as static_page_models
+import sitemap.models as sitemap_models
+import sitemap.settings as sitemap_settings
+from neutrino.settings import LANGUAGES
+
+
+URLSET = ('<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9" '
+          'xmlns:xhtml="http://www.w3.org/1999/xhtml">\n')
+SITEMAPINDEX = '<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+INDEX_NAME = 'sitemap.xml'
+
+
+class Shard:
+    """One sitemap file: its name, signature of the data it is built from and a function listing its locations.
+
+    Location is (view name, view args, last modification date); every location is written once per language.
+    """
+
+    def __init__(self, name: str, signature: str, locations) -> None:
+        self.__name = name
+        self.__signature = signature
+        self.__locations = locations
+
+    @property
+    def name(self) -> str:
+        return self.__name
+
+    @property
+    def signature(self) -> str:
+        return self.__signature
+
+    def locations(self) -> [(str, tuple, object)]:
+        return self.__locations()
+
+
+def signature(*data) -> str:
+    return hashlib.md5(repr(data).encode('utf-8')).hexdigest()
+
+
+def last_modified(created, modified):
+    dates = [date for date in (created, modified) if date is not None]
+    return max(dates) if dates.__len__() > 0 else None
+
+
+def file_name(shard_name: str) -> str:
+    return str.format('sitemap-{0}.xml', shard_name)
+
+
+def locations_per_file() -> int:
+    return sitemap_settings.URLS_PER_FILE // LANGUAGES.__len__()
+
+
+# Shards
+def page_shards(base_url: str) -> [Shard]:
+    rows = list(static_page_models.StaticPage.objects.order_by('id').
+                values_list('name', 'staticpagedatetimeuserlabel__creating_date',
+                            'staticpagedatetimeuserlabel__last_modified_date'))
+    if rows.__len__() == 0:
+        return []
+
+    def locations():
+        return [(('index_page', ()) if name == 'index' else ('static_page', (name,))) +
+                (last_modified(created, modified),) for name, created, modified in rows]
+    return [Shard('pages', signature(base_url, rows), locations)]
+
+
+def category_shards(base_url: str) -> [Shard]:
+    """Every page of category listings; rebuilt together when a category is edited or its number of items changes"""
+    counts = dict(catalogue_models.Item.objects.filter(active=True).order_by().values_list('category').
+                  annotate(count=Count('id')))
+    rows = list(catalogue_models.Category.objects.order_by('id').
+                values_list('id', 'url', 'categorydatetimeuserlabel__creating_date',
+                            'categorydatetimeuserlabel__last_modified_date'))
+    locations = []
+    for category_id, url, created, modified in rows:
+        pages = max(1, int(math.ceil(counts.get(category_id, 0) / catalogue_settings.PRODUCT_ON_PAGE)))
+        lastmod = last_modified(created, modified)
+        locations.append(('catalogue_category', (url,), lastmod))
+        locations += [('catalogue_category', (url, page), lastmod) for page in range(2, pages + 1)]
+    section_signature = signature(base_url, rows, sorted(counts.items()), catalogue_settings.PRODUCT_ON_PAGE)
+    shards = []
+    size = locations_per_file()
+    for number, start in enumerate(range(0, locations.__len__(), size)):
+        part = locations[start:start + size]
+        shards.append(Shard(str.format('categories-{0}', number), signature(section_signature, number),
+                            lambda part=part: part))
+    return shards
+
+
+def item_block(start: int, end: int):
+    return catalogue_models.Item.objects.filter(active=True, id__gte=start, id__lt=end)
+
+
+def item_shards(base_url: str) -> [Shard]:
+    """Items split by ranges of ids, so a change rebuilds only the file of the changed item"""
+    size = locations_per_file()
+    max_id = catalogue_models.Item.objects.aggregate(max_id=Max('id'))['max_id'] or 0
+    shards = []
+    for start in range(0, max_id + 1, size):
+        end = start + size
+        state = item_block(start, end).aggregate(
+            count=Count('id'), ids=Sum('id'), created=Max('itemdatetimeuserlabel__creating_date'),
+            modified=Max('itemdatetimeuserlabel__last_modified_date'),
+            category_modified=Max('category__categorydatetimeuserlabel__last_modified_date'))
+        if state['count'] == 0:
+            continue
+
+        def locations(start=start, end=end):
+            return [('catalogue_item', (category_url, url), last_modified(created, modified))
+                    for url, category_url, created, modified in item_block(start, end).order_by('id').
+                    values_list('url', 'category__url', 'itemdatetimeuserlabel__creating_date',
+                                'itemdatetimeuserlabel__last_modified_date')]
+        shards.append(Shard(str.format('items-{0}', start // size), signature(base_url, sorted(state.items())),
+                            locations))
+    return shards
+
+
+# Output
+def url_elements(base_url: str, view_name: str, args: tuple, lastmod) -> str:
+    """<url> of the location in every language, each listing all languages as alternates"""
+    links = []
+    for language_code, language_name in LANGUAGES:
+        with translation.override(language_code):
+            links.append((language_code, escape(base_url + reverse(view_name, args=args), {'"': '&quot;'})))
+    alternates = ''.join(str.format('<xhtml:link rel="alternate" hreflang="{0}" href="{1}"/>', language_code, link)
+                         for language_code, link in links)
+    lastmod_element = str.format('<lastmod>{0}</lastmod>', lastmod.date().isoformat()) if lastmod is not None else ''
+    return ''.join(str.format('<url><loc>{0}</loc>{1}{2}</url>\n', link, lastmod_element, alternates)
+                   for language_code, link in links)
+
+
+def write_file(name: str, parts) -> None:
+    """Writes the file next to the old one and swaps them, so a half-written file is never served"""
+    path = os.path.join(sitemap_settings.SITEMAP_ROOT, name)
+    temporary_path = path + '.tmp'
+    with open(temporary_path, 'w', encoding='utf-8') as output:
+        for part in parts:
+            output.write(part)
+    os.replace(temporary_path, path)
+
+
+def write_shard(shard: Shard, base_url: str) -> int:
+    """Writes the shard; returns number of urls in it"""
+    locations = shard.locations()
+
+    def parts():
+        yield URLSET
+        for view_name, args, lastmod in locations:
+            yield url_elements(base_url, view_name, args, lastmod)
+        yield '</urlset>\n'
+    write_file(file_name(shard.name), parts())
+    return locations.__len__() * LANGUAGES.__len__()
+
+
+def write_index(base_url: str) -> None:
+    def parts():
+        yield SITEMAPINDEX
+        for name, generated_at in sitemap_models.SitemapShard.objects.order_by('name').\
+                values_list('name', 'generated_at'):
+            yield str.format('<sitemap><loc>{0}</loc><lastmod>{1}</lastmod></sitemap>\n',
+                             escape(str.format('{0}/{1}', base_url, file_name(name))), generated_at.isoformat())
+        yield '</sitemapindex>\n'
+    write_file(INDEX_NAME, parts())
+
+
+def build(base_url: str = sitemap_settings.BASE_URL, force: bool = False) -> [str]:
+    """Writes shards whose data has changed since they were generated and the index; returns written shards"""
+    base_url = base_url.rstrip('/')
+    os.makedirs(sitemap_settings.SITEMAP_ROOT, exist_ok=True)
+    stored = {shard.name: shard for shard in sitemap_models.SitemapShard.objects.all()}
+    written = []
+    for shard in page_shards(base_url) + category_shards(base_url) + item_shards(base_url):
+        state = stored.pop(shard.name, None)
+        if not force and state is not None and state.signature == shard.signature and \
+                os.path.exists(os.path.join(sitemap_settings.SITEMAP_ROOT, file_name(shard.name))):
+            continue
+        urls = write_shard(shard, base_url)
+        sitemap_models.SitemapShard.objects.update_or_create(
+            name=shard.name, defaults={'signature': shard.signature, 'urls': urls, 'generated_at': timezone.now()})
+        written.append(shard.name)
+    # Shards of removed items or categories
+    for name in stored.keys():
+        path = os.path.join(sitemap_settings.SITEMAP_ROOT, file_name(name))
+        if os.path.exists(path):
+            os.remove(path)
+    sitemap_models.SitemapShard.objects.filter(name__in=stored.keys()).delete()
+    write_index(base_url)
+    return written
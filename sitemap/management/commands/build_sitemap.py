@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+import sitemap.builder as sitemap_builder
+import sitemap.settings as sitemap_settings
+
+
+class Command(BaseCommand):
+    help = 'Regenerates sitemap files whose pages, categories or items have changed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default=sitemap_settings.BASE_URL,
+                            help='Scheme and host the locations are written with')
+        parser.add_argument('--force', action='store_true', default=False,
+                            help='Rewrite every file, even if its data has not changed')
+
+    def handle(self, *args, **options):
+        written = sitemap_builder.build(options['base_url'], options['force'])
+        for name in written:
+            self.stdout.write(sitemap_builder.file_name(name))
+        self.stdout.write(str.format('{0} sitemap files written', written.__len__()))
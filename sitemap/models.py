@@ -0,0 +1,20 @@
+from django.db import models
+from django.utils.translation import ugettext_lazy as _
+
+
+class SitemapShard(models.Model):
+    """Generated sitemap file with signature of the data it was built from"""
+    id = models.AutoField(primary_key=True, verbose_name=_('Id'), help_text=_('Unique identifier'))
+    name = models.CharField(max_length=128, unique=True, verbose_name=_('Name'), help_text=_('Name'))
+    signature = models.CharField(max_length=64, verbose_name=_('Signature'),
+                                 help_text=_('Changes when urls of the shard change'))
+    urls = models.IntegerField(default=0, verbose_name=_('Urls'), help_text=_('Number of urls'))
+    generated_at = models.DateTimeField(verbose_name=_('Generated at'), help_text=_('Date of generation'))
+
+    def __str__(self) -> str:
+        return self.name
+
+    class Meta:
+        db_table = 'sitemap_shards'
+        verbose_name = _('Sitemap shard')
+        verbose_name_plural = _('Sitemap shards')
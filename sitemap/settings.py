@@ -0,0 +1,9 @@
+import os
+from neutrino.settings import BASE_DIR
+
+# Sitemap protocol limit of urls in one file
+URLS_PER_FILE = 50000
+# Generated files, served at /sitemap.xml and /sitemap-<shard>.xml; the directory is not tracked by git
+SITEMAP_ROOT = os.path.join(BASE_DIR, 'var', 'sitemap')
+# Used in urls of the sitemap when build_sitemap is run without --base-url
+BASE_URL = 'http://localhost:8000'
@@ -0,0 +1,7 @@
+from django.conf.urls import url
+from sitemap import views as views
+
+urlpatterns = [
+     url('^sitemap\.xml$', view=views.sitemap_index, name='sitemap_index'),
+     url('^sitemap-([\w-]+)\.xml$', view=views.sitemap_shard, name='sitemap_shard'),
+]
@@ -0,0 +1,19 @@
+import os
+from django.http import FileResponse, Http404
+import sitemap.builder as sitemap_builder
+import sitemap.settings as sitemap_settings
+
+
+def serve(name: str) -> FileResponse:
+    path = os.path.join(sitemap_settings.SITEMAP_ROOT, name)
+    if not os.path.isfile(path):
+        raise Http404()
+    return FileResponse(open(path, 'rb'), content_type='application/xml; charset=utf-8')
+
+
+def sitemap_index(request):
+    return serve(sitemap_builder.INDEX_NAME)
+
+
+def sitemap_shard(request, name):
+    return serve(sitemap_builder.file_name(name))
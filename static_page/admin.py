@@ -5,11 +5,11 @@ from django.db import models
 from django.db.models import Max
 import static_page.models as static_page_models
 import localization.models as localization_models
+import localization.filters as localization_filters
 from django.utils.translation import ugettext_lazy as _
 from django.contrib.admin import SimpleListFilter
 import ckeditor_uploader.widgets as ckeditor_uploader_widgets
 import tabbed_admin
-from django.core.cache import cache
 
 
 class CreatedByStaticPageFilter(SimpleListFilter):
@@ -120,96 +120,32 @@ class StaticPageTextFilter(SimpleListFilter):
         return queryset.filter(page=static_page_models.StaticPage.objects.filter(pk=self.value()).first())
 
 
-class StaticPageSeoInformationUnrealizedLanguageFilter(SimpleListFilter):
+class StaticPageSeoInformationUnrealizedLanguageFilter(localization_filters.NotRealizedLanguageFilter):
     title = _('Unrealized SEO information')
 
     parameter_name = 'seo_lang'
 
-    def lookups(self, request, model_admin) -> [(int, str)]:
-        languages = localization_models.Language.objects.all().values_list('id', 'name')
-        lookup = [('True', 'Has no unrealized languages'), ('False', 'Has unrealized languages')]
-        for lang_id, name in languages:
-            lookup.append((lang_id, name))
-        return lookup
-
-    def queryset(self, request, queryset) -> [static_page_models.StaticPage]:
-        if self.value() is None:
-            return queryset
-        result = []
-        if self.value() == 'True':
-            for static_page in queryset:
-                if static_page.check_language_for_seo_information:
-                    result.append(static_page.id)
-        elif self.value() == 'False':
-            for static_page in queryset:
-                if not static_page.check_language_for_seo_information:
-                    result.append(static_page.id)
-        else:
-            language = localization_models.Language.objects.filter(pk=self.value()).all().values_list('id', flat=True)
-            if language.__len__() > 0:
-                language = language[0]
-                for static_page in queryset:
-                    if language not in static_page.seo_information_languages_ids:
-                        result.append(static_page.id)
-        return queryset.filter(id__in=result)
+    translation_model = static_page_models.SeoInformation
+    owner_field = 'page'
 
 
-class StaticPageTextNotRealizedLanguageFilter(SimpleListFilter):
+class StaticPageTextNotRealizedLanguageFilter(localization_filters.NotRealizedLanguageFilter):
     title = _('Unrealized Texts')
 
     parameter_name = 'text_lang'
 
-    def lookups(self, request, model_admin) -> [(int, str)]:
-        languages = localization_models.Language.objects.all().values_list('id', 'name')
-        lookup = [('True', 'Has no unrealized languages'), ('False', 'Has unrealized languages')]
-        for lang_id, name in languages:
-            lookup.append((lang_id, name))
-        return lookup
+    translation_model = static_page_models.Text
+    owner_field = 'page'
 
-    def queryset(self, request, queryset) -> [static_page_models.StaticPage]:
-        if self.value() is None:
-            return queryset
-        result = []
-        if self.value() == 'True':
-            for static_page in queryset:
-                if static_page.check_language_for_text:
-                    result.append(static_page.id)
-        elif self.value() == 'False':
-            for static_page in queryset:
-                if not static_page.check_language_for_text:
-                    result.append(static_page.id)
-        else:
-            language = localization_models.Language.objects.filter(pk=self.value()).all().values_list('id', flat=True)
-            if language.__len__() > 0:
-                language = language[0]
-                for static_page in queryset:
-                    if language not in static_page.text_languages_ids:
-                        result.append(static_page.id)
-        return queryset.filter(id__in=result)
 
-
-class StaticPageNotRealizedLanguageFilter(SimpleListFilter):
+class StaticPageNotRealizedLanguageFilter(localization_filters.MatchingLanguagesFilter):
     title = _('Realized Languages')
 
     parameter_name = 'static_page_lang'
 
-    def lookups(self, request, model_admin) -> [(str, str)]:
-        return [('False', 'Has unrealized languages'),
-                ('True', 'Has no unrealized languages')]
-
-    def queryset(self, request, queryset) -> [static_page_models.StaticPage]:
-        if self.value() is None:
-            return queryset
-        result = []
-        if self.value() == 'False':
-            for static_page in queryset:
-                if not static_page.check_language:
-                    result.append(static_page.id)
-        elif self.value() == 'True':
-            for static_page in queryset:
-                if static_page.check_language:
-                    result.append(static_page.id)
-        return queryset.filter(id__in=result)
+    first_model = static_page_models.Text
+    second_model = static_page_models.SeoInformation
+    owner_field = 'page'
 
 
 class SeoInformationInline(admin.StackedInline):
@@ -301,8 +237,6 @@ class StaticPageAdmin(tabbed_admin.TabbedModelAdmin):
             date_time_user_label.page = obj
             date_time_user_label.author = request.user
             date_time_user_label.save()
-
-        cache.clear()
         form.save()
 
     def save_formset(self, request, form, formset, change) -> None:
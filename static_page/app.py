@@ -5,3 +5,6 @@ from django.apps import AppConfig
 class StaticPageAppConfig(AppConfig):
     name = 'static_page'
     verbose_name = _('Static pages')
+
+    def ready(self) -> None:
+        import static_page.signals
@@ -3,6 +3,7 @@ from django.contrib.auth import models as auth_models
 from gallery import models as gallery_models
 from django.utils.translation import ugettext_lazy as _
 import localization.models as localization_models
+from localization.registry import registry
 import sortedm2m.fields as sortedm2m
 
 
@@ -85,8 +86,7 @@ class StaticPage(models.Model):
 
     def check_language_for_seo_admin_display(self) -> str:
         """Checks if seo information languages are corresponding to languages of the website"""
-        unrealized_languages = localization_models.Language.objects.exclude(
-            id__in=self.seo_information_languages_ids).all().values_list('name', flat=True)
+        unrealized_languages = registry.unrealized_languages_names(self.seo_information_languages_ids)
         languages__str = "<br/>".join(unrealized_languages)
         if unrealized_languages.__len__() > 0:
             return str.format(
@@ -101,8 +101,7 @@ class StaticPage(models.Model):
 
     def check_language_for_text_admin_display(self) -> str:
         """Checks if texts languages are corresponding to languages of the website"""
-        unrealized_languages = localization_models.Language.objects.exclude(
-            id__in=self.text_languages_ids).all().values_list('name', flat=True)
+        unrealized_languages = registry.unrealized_languages_names(self.text_languages_ids)
         languages__str = "<br/>".join(unrealized_languages)
         if unrealized_languages.__len__() > 0:
             return str.format(
@@ -125,9 +124,7 @@ class StaticPage(models.Model):
     @property
     def check_language_for_seo_information(self) -> bool:
         """Checks if seo information languages are corresponding to languages of the website"""
-        languages = localization_models.Language.objects.exclude(
-            id__in=SeoInformation.objects.filter(page=self).all().values_list('language__name', flat=True)).values_list(
-            'id', flat=True)
+        languages = registry.unrealized_languages_names(self.seo_information_languages_ids)
         if languages.__len__() > 0:
             return False
         return True
@@ -135,9 +132,7 @@ class StaticPage(models.Model):
     @property
     def check_language_for_text(self) -> bool:
         """Checks if texts languages are corresponding to languages of the website"""
-        languages = localization_models.Language.objects.exclude(
-            id__in=Text.objects.filter(page=self).all().values_list('language__name', flat=True)).values_list('id',
-                                                                                                              flat=True)
+        languages = registry.unrealized_languages_names(self.text_languages_ids)
         if languages.__len__() > 0:
             return False
         return True
@@ -0,0 +1,26 @@
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+import static_page.models as static_page_models
+import neutrino.cache as neutrino_cache
+
+
+@receiver(post_save, sender=static_page_models.StaticPageTemplate)
+@receiver(post_delete, sender=static_page_models.StaticPageTemplate)
+@receiver(post_save, sender=static_page_models.StaticPage)
+@receiver(post_delete, sender=static_page_models.StaticPage)
+def invalidate_instance(sender, instance, **kwargs) -> None:
+    neutrino_cache.invalidate_tags([neutrino_cache.instance_tag(instance)])
+
+
+@receiver(post_save, sender=static_page_models.Text)
+@receiver(post_delete, sender=static_page_models.Text)
+@receiver(post_save, sender=static_page_models.SeoInformation)
+@receiver(post_delete, sender=static_page_models.SeoInformation)
+def invalidate_page(sender, instance, **kwargs) -> None:
+    neutrino_cache.invalidate_tags([neutrino_cache.tag(static_page_models.StaticPage, instance.page_id)])
+
+
+@receiver(m2m_changed, sender=static_page_models.StaticPage.galleries.through)
+def invalidate_page_galleries(sender, instance, **kwargs) -> None:
+    if isinstance(instance, static_page_models.StaticPage):
+        neutrino_cache.invalidate_tags([neutrino_cache.instance_tag(instance)])
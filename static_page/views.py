@@ -5,12 +5,15 @@ from django.template import Context
 import django.utils.translation as translation
 import static_page.models as static_page_models
 import gallery.models as gallery_models
-import banner.models as banner_models
-import menu.models as menu_models
-import localization.models as localization_models
-from django.views.decorators.cache import cache_page
+import gallery.renditions as gallery_renditions
+import localization.currency as localization_currency
+import localization.registry as localization_registry
+from localization.registry import registry
 from static_page.forms import ContactUs
-import info_storage.models as info_storage_models
+import neutrino.cache as neutrino_cache
+import menu.builder as menu_builder
+import neutrino.chrome as chrome
+import neutrino.conditional as neutrino_conditional
 from neutrino.settings import STATIC_PAGE_CACHE_TIME
 
 
@@ -55,6 +58,7 @@ class GalleryImageContainer:
         self.__medium_image = image.medium_image
         self.__large_image = image.large_image
         self.__original_image = image.original_image
+        self.__pictures = image.pictures
         self.__weight = image.weight
 
     @property
@@ -81,6 +85,10 @@ class GalleryImageContainer:
     def original_image(self) -> str:
         return self.__original_image
 
+    @property
+    def pictures(self) -> {str: gallery_renditions.Picture}:
+        return self.__pictures
+
     @property
     def weight(self) -> int:
         return self.__weight
@@ -92,6 +100,7 @@ class GalleryContainer:
         self.__second_image = gallery.second_image
         images = gallery_models.GalleryImagePosition.objects.\
             filter(gallery=gallery, active=True).order_by('weight').all()
+        gallery_models.GalleryImagePosition.prefetch_translations([image.id for image in images])
         self.__items = []
         for image in images:
             self.append(image)
@@ -119,6 +128,7 @@ class GalleriesContainer:
             self.append(item)
 
     def append(self, item: gallery_models.Gallery) -> None:
+        neutrino_cache.depends_on(neutrino_cache.instance_tag(item))
         self.__items[item.marker] = GalleryContainer(item)
 
     @property
@@ -126,86 +136,41 @@ class GalleriesContainer:
         return self.__items
 
 
-class BannerImageContainer:
-    def __init__(self, image: banner_models.BannerImagePosition) -> None:
-        self.__name = image.name
-        self.__description = image.description
-        self.__small_image = image.small_image
-        self.__medium_image = image.medium_image
-        self.__large_image = image.large_image
-        self.__original_image = image.original_image
-        self.__weight = image.weight
-
-    @property
-    def name(self) -> str:
-        return self.__name
-
-    @property
-    def description(self) -> str:
-        return self.__description
-
-    @property
-    def small_image(self) -> str:
-        return self.__small_image
-
-    @property
-    def medium_image(self) -> str:
-        return self.__medium_image
-
-    @property
-    def large_image(self) -> str:
-        return self.__large_image
-
-    @property
-    def original_image(self) -> str:
-        return self.__original_image
-
-    @property
-    def weight(self) -> int:
-        return self.__weight
-
-
-class BannerContainer:
-    def __init__(self, banner: banner_models.Banner) -> None:
-        images = banner_models.BannerImagePosition.objects.\
-            filter(banner=banner, active=True).order_by('weight').all()
-        self.__items = []
-        for image in images:
-            self.append(image)
-
-    def append(self, image: banner_models.BannerImagePosition) -> None:
-        self.__items.append(BannerImageContainer(image))
-
-    @property
-    def images(self) -> {str: BannerImageContainer}:
-        return self.__items
-
-
-class BannersContainer:
-    def __init__(self, banners: [banner_models.Banner]) -> None:
-        self.__items = {}
-        for item in banners:
-            self.append(item)
-
-    def append(self, item: banner_models.Banner) -> None:
-        self.__items[item.marker] = BannerContainer(item)
-
-    @property
-    def banners(self) -> {str: banner_models.Banner}:
-        return self.__items
+def page_state(request, name: str = 'index') -> neutrino_conditional.PageState:
+    row = static_page_models.StaticPage.objects.filter(name=name).values_list('id', 'template').first()
+    if row is None:
+        return None
+    page_id, template_id = row
+    dates = neutrino_conditional.label_dates(
+        static_page_models.StaticPageDateTimeUserLabel.objects.filter(page=page_id))
+    dates += neutrino_conditional.gallery_dates(gallery_models.Gallery.objects.filter(staticpage=page_id))
+    dates += neutrino_conditional.shared_dates()
+    return neutrino_conditional.PageState(dates, [neutrino_cache.tag(static_page_models.StaticPage, page_id),
+                                                  neutrino_cache.tag(static_page_models.StaticPageTemplate,
+                                                                     template_id)])
 
 
-@cache_page(STATIC_PAGE_CACHE_TIME)
+@neutrino_conditional.conditional_page(page_state)
+@neutrino_cache.tagged_cache_page(STATIC_PAGE_CACHE_TIME, vary_on=localization_currency.currency_code)
 def index_page(request):
-    return static_page(request, 'index')
+    return render_page(request, 'index')
 
 
-@cache_page(STATIC_PAGE_CACHE_TIME)
+@neutrino_conditional.conditional_page(page_state)
+@neutrino_cache.tagged_cache_page(STATIC_PAGE_CACHE_TIME, vary_on=localization_currency.currency_code)
 def static_page(request, name: str):
+    return render_page(request, name)
+
+
+def render_page(request, name: str):
+    """Body of the page views, which add conditional GET and page cache around it"""
     try:
         page = static_page_models.StaticPage.objects.get(name=name)
     except Exception:
         return HttpResponseNotFound(get_template('system/404.html').render(Context({})))
+    neutrino_cache.depends_on(neutrino_cache.instance_tag(page),
+                              neutrino_cache.tag(static_page_models.StaticPageTemplate, page.template_id),
+                              localization_registry.TAG)
 
     language_code = translation.get_language()
     texts = TextsContainer(static_page_models.Text.objects.order_by('weight').
@@ -213,19 +178,10 @@ def static_page(request, name: str):
                                                                                                    'weight'))
     seo_info = static_page_models.SeoInformation.objects.filter(page=page, language__short_name=language_code).first()
     galleries = GalleriesContainer(page.galleries.all())
-    banners = BannersContainer(banner_models.Banner.objects.all())
-
-    main_menu = menu_models.MainMenu.objects.all()
-    additional_menu = menu_models.AdditionalMenu.objects.all()
-    extra_menu = menu_models.ExtraMenu.objects.all()
+    site_chrome = chrome.get_chrome(localization_currency.currency_code(request))
 
     template = page.template.path
 
-    info_storage = info_storage_models.Storage.objects.all().values_list('key', 'value')
-    info_storage_dict = {}
-    for key, value in info_storage:
-        info_storage_dict[key] = value
-
     if request.POST:
         contact_from = ContactUs(request.POST)
         contact_from, status = contact_from.process()
@@ -234,15 +190,18 @@ def static_page(request, name: str):
 
     return render(request, template, {
         'page': page,
-        'languages': localization_models.Language.objects.all(),
+        'languages': registry.languages(),
         'language_code': language_code,
         'texts_container': texts.texts,
         'galleries_container': galleries.galleries,
-        'banners_container': banners,
-        'main_menu': main_menu,
-        'additional_menu': additional_menu,
-        'extra_menu': extra_menu,
+        'banners_container': site_chrome.banners,
+        'main_menu': site_chrome.main_menu,
+        'additional_menu': site_chrome.additional_menu,
+        'extra_menu': site_chrome.extra_menu,
+        'breadcrumbs': site_chrome.breadcrumbs(request.path),
+        'active_branch': site_chrome.active_branch(request.path),
+        'menu_url': menu_builder.page_url(request.path),
         'contact_from': contact_from,
         'seo_info': seo_info,
-        'info_storage': info_storage_dict
+        'info_storage': site_chrome.info_storage
     })